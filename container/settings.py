@@ -181,7 +181,9 @@ CELERY_BROKER_URL = getenv("CELERY_BROKER_URL", "amqp://rabbitmq")
 CELERY_RESULT_BACKEND = getenv("CELERY_RESULT_BACKEND", "rpc://rabbitmq")
 CELERY_IMPORTS = [
     "parlhistnl.crawler.handeling",
+    "parlhistnl.crawler.harvest",
     "parlhistnl.crawler.kamerstuk",
+    "parlhistnl.crawler.memoize",
     "parlhistnl.crawler.staatsblad"
 ]
 # This rate limit is recommended when crawling new pages from the KOOP API.
@@ -190,7 +192,51 @@ CELERY_IMPORTS = [
 CELERY_TASK_DEFAULT_RATE_LIMIT = getenv("PARLHIST_TASK_RATE_LIMIT", "60/m")
 
 PARLHIST_CRAWLER_MEMOIZE_PATH = getenv("PARLHIST_MEMOIZED_REQUESTS_PATH", "/data/memoized-requests")
+PARLHIST_CRAWLER_MEMOIZE_BACKEND = getenv("PARLHIST_MEMOIZED_REQUESTS_BACKEND", "file")
+PARLHIST_CRAWLER_MEMOIZE_USE_INDEX = True
+PARLHIST_CRAWLER_MEMOIZE_INDEX_CAPACITY = int(getenv("PARLHIST_MEMOIZED_REQUESTS_INDEX_CAPACITY", "10000000"))
+PARLHIST_CRAWLER_MEMOIZE_TTL_SECONDS = {
+    "sru": int(getenv("PARLHIST_MEMOIZED_REQUESTS_SRU_TTL_SECONDS", "86400")),
+    "metadata": None,
+    "document": None,
+}
+PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES = int(getenv("PARLHIST_MEMOIZED_REQUESTS_MAX_BYTES", "0")) or None
 PARLHIST_CRAWLER_DEFAULT_USE_MEMOIZATION = getenv("PARLHIST_ENABLE_MEMOIZATION", "False") == "True"
+PARLHIST_CRAWLER_METADATA_FROM_SRU_RECORD = getenv("PARLHIST_METADATA_FROM_SRU_RECORD", "False") == "True"
+PARLHIST_CRAWLER_TEXT_FROM_XML = getenv("PARLHIST_TEXT_FROM_XML", "False") == "True"
+PARLHIST_CRAWLER_HTTP_POOL_CONNECTIONS = 4
+PARLHIST_CRAWLER_HTTP_POOL_MAXSIZE = 16
+PARLHIST_CRAWLER_HTTP_TIMEOUT_SECONDS = (
+    float(getenv("PARLHIST_HTTP_CONNECT_TIMEOUT_SECONDS", "10")),
+    float(getenv("PARLHIST_HTTP_READ_TIMEOUT_SECONDS", "30")),
+)
+PARLHIST_CRAWLER_RATELIMIT_BACKEND = getenv("PARLHIST_RATELIMIT_BACKEND", "database")
+PARLHIST_CRAWLER_RATELIMIT_PATH = getenv("PARLHIST_RATELIMIT_PATH", "/data/crawler-ratelimit.json")
+PARLHIST_CRAWLER_RATELIMIT_MAX_RATE = {"*": float(getenv("PARLHIST_RATELIMIT_MAX_RATE", "4.0"))}
+PARLHIST_CRAWLER_RATELIMIT_MIN_RATE = {"*": 0.1}
+PARLHIST_CRAWLER_RATELIMIT_BURST = 4
+PARLHIST_CRAWLER_RATELIMIT_INCREASE = 0.05
+PARLHIST_CRAWLER_RATELIMIT_SLOW_RESPONSE_SECONDS = 5
+PARLHIST_CRAWLER_RETRY_MAX_ATTEMPTS = int(getenv("PARLHIST_RETRY_MAX_ATTEMPTS", "5"))
+PARLHIST_CRAWLER_RETRY_BACKOFF_SECONDS = 1
+PARLHIST_CRAWLER_RETRY_MAX_BACKOFF_SECONDS = 60
+PARLHIST_CRAWLER_CIRCUIT_BREAKER_FAILURES = 10
+PARLHIST_CRAWLER_CIRCUIT_BREAKER_OPEN_SECONDS = int(getenv("PARLHIST_CIRCUIT_BREAKER_OPEN_SECONDS", "300"))
+PARLHIST_CRAWLER_FETCH_WORKERS = int(getenv("PARLHIST_FETCH_WORKERS", "8"))
+PARLHIST_CRAWLER_FETCH_LOOKAHEAD = int(getenv("PARLHIST_FETCH_LOOKAHEAD", "4"))
+PARLHIST_CRAWLER_SRU_PAGE_WORKERS = int(getenv("PARLHIST_SRU_PAGE_WORKERS", "4"))
+PARLHIST_CRAWLER_SRU_SHARD_SIZE = 1000
+PARLHIST_CRAWLER_SRU_SHARD_WORKERS = int(getenv("PARLHIST_SRU_SHARD_WORKERS", "4"))
+PARLHIST_CRAWLER_SRU_SHARD_ATTEMPTS = 3
+PARLHIST_CRAWLER_SRU_DOSSIERS_PER_QUERY = 50
+PARLHIST_CRAWLER_CHECKPOINT_INTERVAL = 100
+PARLHIST_CRAWLER_EXISTING_BATCH_SIZE = 1000
+PARLHIST_CRAWLER_SINK_BATCH_SIZE = 100
+PARLHIST_CRAWLER_DOSSIER_MAX_AGE_DAYS = int(getenv("PARLHIST_DOSSIER_MAX_AGE_DAYS", "7"))
+PARLHIST_CRAWLER_DOSSIER_WORKERS = int(getenv("PARLHIST_DOSSIER_WORKERS", "2"))
+PARLHIST_CRAWLER_HTTP_HEADERS = {
+    "User-Agent": getenv("PARLHIST_HTTP_USER_AGENT", "parlhist (https://github.com/mastaal/parlhist)"),
+}
 
 PARLHIST_OPENSEARCH_ENABLED = getenv("PARLHIST_OPENSEARCH_ENABLED", "False") == "True"
 PARLHIST_OPENSEARCH_HTTP_AUTH_USER = getenv("PARLHIST_OPENSEARCH_HTTP_AUTH_USER", "admin")
@@ -181,7 +181,9 @@ CELERY_BROKER_URL = "amqp://"
 CELERY_RESULT_BACKEND = "rpc://"
 CELERY_IMPORTS = [
     "parlhistnl.crawler.handeling",
+    "parlhistnl.crawler.harvest",
     "parlhistnl.crawler.kamerstuk",
+    "parlhistnl.crawler.memoize",
     "parlhistnl.crawler.staatsblad"
 ]
 # This rate limit is recommended when crawling new pages from the KOOP API.
@@ -190,7 +192,87 @@ CELERY_IMPORTS = [
 CELERY_TASK_DEFAULT_RATE_LIMIT = "60/m"
 
 PARLHIST_CRAWLER_MEMOIZE_PATH = "./memoized-requests"
+# Either "file" (one file per request) or "sqlite" (one database file for all requests)
+PARLHIST_CRAWLER_MEMOIZE_BACKEND = "file"
+# Keep a Bloom filter of all memoized requests, so that requests that are not memoized are recognized
+# without checking the memoize store. The capacity determines the size of the filter (about 12 MB per
+# 10 million memoized requests).
+PARLHIST_CRAWLER_MEMOIZE_USE_INDEX = True
+PARLHIST_CRAWLER_MEMOIZE_INDEX_CAPACITY = 10_000_000
+# Memoized requests are revalidated with a conditional request once they are older than the TTL of their url
+# class: "sru" (SRU API search results), "metadata" (metadata.xml) or "document" (all other urls). None means
+# that memoized requests of this class never expire.
+PARLHIST_CRAWLER_MEMOIZE_TTL_SECONDS = {"sru": 24 * 60 * 60, "metadata": None, "document": None}
+# If set, memoize_prune (and memoize_prune_task) remove the least recently used memoized requests once the store
+# is larger than this.
+PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES = None
 PARLHIST_CRAWLER_DEFAULT_USE_MEMOIZATION = True
+# Take the metadata of Kamerstukken and Staatsbladen from the SRU search results instead of requesting metadata.xml,
+# which saves one of every two or three requests. metadata.xml is still requested if the search result lacks metadata
+# needed by parlhist, but raw_metadata_xml then only contains the metadata of the search result, and these publications
+# cannot be rebuilt from the memoized requests.
+PARLHIST_CRAWLER_METADATA_FROM_SRU_RECORD = False
+# Extract the text of Staatsbladen and Handelingen from their xml instead of requesting and parsing their html page,
+# which is faster. The html is still requested if no text could be extracted from the xml, but raw_html is then empty.
+PARLHIST_CRAWLER_TEXT_FROM_XML = False
+# All requests are sent using a session per process shared by all threads, which keeps connections alive between
+# requests. pool_connections is the number of hosts for which connections are kept, pool_maxsize the number of
+# connections per host (at least the number of fetch, SRU page and shard threads that may send requests at once).
+PARLHIST_CRAWLER_HTTP_POOL_CONNECTIONS = 4
+PARLHIST_CRAWLER_HTTP_POOL_MAXSIZE = 16
+# (connect timeout, read timeout)
+PARLHIST_CRAWLER_HTTP_TIMEOUT_SECONDS = (10, 30)
+# Requests are rate limited per host, shared by all processes using the same rate limit backend:
+# "local" (only this process), "file" (all processes on this machine, using PARLHIST_CRAWLER_RATELIMIT_PATH, which is
+# stored with the memoized requests by default) or "database" (all processes using the same database).
+PARLHIST_CRAWLER_RATELIMIT_BACKEND = "file"
+PARLHIST_CRAWLER_RATELIMIT_PATH = str(
+    Path(PARLHIST_CRAWLER_MEMOIZE_PATH) / "crawler-ratelimit.json"
+)
+# Maximum and minimum number of requests per second per host, "*" applies to all other hosts
+PARLHIST_CRAWLER_RATELIMIT_MAX_RATE = {"*": 4.0}
+PARLHIST_CRAWLER_RATELIMIT_MIN_RATE = {"*": 0.1}
+# The number of requests that may be sent at once after an idle period
+PARLHIST_CRAWLER_RATELIMIT_BURST = 4
+# After every successful request, the rate is increased by this many requests per second. After a 429 response
+# the rate is halved, after a server error or a response slower than PARLHIST_CRAWLER_RATELIMIT_SLOW_RESPONSE_SECONDS it is
+# decreased by a quarter.
+PARLHIST_CRAWLER_RATELIMIT_INCREASE = 0.05
+PARLHIST_CRAWLER_RATELIMIT_SLOW_RESPONSE_SECONDS = 5
+# Connection errors, timeouts, 429 and 5xx responses are retried up to PARLHIST_CRAWLER_RETRY_MAX_ATTEMPTS times, waiting
+# a random time of at most BACKOFF_SECONDS * 2^attempt (but at most MAX_BACKOFF_SECONDS, or the Retry-After header).
+PARLHIST_CRAWLER_RETRY_MAX_ATTEMPTS = 5
+PARLHIST_CRAWLER_RETRY_BACKOFF_SECONDS = 1
+PARLHIST_CRAWLER_RETRY_MAX_BACKOFF_SECONDS = 60
+# After this many consecutive failed requests to a host, all workers pause sending requests to it
+PARLHIST_CRAWLER_CIRCUIT_BREAKER_FAILURES = 10
+PARLHIST_CRAWLER_CIRCUIT_BREAKER_OPEN_SECONDS = 300
+# The manifestations of a publication (html, metadata and xml) are fetched concurrently by a pool of this many threads,
+# while the publications of the next LOOKAHEAD search results are already being fetched in the background.
+PARLHIST_CRAWLER_FETCH_WORKERS = 8
+PARLHIST_CRAWLER_FETCH_LOOKAHEAD = 4
+# The pages of SRU API search results are requested concurrently by this many threads
+PARLHIST_CRAWLER_SRU_PAGE_WORKERS = 4
+# Large SRU queries (e.g. all Kamerstukken of a year) are split by date into queries with at most SHARD_SIZE records,
+# which are requested concurrently by SHARD_WORKERS threads. A failed query is retried SHARD_ATTEMPTS times.
+PARLHIST_CRAWLER_SRU_SHARD_SIZE = 1000
+PARLHIST_CRAWLER_SRU_SHARD_WORKERS = 4
+PARLHIST_CRAWLER_SRU_SHARD_ATTEMPTS = 3
+# Crawls of many kamerstukdossiers combine this many dossiers into one SRU query
+PARLHIST_CRAWLER_SRU_DOSSIERS_PER_QUERY = 50
+# The progress of a crawl of a year is stored in the database after this many records, to be able to resume it
+PARLHIST_CRAWLER_CHECKPOINT_INTERVAL = 100
+# Crawls of search results check which publications already exist using one database query per this many records
+PARLHIST_CRAWLER_EXISTING_BATCH_SIZE = 1000
+# Crawls of search results write the crawled publications to the database in transactions of this many publications
+PARLHIST_CRAWLER_SINK_BATCH_SIZE = 100
+# Recrawls of many kamerstukdossiers skip dossiers that were crawled less than MAX_AGE_DAYS ago, and crawl the other
+# dossiers concurrently using this many threads
+PARLHIST_CRAWLER_DOSSIER_MAX_AGE_DAYS = 7
+PARLHIST_CRAWLER_DOSSIER_WORKERS = 2
+PARLHIST_CRAWLER_HTTP_HEADERS = {
+    "User-Agent": "parlhist (https://github.com/mastaal/parlhist)",
+}
 PARLHIST_OPENSEARCH_ENABLED = True
 PARLHIST_OPENSEARCH_HTTP_AUTH_USER = getenv("PARLHIST_OPENSEARCH_HTTP_AUTH_USER", "admin")
 PARLHIST_OPENSEARCH_HTTP_AUTH_PASSWORD = getenv("PARLHIST_OPENSEARCH_HTTP_AUTH_PASSWORD", "changeme")
@@ -0,0 +1,186 @@
+"""
+parlhist/parlhistnl/crawler/checkpoint.py
+
+Checkpoints of long-running crawls, e.g. of all Kamerstukken of a year, so that an interrupted crawl can be resumed.
+
+A crawl of a sharded KOOP SRU query (see koop_sru_api_iter_shards) stores its progress in a HarvestCheckpoint: the
+shards of which all records have been processed, the number of processed records of the current shard and the records
+that failed to be crawled. A resumed crawl first retries the failed records, then skips all completed shards and the
+processed records of the current shard.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import collections
+import datetime
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Iterator
+
+from django.conf import settings
+from django.db import models
+
+from parlhistnl.models import HarvestCheckpoint
+from parlhistnl.crawler.utils import koop_sru_api_iter_shards
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCheckpoint:
+    """Keeps track of the processed records of a crawl of a sharded KOOP SRU query, see iter_records and processed"""
+
+    def __init__(
+        self,
+        query: str,
+        start: datetime.date,
+        end: datetime.date,
+        resume=False,
+        include_outside_window=False,
+    ) -> None:
+        # Whether records of query outside of start and end are crawled as well, see plan_koop_sru_api_shards
+        self.include_outside_window = include_outside_window
+        # Called before the progress is stored, e.g. to first write the crawled publications to the database
+        self.before_save: Callable[[], Any] | None = None
+        # The position of every record that has been yielded, but not yet processed, in order: either
+        # (shard query, (index, number of records in the shard)) or (None, failed record)
+        self.positions: collections.deque[
+            tuple[str | None, tuple[int, int] | str]
+        ] = collections.deque()
+        # The processed records of publications that may not have been written yet, see before_save
+        self.unsaved_publications: list[tuple[ET.Element, models.Model]] = []
+        self.processed_since_save = 0
+
+        self.checkpoint, created = HarvestCheckpoint.objects.get_or_create(
+            query=query, start=start, end=end
+        )
+
+        if not created and not resume:
+            logger.info("Discarding the previous checkpoint of %s", self.checkpoint)
+            self.checkpoint.completed_shards = []
+            self.checkpoint.shard = ""
+            self.checkpoint.offset = 0
+            self.checkpoint.failures = []
+            self.checkpoint.completed = False
+            self.save()
+
+    def save(self) -> None:
+        """Store the progress in the database"""
+
+        if self.before_save is not None:
+            self.before_save()
+
+        # A publication that still has no id could not be written, its record failed after all
+        for record, publication in self.unsaved_publications:
+            if publication.pk is None:
+                self.checkpoint.failures.append(ET.tostring(record, encoding="unicode"))
+        self.unsaved_publications = []
+
+        self.checkpoint.save(
+            update_fields=[
+                "completed_shards",
+                "shard",
+                "offset",
+                "failures",
+                "completed",
+                "bijgewerkt_op",
+            ]
+        )
+        self.processed_since_save = 0
+
+    def iter_records(self) -> Iterator[ET.Element]:
+        """
+        Iterate over the records still to be crawled: first the records that failed before, then the records of all
+        shards that have not been completed yet.
+        """
+
+        for failure in list(self.checkpoint.failures):
+            self.positions.append((None, failure))
+            yield ET.fromstring(failure)
+
+        if self.checkpoint.completed:
+            logger.info("All shards of %s have already been crawled", self.checkpoint)
+            return
+
+        for shard_query, shard_records in koop_sru_api_iter_shards(
+            self.checkpoint.query,
+            self.checkpoint.start,
+            self.checkpoint.end,
+            skip_shards=set(self.checkpoint.completed_shards),
+            include_outside_window=self.include_outside_window,
+        ):
+            skip = self.checkpoint.offset if shard_query == self.checkpoint.shard else 0
+
+            if skip >= len(shard_records):
+                # Nothing left to process in this shard
+                self.checkpoint.completed_shards.append(shard_query)
+                self.save()
+                continue
+
+            if skip > 0:
+                logger.info(
+                    "Resuming shard %s at record %s of %s",
+                    shard_query,
+                    skip,
+                    len(shard_records),
+                )
+
+            for index in range(skip, len(shard_records)):
+                self.positions.append((shard_query, (index, len(shard_records))))
+                yield shard_records[index]
+
+    def processed(
+        self,
+        record: ET.Element,
+        failed=False,
+        publication: models.Model | None = None,
+    ) -> None:
+        """
+        Mark the next record yielded by iter_records as processed, records must be processed in order. publication is
+        the crawled publication of the record, the record is still marked as failed if it cannot be written.
+        """
+
+        if publication is not None and not failed:
+            self.unsaved_publications.append((record, publication))
+
+        shard_query, position = self.positions.popleft()
+
+        if shard_query is None:
+            # A retried failure
+            if not failed:
+                self.checkpoint.failures.remove(position)
+        else:
+            index, shard_length = position
+
+            if failed:
+                self.checkpoint.failures.append(ET.tostring(record, encoding="unicode"))
+
+            if index + 1 == shard_length:
+                self.checkpoint.completed_shards.append(shard_query)
+                self.checkpoint.shard = ""
+                self.checkpoint.offset = 0
+            else:
+                self.checkpoint.shard = shard_query
+                self.checkpoint.offset = index + 1
+
+        self.processed_since_save += 1
+        if (
+            self.processed_since_save >= settings.PARLHIST_CRAWLER_CHECKPOINT_INTERVAL
+            or self.checkpoint.shard == ""
+        ):
+            self.save()
+
+    def complete(self) -> None:
+        """Mark the crawl as completed, a resumed crawl then only retries the failed records"""
+
+        self.checkpoint.completed = True
+        self.save()
+
+        if len(self.checkpoint.failures) > 0:
+            logger.warning(
+                "Crawled %s, %s records failed",
+                self.checkpoint,
+                len(self.checkpoint.failures),
+            )
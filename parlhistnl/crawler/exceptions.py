@@ -0,0 +1,14 @@
+"""
+parlhist/parlhistnl/crawler/exceptions.py
+
+Exceptions raised by the crawler, importable by all crawler modules without circular imports.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+
+class CrawlerException(Exception):
+    """For when something goes wrong during crawling"""
@@ -0,0 +1,315 @@
+"""
+parlhist/parlhistnl/crawler/extraction.py
+
+Extraction of the text of publications from their manifestations.
+
+The text of a publication on its html page is found in article div#broodtekst.stuk.broodtekst-container. The html
+is parsed using lxml and XPath if lxml is installed, otherwise using BeautifulSoup, only parsing the article elements.
+The text is extracted the way BeautifulSoup's get_text does, but the html of the broodtekst is serialized by lxml,
+which differs from BeautifulSoup's serialization (e.g. <br> instead of <br/>, attributes in document order, and CDATA
+sections as escaped text).
+
+The xml manifestation of a Staatsblad or Handeling is smaller than its html page, and contains only the publication
+itself, so its text can be extracted without parsing the complete page. The xml is parsed incrementally: the text of
+every element is assembled when the element ends, after which its children are discarded.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import html
+import html.entities
+import io
+import re
+import threading
+import xml.etree.ElementTree as ET
+from typing import Iterator
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EntitySubstitution
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+BROODTEKST_SELECTOR = "article div#broodtekst.stuk.broodtekst-container"
+# The XPath equivalent of BROODTEKST_SELECTOR
+BROODTEKST_XPATH = (
+    "//article//div[@id='broodtekst']"
+    "[contains(concat(' ', normalize-space(@class), ' '), ' stuk ')]"
+    "[contains(concat(' ', normalize-space(@class), ' '), ' broodtekst-container ')]"
+)
+# Elements of which the text is not part of the text of a html page, as in BeautifulSoup's get_text
+HTML_SKIPPED_ELEMENTS = ("script", "style", "template")
+# Elements in which whitespace is kept as is, other strings of only whitespace are collapsed like BeautifulSoup does
+HTML_PRESERVED_ELEMENTS = ("pre", "textarea")
+# A named character reference, e.g. &eacute;
+HTML_ENTITY_REFERENCE = re.compile(r"&([A-Za-z][A-Za-z0-9]*);")
+HTML_CDATA_SECTION = re.compile(r"<!\[CDATA\[(.*?)\]\]>", re.DOTALL)
+
+# Elements after which a new line starts in the extracted text
+XML_BLOCK_ELEMENTS = {
+    "al",
+    "alinea",
+    "artikel",
+    "considerans.al",
+    "dagtekening",
+    "intitule",
+    "kop",
+    "li",
+    "lid",
+    "naam",
+    "ondertekening",
+    "p",
+    "regel",
+    "row",
+    "spreker",
+    "titel",
+    "tussenkop",
+    "wij",
+}
+# Elements which are followed by a space, e.g. <kop><label>Artikel</label><nr>1</nr></kop>
+XML_SPACED_ELEMENTS = {"label", "li.nr", "lidnr", "nr"}
+# Elements of which the text is not part of the text of the publication
+XML_SKIPPED_ELEMENTS = {"meta", "metadata", "meta-data"}
+
+
+__local = threading.local()
+
+
+def __get_lxml_html_parser() -> "lxml.html.HTMLParser":
+    """Get the lxml html parser of the current thread, as parsers must not be shared between threads"""
+
+    parser = getattr(__local, "html_parser", None)
+    if parser is None:
+        # The html is always passed as utf-8 encoded bytes, whatever the page itself declares
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        __local.html_parser = parser
+
+    return parser
+
+
+def __replace_entity_reference(match: re.Match) -> str:
+    """Replace a named character reference as BeautifulSoup would resolve it, see __prepare_html_for_lxml"""
+
+    name = match.group(1)
+    if name in html.entities.entitydefs:
+        return match.group(0)
+
+    character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+    if character is None:
+        # BeautifulSoup keeps an unknown entity as text, without its semicolon
+        return f"&amp;{name}"
+
+    return "".join(f"&#{ord(char)};" for char in character)
+
+
+def __prepare_html_for_lxml(raw_html: str) -> str:
+    """
+    Replace the parts of html that lxml parses differently from BeautifulSoup. CDATA sections, which lxml parses as
+    comments, are replaced by their escaped text. Named character references that are not HTML 4 entities (which
+    every version of libxml2 knows) are replaced by numeric character references, or by text if BeautifulSoup does
+    not know them either.
+    """
+
+    if "<![CDATA[" in raw_html:
+        raw_html = HTML_CDATA_SECTION.sub(
+            lambda match: html.escape(match.group(1), quote=False), raw_html
+        )
+
+    return HTML_ENTITY_REFERENCE.sub(__replace_entity_reference, raw_html)
+
+
+def __collapse_whitespace_string(text: str, preserve_whitespace: bool) -> str:
+    """Collapse a string consisting of only whitespace to a single new line or space, as BeautifulSoup does"""
+
+    if preserve_whitespace or text.strip() != "":
+        return text
+
+    return "\n" if "\n" in text else " "
+
+
+def __iter_lxml_texts(
+    element: "lxml.html.HtmlElement", preserve_whitespace=False
+) -> Iterator[str]:
+    """Iterate over the strings within an lxml element, as BeautifulSoup's get_text does"""
+
+    # Comments and processing instructions have a function as tag, only their tail is text
+    if not isinstance(element.tag, str) or element.tag in HTML_SKIPPED_ELEMENTS:
+        return
+
+    preserve_whitespace = preserve_whitespace or element.tag in HTML_PRESERVED_ELEMENTS
+
+    if element.text:
+        yield __collapse_whitespace_string(element.text, preserve_whitespace)
+
+    for child in element:
+        yield from __iter_lxml_texts(child, preserve_whitespace)
+
+        if child.tail:
+            yield __collapse_whitespace_string(child.tail, preserve_whitespace)
+
+
+def __get_lxml_text(element: "lxml.html.HtmlElement") -> str:
+    """Get the text of an lxml element like BeautifulSoup's get_text"""
+
+    return "".join(__iter_lxml_texts(element))
+
+
+def __extract_broodtekst_using_lxml(raw_html: str) -> tuple[str, str, int]:
+    """Extract the broodtekst using lxml, see extract_broodtekst"""
+
+    try:
+        document = lxml.html.document_fromstring(
+            __prepare_html_for_lxml(raw_html).encode("utf-8"),
+            parser=__get_lxml_html_parser(),
+        )
+    except lxml.etree.ParserError:
+        # e.g. an empty page
+        return "", "", 0
+
+    matches = document.xpath(BROODTEKST_XPATH)
+    if len(matches) == 0:
+        return "", "", 0
+
+    inner_html = lxml.html.tostring(matches[0], encoding="unicode", with_tail=False)
+
+    return inner_html, __get_lxml_text(matches[0]), len(matches)
+
+
+def __extract_broodtekst_using_bs4(raw_html: str) -> tuple[str, str, int]:
+    """Extract the broodtekst using BeautifulSoup, see extract_broodtekst"""
+
+    # Only the article elements are parsed, the rest of the page is skipped
+    soup = BeautifulSoup(raw_html, "html.parser", parse_only=SoupStrainer("article"))
+
+    matches = soup.select(BROODTEKST_SELECTOR)
+    if len(matches) == 0:
+        return "", "", 0
+
+    return str(matches[0]), matches[0].get_text(), len(matches)
+
+
+def extract_broodtekst(raw_html: str) -> tuple[str, str, int]:
+    """
+    Extract the text of a publication from its html page (article div#broodtekst.stuk.broodtekst-container).
+
+    Returns the html and the text of the first match, and the number of matches. If nothing matches, the html and
+    text are empty.
+    """
+
+    if lxml is None:
+        return __extract_broodtekst_using_bs4(raw_html)
+
+    return __extract_broodtekst_using_lxml(raw_html)
+
+
+def extract_text_from_html(raw_html: str) -> str:
+    """Extract the text of a html fragment, e.g. the stored inner html of a publication"""
+
+    if lxml is None or raw_html.strip() == "":
+        return BeautifulSoup(raw_html, "html.parser").get_text()
+
+    fragment = lxml.html.fragment_fromstring(
+        __prepare_html_for_lxml(raw_html).encode("utf-8"),
+        create_parent="div",
+        parser=__get_lxml_html_parser(),
+    )
+
+    return __get_lxml_text(fragment)
+
+
+def __get_local_name(tag: str) -> str:
+    """Get the name of an element without its namespace"""
+
+    return tag.rsplit("}", 1)[-1]
+
+
+def __get_inline_text(text: str | None) -> str:
+    """Get the text or tail of an element, in which new lines are only layout of the xml"""
+
+    if text is None:
+        return ""
+
+    return text.replace("\n", " ")
+
+
+def __normalize_text(text: str) -> str:
+    """Collapse the whitespace within every line, and remove empty lines"""
+
+    lines = (" ".join(line.split()) for line in text.split("\n"))
+
+    return "\n".join(line for line in lines if line != "")
+
+
+def __iter_xml_element_texts(
+    raw_xml: str, skipped_elements: set[str]
+) -> Iterator[tuple[str, str, bool]]:
+    """
+    Parse raw_xml incrementally, yielding the name, the (unnormalized) text and whether it is the root element
+    for every element when it ends. The text of elements in skipped_elements is left out.
+    """
+
+    # The texts of the children of every element that has started, but not yet ended
+    stack: list[list[str]] = []
+
+    for event, element in ET.iterparse(
+        io.BytesIO(raw_xml.encode("utf-8")), events=("start", "end")
+    ):
+        if event == "start":
+            stack.append([])
+            continue
+
+        children_texts = stack.pop()
+        name = __get_local_name(element.tag)
+
+        if name in skipped_elements:
+            text = ""
+        else:
+            # The tail of a child is only known once its parent has ended
+            text = __get_inline_text(element.text) + "".join(
+                child_text + __get_inline_text(child.tail)
+                for child_text, child in zip(children_texts, element)
+            )
+            if name in XML_BLOCK_ELEMENTS:
+                text += "\n"
+            elif name in XML_SPACED_ELEMENTS:
+                text += " "
+
+        # The texts of the children have been used, so they can be discarded
+        del element[:]
+
+        if len(stack) > 0:
+            stack[-1].append(text)
+
+        yield name, text, len(stack) == 0
+
+
+def extract_text_from_xml(raw_xml: str) -> str:
+    """Extract the text of a publication from its xml manifestation"""
+
+    for _, text, is_root in __iter_xml_element_texts(raw_xml, XML_SKIPPED_ELEMENTS):
+        if is_root:
+            return __normalize_text(text)
+
+    return ""
+
+
+def extract_articles_from_xml(
+    raw_xml: str, include_article_names=False
+) -> list[str]:
+    """Extract the text of all articles (artikel elements) of a publication from its xml manifestation"""
+
+    skipped_elements = XML_SKIPPED_ELEMENTS
+    if not include_article_names:
+        skipped_elements = skipped_elements | {"kop"}
+
+    return [
+        __normalize_text(text)
+        for name, text, _ in __iter_xml_element_texts(raw_xml, skipped_elements)
+        if name == "artikel"
+    ]
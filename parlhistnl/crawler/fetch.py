@@ -0,0 +1,162 @@
+"""
+parlhist/parlhistnl/crawler/fetch.py
+
+Concurrent fetching of urls, e.g. all manifestations (html, metadata.xml and xml) of a publication at once.
+
+Urls are fetched using get_url_or_error in a pool of threads, so all requests still go through the memoize store,
+the shared rate limiter and the retry policy. Crawl loops can prefetch the urls of the next records while the current
+record is being parsed and saved; fetch_urls then uses the prefetched requests instead of sending new ones.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import collections
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from django.conf import settings
+
+from parlhistnl.crawler.utils import get_url_or_error
+
+logger = logging.getLogger(__name__)
+
+__lock = threading.Lock()
+__executor: ThreadPoolExecutor | None = None
+__executor_pid: int | None = None
+# Prefetched requests by url and whether they revalidate the memoized response
+__prefetched: dict[tuple[str, bool], Future] = {}
+
+T = TypeVar("T")
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the thread pool used for fetching, a new pool is created after forking"""
+
+    global __executor, __executor_pid
+
+    with __lock:
+        # The threads of a pool do not survive forking, so a forked process (e.g. a celery worker) gets a new pool
+        if __executor is None or __executor_pid != os.getpid():
+            __executor = ThreadPoolExecutor(
+                max_workers=settings.PARLHIST_CRAWLER_FETCH_WORKERS,
+                thread_name_prefix="parlhist-fetch",
+            )
+            __executor_pid = os.getpid()
+            __prefetched.clear()
+
+    return __executor
+
+
+def prefetch_urls(
+    urls: Iterable[str], revalidate=False
+) -> dict[tuple[str, bool], Future]:
+    """
+    Start fetching urls in the background, so that a later call to fetch_urls does not have to wait for them.
+    Returns the prefetched requests that were started by this call, urls that are already being prefetched are skipped.
+    """
+
+    executor = get_executor()
+    started = {}
+
+    with __lock:
+        for url in urls:
+            key = (url, revalidate)
+            if key not in __prefetched:
+                logger.debug("Prefetching %s", url)
+                __prefetched[key] = started[key] = executor.submit(
+                    get_url_or_error, url, revalidate=revalidate
+                )
+
+    return started
+
+
+def fetch_urls(urls: list[str], revalidate=False) -> list[Future]:
+    """
+    Fetch all urls concurrently, returns a future for every url in the same order.
+
+    Calling result() on a future returns the response, or raises the CrawlerException of get_url_or_error.
+    Prefetched urls are not fetched again.
+    """
+
+    executor = get_executor()
+    futures = []
+
+    with __lock:
+        for url in urls:
+            future = __prefetched.pop((url, revalidate), None)
+
+            if future is None:
+                future = executor.submit(get_url_or_error, url, revalidate=revalidate)
+            else:
+                logger.debug("Using prefetched request to %s", url)
+
+            futures.append(future)
+
+    return futures
+
+
+def clear_prefetched(prefetched: dict[tuple[str, bool], Future] | None = None) -> None:
+    """
+    Forget the given prefetched requests (as returned by prefetch_urls) if they have not been used, e.g. at the end of
+    a crawl, or all unused prefetched requests if prefetched is None.
+    """
+
+    with __lock:
+        if prefetched is None:
+            prefetched = dict(__prefetched)
+
+        for key, future in prefetched.items():
+            # The request may have been used and prefetched again by another crawl since
+            if __prefetched.get(key) is future:
+                future.cancel()
+                del __prefetched[key]
+
+
+def prefetch_ahead(
+    items: Iterable[T], get_urls: Callable[[T], list[str]], revalidate=False
+) -> Iterator[T]:
+    """
+    Iterate over items, while prefetching the urls of the next PARLHIST_CRAWLER_FETCH_LOOKAHEAD items.
+
+    get_urls returns the urls that will be fetched for an item, or an empty list if nothing will be fetched
+    for it (e.g. because it has already been crawled). Once an item has been crawled, the requests prefetched for it
+    that were not used are cancelled. Only requests prefetched by this call are cancelled, as other crawls may be
+    prefetching concurrently.
+    """
+
+    lookahead = settings.PARLHIST_CRAWLER_FETCH_LOOKAHEAD
+    # The buffered items, with the requests prefetched for them
+    buffer: collections.deque[tuple[T, dict[tuple[str, bool], Future]]] = (
+        collections.deque()
+    )
+
+    try:
+        for item in items:
+            prefetched = {}
+            try:
+                prefetched = prefetch_urls(get_urls(item), revalidate=revalidate)
+            except Exception as exc:
+                # The item will fail again when it is crawled, and is handled there
+                logger.debug("Could not prefetch %s (%s)", item, exc)
+
+            buffer.append((item, prefetched))
+            if len(buffer) > lookahead:
+                item, prefetched = buffer[0]
+                yield item
+                buffer.popleft()
+                clear_prefetched(prefetched)
+
+        while len(buffer) > 0:
+            item, prefetched = buffer[0]
+            yield item
+            buffer.popleft()
+            clear_prefetched(prefetched)
+    finally:
+        for _, prefetched in buffer:
+            clear_prefetched(prefetched)
@@ -8,27 +8,44 @@ SPDX-FileCopyrightText: 2023-2024 Martijn Staal <parlhist [at] martijn-staal.nl>
 SPDX-FileCopyrightText: 2025 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
 """
 
+import collections
 import datetime
 import logging
 import xml.etree.ElementTree as ET
 
-from bs4 import BeautifulSoup
+from typing import Iterable
+
 from celery import shared_task
 from celery.result import AsyncResult
+from django.conf import settings
+from django.db import transaction
 from django.db.models import QuerySet
+from django.utils import timezone
 
 from parlhistnl.models import Handeling, Kamerstuk, KamerstukDossier
 
+from parlhistnl.crawler.checkpoint import CrawlCheckpoint
+from parlhistnl.crawler.extraction import (
+    extract_broodtekst,
+    extract_text_from_html,
+    extract_text_from_xml,
+)
+from parlhistnl.crawler.fetch import fetch_urls, prefetch_ahead
+from parlhistnl.crawler.sink import DatabaseSink, save_changed_fields
 from parlhistnl.crawler.utils import (
     CrawlerException,
-    get_url_or_error,
-    koop_sru_api_request_all,
+    get_content_hash,
+    koop_sru_api_iter_records,
     retrieve_xml_element_text_or_fail,
     retrieve_xml_element_keyed_value_or_fail,
     shorten_kamer,
 )
-from parlhistnl.crawler.kamerstuk import crawl_kamerstuk
-from parlhistnl.crawler.kamerdossier import crawl_kamerstukdossier
+from parlhistnl.crawler.kamerstuk import (
+    crawl_kamerstuk,
+    get_existing_kamerstukken,
+    get_kamerstuk_urls,
+)
+from parlhistnl.crawler.kamerdossier import crawl_kamerstukdossiers
 
 logger = logging.getLogger(__name__)
 
@@ -62,18 +79,21 @@ def __get_behandelde_kamerstukdossiers_and_kamerstukken(
     }
 
 
-def create_or_update_handeling_from_raw_metadata_and_content(
+def parse_handeling(
     identifier: str,
-    sru_record: ET.Element,
+    sru_record: ET.Element | None,
     raw_metadata_xml: str,
-    raw_html: str,
+    raw_html: str | None,
     raw_html_is_inner_html: bool,
     raw_xml: str,
-) -> Handeling:
+    preferred_url: str | None = None,
+) -> dict:
     """
-    Create or update a Handeling from the raw metadata and raw html, either from new requests or from stored raw data
+    Parse the raw metadata, raw html and raw xml of a Handeling into the values of the Handeling fields
 
-    Always updates if an existing Handeling.
+    This does not touch the database or the network. If no sru_record is available (for example when
+    rebuilding from memoized requests), the vergaderdatum is taken from the metadata and preferred_url must be given.
+    If raw_html is None, the text is extracted from the raw xml.
     """
 
     logger.debug("Gathering information for %s", identifier)
@@ -85,9 +105,14 @@ def create_or_update_handeling_from_raw_metadata_and_content(
     )
     kamer = shorten_kamer(creator_string)
 
-    vergaderdatum_str = retrieve_xml_element_text_or_fail(
-        sru_record, ".//overheidwetgeving:datumVergadering"
-    )
+    if sru_record is not None:
+        vergaderdatum_str = retrieve_xml_element_text_or_fail(
+            sru_record, ".//overheidwetgeving:datumVergadering"
+        )
+    else:
+        vergaderdatum_str = retrieve_xml_element_keyed_value_or_fail(
+            metadata_xml, "metadata[@name='OVERHEIDop.datumVergadering']", "content"
+        )
     vergaderdatum = datetime.datetime.strptime(vergaderdatum_str, "%Y-%m-%d").date()
 
     vergaderjaar = retrieve_xml_element_keyed_value_or_fail(
@@ -112,44 +137,99 @@ def create_or_update_handeling_from_raw_metadata_and_content(
 
     data = {"uncrawled": uncrawled}
 
-    preferred_url = retrieve_xml_element_text_or_fail(sru_record, ".//gzd:preferredUrl")
+    if sru_record is not None:
+        preferred_url = retrieve_xml_element_text_or_fail(
+            sru_record, ".//gzd:preferredUrl"
+        )
+        sru_record_xml = ET.tostring(sru_record)
+    else:
+        sru_record_xml = b""
+
+    if preferred_url is None:
+        raise CrawlerException(f"No preferred url available for {identifier}")
 
     # Extract the text
-    soup = BeautifulSoup(raw_html, "html.parser")
-    if not raw_html_is_inner_html:
-        elems = soup.select("article div#broodtekst.stuk.broodtekst-container")
+    if raw_html is None:
+        tekst = extract_text_from_xml(raw_xml)
+        inner_html = ""
+    elif not raw_html_is_inner_html:
+        inner_html, tekst, matches = extract_broodtekst(raw_html)
 
-        if len(elems) > 1:
+        if matches > 1:
             logger.info(
                 "Got multiple matches where only one was expected %s", identifier
             )
 
-        inner_html = str(elems[0])
-
-        tekst = elems[0].get_text()
+        if matches == 0:
+            raise CrawlerException(f"Could not find the text of Handeling {identifier}")
     else:
-        tekst = soup.get_text()
+        tekst = extract_text_from_html(raw_html)
         inner_html = raw_html
 
-    handeling, _ = Handeling.objects.get_or_create(identifier=identifier)
-
-    handeling.kamer = kamer
-    handeling.vergaderdag = vergaderdatum
-    handeling.vergaderjaar = vergaderjaar
-    handeling.titel = titel
-    handeling.handelingtype = handelingtype
-    handeling.tekst = tekst
-    handeling.raw_html = inner_html
-    handeling.raw_xml = raw_xml
-    handeling.raw_metadata_xml = raw_metadata_xml
-    handeling.sru_record_xml = ET.tostring(sru_record)
-    handeling.preferred_url = preferred_url
-    handeling.data = data
-    handeling.save()
+    parsed = {
+        "identifier": identifier,
+        "kamer": kamer,
+        "vergaderdag": vergaderdatum,
+        "vergaderjaar": vergaderjaar,
+        "titel": titel,
+        "handelingtype": handelingtype,
+        "tekst": tekst,
+        "raw_html": inner_html,
+        "raw_xml": raw_xml,
+        "raw_metadata_xml": raw_metadata_xml,
+        "sru_record_xml": sru_record_xml,
+        "preferred_url": preferred_url,
+        "data": data,
+    }
+    parsed["content_hash"] = get_content_hash(parsed)
+
+    return parsed
+
+
+def save_parsed_handeling(parsed: dict) -> Handeling:
+    """Create or update a Handeling from the output of parse_handeling"""
+
+    handeling, created = Handeling.objects.get_or_create(
+        identifier=parsed["identifier"]
+    )
+
+    if not created and handeling.content_hash == parsed["content_hash"]:
+        logger.info(
+            "Handeling %s has not changed, not updating it", parsed["identifier"]
+        )
+        return handeling
+
+    save_changed_fields(handeling, parsed)
 
     return handeling
 
 
+def create_or_update_handeling_from_raw_metadata_and_content(
+    identifier: str,
+    sru_record: ET.Element,
+    raw_metadata_xml: str,
+    raw_html: str | None,
+    raw_html_is_inner_html: bool,
+    raw_xml: str,
+) -> Handeling:
+    """
+    Create or update a Handeling from the raw metadata and raw html, either from new requests or from stored raw data
+
+    Always updates if an existing Handeling.
+    """
+
+    parsed = parse_handeling(
+        identifier,
+        sru_record,
+        raw_metadata_xml,
+        raw_html,
+        raw_html_is_inner_html,
+        raw_xml,
+    )
+
+    return save_parsed_handeling(parsed)
+
+
 def crawl_uncrawled_behandelde_kamerstukken(handeling: Handeling) -> list[Kamerstuk]:
     """
     Crawl behandelde Kamerstukken in a Handeling, and add the relevant relations in the database.
@@ -196,6 +276,146 @@ def crawl_uncrawled_behandelde_kamerstukken(handeling: Handeling) -> list[Kamers
     return newly_added_kamerstukken
 
 
+def __get_uncrawled_kamerstuk_key(uncrawled_kamerstuk: str) -> tuple[str, str] | None:
+    """Get the (dossiernummer, ondernummer) of an uncrawled kamerstuk (e.g. "36160;5"), or None if it is invalid"""
+
+    dossiernummer, separator, ondernummer = uncrawled_kamerstuk.partition(";")
+    if separator == "" or dossiernummer == "" or ondernummer == "":
+        return None
+
+    return dossiernummer, ondernummer
+
+
+def __get_kamerstuk_ids(keys: list[tuple[str, str]]) -> dict[tuple[str, str], int]:
+    """Get the ids of the existing Kamerstukken for a list of (dossiernummer, ondernummer), in batches"""
+
+    kamerstuk_ids: dict[tuple[str, str], int] = {}
+    batch_size = settings.PARLHIST_CRAWLER_EXISTING_BATCH_SIZE
+
+    for start in range(0, len(keys), batch_size):
+        existing = get_existing_kamerstukken(keys[start : start + batch_size])
+        for key, kst in existing.items():
+            kamerstuk_ids[key] = kst.id
+
+    return kamerstuk_ids
+
+
+def crawl_all_uncrawled_behandelde_kamerstukken(
+    handelingen: QuerySet[Handeling] | None = None,
+) -> tuple[int, int]:
+    """
+    Crawl the uncrawled behandelde kamerstukken of all handelingen (or of the given handelingen) at once, and add the
+    relevant relations in the database.
+
+    Unlike crawl_uncrawled_behandelde_kamerstukken, every kamerstuk is looked up and crawled only once, however many
+    handelingen refer to it. Kamerstukken that do not exist yet are fetched in parallel and written in batches, and
+    all relations are inserted using bulk_create. Returns the number of relations and the number of kamerstukken that
+    could not be crawled.
+    """
+
+    if handelingen is None:
+        handelingen = Handeling.objects.all()
+
+    # The handelingen with uncrawled kamerstukken, and the handelingen referring to every kamerstuk
+    handeling_ids: list[int] = []
+    referring_handelingen: dict[tuple[str, str], list[int]] = collections.defaultdict(
+        list
+    )
+
+    for handeling_id, data in (
+        handelingen.exclude(data__uncrawled__behandelde_kamerstukken=[])
+        .values_list("id", "data")
+        .iterator(chunk_size=settings.PARLHIST_CRAWLER_EXISTING_BATCH_SIZE)
+    ):
+        uncrawled_kamerstukken = data.get("uncrawled", {}).get(
+            "behandelde_kamerstukken", []
+        )
+        if len(uncrawled_kamerstukken) == 0:
+            continue
+
+        handeling_ids.append(handeling_id)
+        for uncrawled_kamerstuk in uncrawled_kamerstukken:
+            key = __get_uncrawled_kamerstuk_key(uncrawled_kamerstuk)
+            if key is None:
+                logger.error("Invalid uncrawled kamerstuk %s", uncrawled_kamerstuk)
+                continue
+            referring_handelingen[key].append(handeling_id)
+
+    kamerstuk_ids = __get_kamerstuk_ids(list(referring_handelingen))
+    missing_keys = [key for key in referring_handelingen if key not in kamerstuk_ids]
+
+    logger.info(
+        "Found %s uncrawled behandelde kamerstukken in %s handelingen, crawling %s kamerstukken that do not exist yet",
+        len(referring_handelingen),
+        len(handeling_ids),
+        len(missing_keys),
+    )
+
+    # Fetch the next kamerstukken while the current one is being parsed
+    with DatabaseSink() as sink:
+        for dossiernummer, ondernummer in prefetch_ahead(
+            missing_keys, lambda key: list(get_kamerstuk_urls(*key))
+        ):
+            try:
+                crawl_kamerstuk(dossiernummer, ondernummer, sink=sink)
+            except CrawlerException as exc:
+                logger.error(
+                    "Received crawler exception when crawling kst-%s, %s, skipping (%s)",
+                    dossiernummer,
+                    ondernummer,
+                    exc,
+                )
+
+    kamerstuk_ids.update(__get_kamerstuk_ids(missing_keys))
+
+    through_model = Handeling.behandelde_kamerstukken.through
+    relations = [
+        through_model(handeling_id=handeling_id, kamerstuk_id=kamerstuk_ids[key])
+        for key, handeling_ids in referring_handelingen.items()
+        if key in kamerstuk_ids
+        for handeling_id in handeling_ids
+    ]
+
+    with transaction.atomic():
+        # A relation may already exist, e.g. if a previous run was interrupted
+        through_model.objects.bulk_create(relations, ignore_conflicts=True)
+
+        # The data may have changed while crawling, so it is read again and only the crawled kamerstukken are removed
+        # from it. Only the kamerstukken that could not be crawled remain uncrawled.
+        batch_size = settings.PARLHIST_CRAWLER_SINK_BATCH_SIZE
+        now = timezone.now()
+        for start in range(0, len(handeling_ids), batch_size):
+            updated_handelingen: list[Handeling] = []
+            for handeling in (
+                Handeling.objects.select_for_update()
+                .filter(id__in=handeling_ids[start : start + batch_size])
+                .only("id", "data")
+            ):
+                uncrawled_kamerstukken = handeling.data.get("uncrawled", {}).get(
+                    "behandelde_kamerstukken", []
+                )
+                remaining_kamerstukken = [
+                    uncrawled_kamerstuk
+                    for uncrawled_kamerstuk in uncrawled_kamerstukken
+                    if __get_uncrawled_kamerstuk_key(uncrawled_kamerstuk)
+                    not in kamerstuk_ids
+                ]
+                if len(remaining_kamerstukken) != len(uncrawled_kamerstukken):
+                    handeling.data["uncrawled"][
+                        "behandelde_kamerstukken"
+                    ] = remaining_kamerstukken
+                    handeling.bijgewerkt_op = now
+                    updated_handelingen.append(handeling)
+
+            Handeling.objects.bulk_update(
+                updated_handelingen, ["data", "bijgewerkt_op"]
+            )
+
+    failed = sum(1 for key in missing_keys if key not in kamerstuk_ids)
+
+    return len(relations), failed
+
+
 def recrawl_behandelde_kamerstukken(handeling: Handeling) -> list[Kamerstuk]:
     """Recrawl behandelde kamerstukken"""
 
@@ -226,27 +446,31 @@ def crawl_uncrawled_behandelde_kamerstukdossiers(
     newly_added_kamerstukken: list[list[Kamerstuk]] = []
     removable_uncrawled_behandelde_kamerstukdossiers: list[str] = []
 
-    for uncrawled_kamerstukdossier in uncrawled_kamerstukdossiers:
-        try:
-            crawled_kamerstukken = crawl_kamerstukdossier(uncrawled_kamerstukdossier)
-
-            for crawled_kamerstuk in crawled_kamerstukken:
-                handeling.behandelde_kamerstukken.add(crawled_kamerstuk)
-
-            handeling.behandelde_kamerstukdossiers.add(
-                crawled_kamerstukken[0].hoofddossier
-            )
+    # All dossiers are crawled using as few KOOP SRU queries as possible, dossiers of which no kamerstukken could be
+    # crawled (e.g. because their query failed) remain uncrawled
+    crawled_kamerstukdossiers = crawl_kamerstukdossiers(
+        uncrawled_kamerstukdossiers, ignore_failure=True
+    )
 
-            newly_added_kamerstukken.append(crawled_kamerstukken)
-            removable_uncrawled_behandelde_kamerstukdossiers.append(
-                uncrawled_kamerstukdossier
-            )
-        except CrawlerException as exc:
+    for uncrawled_kamerstukdossier in uncrawled_kamerstukdossiers:
+        crawled_kamerstukken = crawled_kamerstukdossiers[uncrawled_kamerstukdossier]
+        if len(crawled_kamerstukken) == 0:
             logger.fatal(
-                "Received crawler exception while crawling kamerstukdossier %s, skipping (%s)",
+                "Could not crawl any kamerstukken in kamerstukdossier %s, skipping",
                 uncrawled_kamerstukdossier,
-                exc,
             )
+            continue
+
+        handeling.behandelde_kamerstukken.add(*crawled_kamerstukken)
+
+        handeling.behandelde_kamerstukdossiers.add(
+            crawled_kamerstukken[0].hoofddossier
+        )
+
+        newly_added_kamerstukken.append(crawled_kamerstukken)
+        removable_uncrawled_behandelde_kamerstukdossiers.append(
+            uncrawled_kamerstukdossier
+        )
 
     for removable_kamerstukdossier in removable_uncrawled_behandelde_kamerstukdossiers:
         handeling.data["uncrawled"]["behandelde_kamerstukdossiers"].remove(
@@ -265,29 +489,19 @@ def recrawl_behandelde_kamerstukdossiers(handeling: Handeling) -> list[list[Kame
         handeling.behandelde_kamerstukdossiers.all()
     )
 
-    crawled_kamerstukken: list[list[Kamerstuk]] = []
-
-    for kamerstukdossier in kamerstukdossiers:
-        ksts = crawl_kamerstukdossier(
-            kamerstukdossier.dossiernummer, update=True, ignore_failure=True
-        )
-
-        crawled_kamerstukken.append(ksts)
-
-    return crawled_kamerstukken
-
-
-def crawl_handeling_using_sru_record(sru_record: ET.Element) -> Handeling:
-    """Crawl a Handeling using a KOOP SRU api record (parsed xml)"""
+    return list(
+        crawl_kamerstukdossiers(
+            [kamerstukdossier.dossiernummer for kamerstukdossier in kamerstukdossiers],
+            update=True,
+            ignore_failure=True,
+        ).values()
+    )
 
-    identifier = retrieve_xml_element_text_or_fail(sru_record, ".//dcterms:identifier")
 
-    logger.info("Crawling %s", identifier)
+def get_handeling_urls(sru_record: ET.Element) -> tuple[str, str, str]:
+    """Get the urls of the html (the preferred url), the metadata xml and the xml of a Handeling from its SRU record"""
 
     preferred_url = retrieve_xml_element_text_or_fail(sru_record, ".//gzd:preferredUrl")
-    html_url = retrieve_xml_element_text_or_fail(
-        sru_record, ".//gzd:itemUrl[@manifestation='html']"
-    )
     xml_url = retrieve_xml_element_text_or_fail(
         sru_record, ".//gzd:itemUrl[@manifestation='xml']"
     )
@@ -295,27 +509,84 @@ def crawl_handeling_using_sru_record(sru_record: ET.Element) -> Handeling:
         sru_record, ".//gzd:itemUrl[@manifestation='metadata']"
     )
 
-    html_response = get_url_or_error(preferred_url)
-    metadata_xml_response = get_url_or_error(metadata_xml_url)
-    xml_response = get_url_or_error(xml_url)
+    return preferred_url, metadata_xml_url, xml_url
+
+
+def get_handeling_fetch_urls(sru_record: ET.Element) -> list[str]:
+    """Get the urls crawl_handeling_using_sru_record requests: the html is skipped if PARLHIST_CRAWLER_TEXT_FROM_XML"""
+
+    preferred_url, metadata_xml_url, xml_url = get_handeling_urls(sru_record)
+
+    if settings.PARLHIST_CRAWLER_TEXT_FROM_XML:
+        return [metadata_xml_url, xml_url]
+
+    return [metadata_xml_url, xml_url, preferred_url]
+
+
+def crawl_handeling_using_sru_record(
+    sru_record: ET.Element, sink: DatabaseSink | None = None, update=False
+) -> Handeling:
+    """
+    Crawl a Handeling using a KOOP SRU api record (parsed xml), adding it to sink instead of saving it if given.
+
+    With update, memoized requests are revalidated, so that a modified Handeling is not rebuilt from an old copy.
+    """
+
+    identifier = retrieve_xml_element_text_or_fail(sru_record, ".//dcterms:identifier")
+
+    logger.info("Crawling %s", identifier)
 
-    handeling = create_or_update_handeling_from_raw_metadata_and_content(
+    urls = get_handeling_fetch_urls(sru_record)
+    futures = fetch_urls(urls, revalidate=update)
+
+    metadata_xml_response = futures[0].result()
+    xml_response = futures[1].result()
+    if len(futures) > 2:
+        raw_html = futures[2].result().text
+    else:
+        raw_html = None
+
+    parsed = parse_handeling(
         identifier,
         sru_record,
         metadata_xml_response.text,
-        html_response.text,
+        raw_html,
         False,
         xml_response.text,
     )
 
-    return handeling
+    if raw_html is None and parsed["tekst"] == "":
+        logger.warning(
+            "Could not extract the text of %s from its xml, requesting the html",
+            identifier,
+        )
+        (html_future,) = fetch_urls(
+            [get_handeling_urls(sru_record)[0]], revalidate=update
+        )
+        parsed = parse_handeling(
+            identifier,
+            sru_record,
+            metadata_xml_response.text,
+            html_future.result().text,
+            False,
+            xml_response.text,
+        )
+
+    if sink is not None:
+        return sink.add_handeling(parsed)
+
+    return save_parsed_handeling(parsed)
 
 
 @shared_task
-def crawl_handeling_using_sru_record_task(sru_record_string: str) -> int:
+def crawl_handeling_using_sru_record_task(
+    sru_record_string: str, update=False
+) -> int:
     """Wrapper function to call crawl_handeling_using_sru_record as a celery task"""
 
-    handeling = crawl_handeling_using_sru_record(ET.fromstring(sru_record_string))
+    handeling = crawl_handeling_using_sru_record(
+        ET.fromstring(sru_record_string), update=update
+    )
 
     return handeling.pk
 
@@ -332,31 +603,82 @@ def crawl_all_handelingen_within_koop_sru_query(
     Note that your query MUST ensure that only entries with w.publicatienaam=Handelingen are received.
     """
 
+    # Crawling starts as soon as the first page of records has been received
+    return crawl_all_handelingen_from_sru_records(
+        koop_sru_api_iter_records(query), queue_tasks=queue_tasks
+    )
+
+
+def crawl_all_handelingen_from_sru_records(
+    records: Iterable[ET.Element],
+    update=False,
+    queue_tasks=False,
+    checkpoint: CrawlCheckpoint | None = None,
+) -> list[Handeling] | list[AsyncResult]:
+    """
+    Crawl the Handelingen of the given KOOP SRU records, marking every record as processed in checkpoint.
+
+    Existing Handelingen are always updated if they have changed, with update their memoized requests are also
+    revalidated (e.g. when harvesting modified Handelingen).
+
+    Crawled Handelingen are written to the database in batches (see DatabaseSink), the checkpoint is only stored once
+    the Handelingen before it have been written.
+    """
+
     results = []
-    records = koop_sru_api_request_all(query)
+    sink = None
+
+    if not queue_tasks:
+        # Handelingen are always updated
+        sink = DatabaseSink(update=True)
+        if checkpoint is not None:
+            checkpoint.before_save = sink.flush
+
+        # Fetch the next Handelingen while the current one is being parsed and saved
+        records = prefetch_ahead(
+            records, get_handeling_fetch_urls, revalidate=update
+        )
 
     for record in records:
+        new_result = None
+        failed = False
+
         try:
             logger.debug("Crawling %s", record)
 
             if queue_tasks:
                 async_handeling = crawl_handeling_using_sru_record_task.delay(
-                    ET.tostring(record, encoding="unicode")
+                    ET.tostring(record, encoding="unicode"), update=update
                 )
                 results.append(async_handeling)
             else:
-                new_result = crawl_handeling_using_sru_record(record)
+                new_result = crawl_handeling_using_sru_record(
+                    record, sink=sink, update=update
+                )
                 results.append(new_result)
         except CrawlerException:
+            failed = True
             logger.error("Failed to crawl Handeling record %s", record)
 
+        if checkpoint is not None:
+            checkpoint.processed(record, failed=failed, publication=new_result)
+
+    if sink is not None:
+        sink.flush()
+        # Publications that could not be written have not been crawled
+        results = [result for result in results if result.pk is not None]
+
     return results
 
 
 def crawl_all_handelingen_in_vergaderjaar(
-    vergaderjaar: str, queue_tasks=False
+    vergaderjaar: str, queue_tasks=False, resume=False
 ) -> list[Handeling] | list[AsyncResult]:
-    """Crawl all publications in the Handelingen with a publicatiedatum within a vergaderjaar, e.g. 2020-2021, 1996-1997"""
+    """
+    Crawl all publications in the Handelingen with a publicatiedatum within a vergaderjaar, e.g. 2020-2021, 1996-1997
+
+    The progress is stored in a checkpoint, with resume=True an interrupted crawl continues from this checkpoint.
+    """
 
     today = datetime.date.today()
     current_year = today.year
@@ -368,7 +690,20 @@ def crawl_all_handelingen_in_vergaderjaar(
     if vergaderjaar not in vergaderjaren:
         raise CrawlerException(f"Provided invalid vergaderjaar {vergaderjaar}")
 
-    return crawl_all_handelingen_within_koop_sru_query(
-        f"(c.product-area==officielepublicaties AND w.publicatienaam=Handelingen AND w.vergaderjaar={vergaderjaar})",
-        queue_tasks=queue_tasks,
+    # Most publications of a vergaderjaar are published between September and September, but not all of them:
+    # the planner adds separate queries for publications before or after this period.
+    first_year, second_year = (int(year) for year in vergaderjaar.split("-"))
+
+    checkpoint = CrawlCheckpoint(
+        f"c.product-area==officielepublicaties AND w.publicatienaam=Handelingen AND w.vergaderjaar={vergaderjaar}",
+        datetime.date(first_year, 9, 1),
+        datetime.date(second_year, 9, 30),
+        resume=resume,
+        include_outside_window=True,
+    )
+    results = crawl_all_handelingen_from_sru_records(
+        checkpoint.iter_records(), queue_tasks=queue_tasks, checkpoint=checkpoint
     )
+    checkpoint.complete()
+
+    return results
@@ -0,0 +1,131 @@
+"""
+parlhist/parlhistnl/crawler/harvest.py
+
+Incremental harvesting: crawl only the publications that were added or modified since the last run.
+
+For every type of publication (kst, stb and h) a HarvestState stores a watermark: the date on which the last
+successful run started. The next run only lists the records with a dt.modified on or after this date, and crawls
+them with update=True, so that modified publications are updated as well.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import datetime
+import logging
+import xml.etree.ElementTree as ET
+from typing import Iterable, Iterator
+
+from celery import shared_task
+
+from parlhistnl.models import HarvestState
+from parlhistnl.crawler.handeling import crawl_all_handelingen_from_sru_records
+from parlhistnl.crawler.kamerstuk import crawl_all_kamerstukken_from_sru_records
+from parlhistnl.crawler.staatsblad import (
+    crawl_all_staatsblad_publicaties_from_sru_records,
+)
+from parlhistnl.crawler.utils import CrawlerException, koop_sru_api_iter_records
+
+logger = logging.getLogger(__name__)
+
+HARVEST_QUERIES = {
+    "kst": "c.product-area==officielepublicaties AND dt.type=Kamerstuk",
+    "stb": "w.publicatienaam=Staatsblad",
+    "h": "c.product-area==officielepublicaties AND w.publicatienaam=Handelingen",
+}
+
+
+def get_harvest_query(publicatietype: str, since: datetime.date) -> str:
+    """Get the KOOP SRU query for all publications of publicatietype modified on or after since"""
+
+    if publicatietype not in HARVEST_QUERIES:
+        raise CrawlerException(f"Received invalid publicatietype {publicatietype}")
+
+    return f"{HARVEST_QUERIES[publicatietype]} AND dt.modified>={since.isoformat()}"
+
+
+def crawl_since_last_run(
+    publicatietype: str, since: datetime.date | None = None, queue_tasks=False
+) -> list:
+    """
+    Crawl all publications of publicatietype (kst, stb or h) modified since the last run, or since the given date.
+
+    The watermark is only moved forward if all listed records were crawled (or queued) successfully, otherwise the
+    next run lists the same records again.
+    """
+
+    started_on = datetime.date.today()
+
+    if since is None:
+        try:
+            since = HarvestState.objects.get(publicatietype=publicatietype).watermark
+        except HarvestState.DoesNotExist as exc:
+            raise CrawlerException(
+                f"{publicatietype} has not been harvested before, specify a date to harvest since"
+            ) from exc
+
+    query = get_harvest_query(publicatietype, since)
+    logger.info("Harvesting %s modified since %s", publicatietype, since)
+
+    number_of_records = 0
+
+    def count_records(records: Iterable[ET.Element]) -> Iterator[ET.Element]:
+        nonlocal number_of_records
+        for record in records:
+            number_of_records += 1
+            yield record
+
+    # The listing itself must not be memoized, as it changes every day
+    records = count_records(koop_sru_api_iter_records(query, memoize=False))
+
+    if publicatietype == "kst":
+        results = crawl_all_kamerstukken_from_sru_records(
+            records, update=True, queue_tasks=queue_tasks
+        )
+    elif publicatietype == "stb":
+        results = crawl_all_staatsblad_publicaties_from_sru_records(
+            records, update=True, queue_tasks=queue_tasks
+        )
+    else:
+        results = crawl_all_handelingen_from_sru_records(
+            records, update=True, queue_tasks=queue_tasks
+        )
+
+    if len(results) < number_of_records:
+        logger.error(
+            "Failed to crawl %s of %s records of %s, not moving the watermark %s",
+            number_of_records - len(results),
+            number_of_records,
+            publicatietype,
+            since,
+        )
+    else:
+        HarvestState.objects.update_or_create(
+            publicatietype=publicatietype, defaults={"watermark": started_on}
+        )
+        logger.info(
+            "Harvested %s records of %s, moved the watermark to %s",
+            number_of_records,
+            publicatietype,
+            started_on,
+        )
+
+    return results
+
+
+@shared_task
+def crawl_since_last_run_task(
+    publicatietypen: list[str] | None = None,
+) -> dict[str, int]:
+    """Celery task to harvest the given publicatietypen (default: all), e.g. nightly using celery beat"""
+
+    if publicatietypen is None:
+        publicatietypen = list(HARVEST_QUERIES)
+
+    crawled = {}
+    for publicatietype in publicatietypen:
+        crawled[publicatietype] = len(crawl_since_last_run(publicatietype))
+
+    return crawled
@@ -8,34 +8,252 @@ SPDX-FileCopyrightText: 2025 Universiteit Leiden <m.a.staal [at] law.leidenuniv.
 SPDX-License-Identifier: EUPL-1.2
 """
 
+import datetime
 import logging
+import xml.etree.ElementTree as ET
 
-from parlhistnl.models import Kamerstuk
-from parlhistnl.crawler.utils import CrawlerException
-from parlhistnl.crawler.kamerstuk import crawl_all_kamerstukken_within_koop_sru_query
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from parlhistnl.models import Kamerstuk, KamerstukDossier
+from parlhistnl.crawler.utils import (
+    CrawlerException,
+    koop_sru_api_iter_records,
+    XML_NAMESPACES,
+)
+from parlhistnl.crawler.kamerstuk import crawl_all_kamerstukken_from_sru_records
 
 logger = logging.getLogger(__name__)
 
 
+def get_kamerstukdossiers_query(dossiernummers: list[str]) -> str:
+    """Get the KOOP SRU query for all kamerstukken in any of the given kamerstukdossiers"""
+
+    dossiernummer_clauses = " OR ".join(
+        f"w.dossiernummer=={dossiernummer}" for dossiernummer in dossiernummers
+    )
+
+    return f"(c.product-area=officielepublicaties AND ({dossiernummer_clauses}) AND w.publicatienaam=Kamerstuk)"
+
+
+def __get_record_dossiernummers(record: ET.Element) -> list[str]:
+    """Get all dossiernummers of a kamerstuk from its KOOP SRU record, a kamerstuk can belong to multiple dossiers"""
+
+    return [
+        element.text
+        for element in record.findall(
+            ".//overheidwetgeving:dossiernummer", XML_NAMESPACES
+        )
+    ]
+
+
+def __crawl_kamerstukdossier_batch(
+    dossiernummers: list[str], update=False
+) -> tuple[dict[str, list[Kamerstuk]], set[str]]:
+    """
+    Crawl all kamerstukken in the given kamerstukdossiers using a single KOOP SRU query. Returns the kamerstukken per
+    dossiernummer, and the dossiernummers of the completely crawled dossiers, of which the time of crawling is
+    recorded. Raises an exception if the query fails.
+
+    Every kamerstuk is assigned to all requested dossiers listed in its KOOP SRU record.
+    """
+
+    logger.info("Crawling kamerstukdossiers %s", dossiernummers)
+    crawled_at = timezone.now()
+
+    query = get_kamerstukdossiers_query(dossiernummers)
+    logger.debug("Generated query %s", query)
+
+    requested = set(dossiernummers)
+    kamerstukken: dict[str, list[Kamerstuk]] = {
+        dossiernummer: [] for dossiernummer in dossiernummers
+    }
+    incomplete: set[str] = set()
+
+    def assign_to_dossiers(record: ET.Element, kst: Kamerstuk | None) -> None:
+        record_dossiernummers = __get_record_dossiernummers(record)
+        assigned = [
+            dossiernummer
+            for dossiernummer in record_dossiernummers
+            if dossiernummer in requested
+        ]
+
+        if len(assigned) == 0:
+            logger.warning(
+                "Could not assign the record of kamerstuk %s in dossiers %s to any of the kamerstukdossiers %s",
+                kst,
+                record_dossiernummers,
+                dossiernummers,
+            )
+        elif kst is None:
+            incomplete.update(assigned)
+        else:
+            for dossiernummer in assigned:
+                kamerstukken[dossiernummer].append(kst)
+
+    crawl_all_kamerstukken_from_sru_records(
+        koop_sru_api_iter_records(query),
+        update=update,
+        on_processed=assign_to_dossiers,
+    )
+
+    # Kamerstukken that could not be written have no id
+    for dossiernummer, dossier_kamerstukken in kamerstukken.items():
+        written_kamerstukken = [
+            kst for kst in dossier_kamerstukken if kst.pk is not None
+        ]
+        if len(written_kamerstukken) != len(dossier_kamerstukken):
+            incomplete.add(dossiernummer)
+        kamerstukken[dossiernummer] = written_kamerstukken
+
+    # A dossier is only completely crawled if the query found kamerstukken in it, and all of them have been written
+    completed = {
+        dossiernummer
+        for dossiernummer, dossier_kamerstukken in kamerstukken.items()
+        if len(dossier_kamerstukken) > 0 and dossiernummer not in incomplete
+    }
+
+    if len(completed) < len(dossiernummers):
+        logger.warning(
+            "Could not crawl all kamerstukken in kamerstukdossiers %s",
+            sorted(requested - completed),
+        )
+
+    KamerstukDossier.objects.filter(dossiernummer__in=completed).update(
+        laatst_gecrawld_op=crawled_at
+    )
+
+    return kamerstukken, completed
+
+
+def crawl_kamerstukdossiers(
+    dossiernummers: Iterable[str], update=False, ignore_failure=False
+) -> dict[str, list[Kamerstuk]]:
+    """
+    Crawl all kamerstukken in the given kamerstukdossiers, and record when the dossiers were completely crawled.
+    Returns the kamerstukken per dossiernummer.
+
+    The dossiers are combined into KOOP SRU queries of at most PARLHIST_CRAWLER_SRU_DOSSIERS_PER_QUERY dossiers, the
+    records of which are crawled together and afterwards assigned to their dossiers. If a query fails, a
+    CrawlerException is raised, unless ignore_failure is true, in which case its dossiers have no kamerstukken.
+    """
+
+    unique_dossiernummers = sorted(set(dossiernummers))
+    dossiers_per_query = settings.PARLHIST_CRAWLER_SRU_DOSSIERS_PER_QUERY
+
+    kamerstukken: dict[str, list[Kamerstuk]] = {
+        dossiernummer: [] for dossiernummer in unique_dossiernummers
+    }
+
+    for start in range(0, len(unique_dossiernummers), dossiers_per_query):
+        batch = unique_dossiernummers[start : start + dossiers_per_query]
+
+        try:
+            batch_kamerstukken, _ = __crawl_kamerstukdossier_batch(batch, update=update)
+        except Exception as exc:
+            logger.fatal("Got exception %s", exc)
+            if ignore_failure:
+                continue
+            else:
+                raise CrawlerException(str(exc)) from exc
+
+        kamerstukken.update(batch_kamerstukken)
+
+    return kamerstukken
+
+
 def crawl_kamerstukdossier(
     dossiernummer: str, update=False, ignore_failure=False
 ) -> list[Kamerstuk]:
-    """Crawl all kamerstukken in a kamerstukdossier"""
+    """Crawl all kamerstukken in a kamerstukdossier, and record when the dossier was crawled"""
 
-    logger.info("Crawling kamerstukdossier %s", dossiernummer)
+    return crawl_kamerstukdossiers(
+        [dossiernummer], update=update, ignore_failure=ignore_failure
+    )[dossiernummer]
 
-    query = f"(c.product-area=officielepublicaties AND w.dossiernummer=={dossiernummer} AND w.publicatienaam=Kamerstuk)"
-    logger.debug("Generated query %s", query)
+
+def __recrawl_kamerstukdossiers(dossiernummers: list[str]) -> int:
+    """Recrawl kamerstukdossiers in a worker thread, returns the number of completely recrawled dossiers"""
 
     try:
-        kamerstukken = crawl_all_kamerstukken_within_koop_sru_query(
-            query, update=update
-        )
+        _, completed = __crawl_kamerstukdossier_batch(dossiernummers, update=True)
+        return len(completed)
     except Exception as exc:
-        logger.fatal("Got exception %s", exc)
-        if ignore_failure:
-            pass
-        else:
-            raise CrawlerException from exc
+        logger.error("Could not recrawl kamerstukdossiers %s (%s)", dossiernummers, exc)
+        return 0
+    finally:
+        # Every worker thread has its own database connection
+        connections.close_all()
 
-    return kamerstukken
+
+def get_recently_crawled_kamerstukdossiers(
+    dossiernummers: list[str], max_age: datetime.timedelta
+) -> set[str]:
+    """Get the dossiernummers of the kamerstukdossiers that were crawled less than max_age ago"""
+
+    crawled_after = timezone.now() - max_age
+    batch_size = settings.PARLHIST_CRAWLER_EXISTING_BATCH_SIZE
+
+    recently_crawled: set[str] = set()
+    for start in range(0, len(dossiernummers), batch_size):
+        recently_crawled.update(
+            KamerstukDossier.objects.filter(
+                dossiernummer__in=dossiernummers[start : start + batch_size],
+                laatst_gecrawld_op__gte=crawled_after,
+            ).values_list("dossiernummer", flat=True)
+        )
+
+    return recently_crawled
+
+
+def recrawl_kamerstukdossiers(
+    dossiernummers: Iterable[str],
+    max_age: datetime.timedelta | None = None,
+    workers: int | None = None,
+) -> tuple[int, int, int]:
+    """
+    Recrawl (update) many kamerstukdossiers, crawling every dossier only once. Dossiers that were crawled less than
+    max_age ago (default PARLHIST_CRAWLER_DOSSIER_MAX_AGE_DAYS) are skipped, the other dossiers are crawled in
+    batches (see crawl_kamerstukdossiers), concurrently by workers threads (default PARLHIST_CRAWLER_DOSSIER_WORKERS).
+
+    Returns the number of completely recrawled, skipped and failed dossiers.
+    """
+
+    if max_age is None:
+        max_age = datetime.timedelta(days=settings.PARLHIST_CRAWLER_DOSSIER_MAX_AGE_DAYS)
+    if workers is None:
+        workers = settings.PARLHIST_CRAWLER_DOSSIER_WORKERS
+
+    unique_dossiernummers = sorted(set(dossiernummers))
+    recently_crawled = get_recently_crawled_kamerstukdossiers(
+        unique_dossiernummers, max_age
+    )
+    planned = [
+        dossiernummer
+        for dossiernummer in unique_dossiernummers
+        if dossiernummer not in recently_crawled
+    ]
+
+    logger.info(
+        "Recrawling %s kamerstukdossiers, skipping %s recently crawled kamerstukdossiers",
+        len(planned),
+        len(recently_crawled),
+    )
+
+    # Every worker crawls the dossiers of one KOOP SRU query (see crawl_kamerstukdossiers). The dossiers are crawled by
+    # their own threads, as crawling them waits for the fetch pool.
+    dossiers_per_query = settings.PARLHIST_CRAWLER_SRU_DOSSIERS_PER_QUERY
+    batches = [
+        planned[start : start + dossiers_per_query]
+        for start in range(0, len(planned), dossiers_per_query)
+    ]
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="parlhist-dossier"
+    ) as executor:
+        recrawled = sum(executor.map(__recrawl_kamerstukdossiers, batches))
+
+    return recrawled, len(recently_crawled), len(planned) - recrawled
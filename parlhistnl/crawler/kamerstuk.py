@@ -12,20 +12,47 @@ import datetime
 import logging
 import xml.etree.ElementTree as ET
 
-from bs4 import BeautifulSoup
+from typing import Any, Callable, Iterable
+
 from celery import shared_task
 from celery.result import AsyncResult
-
-from parlhistnl.models import Kamerstuk, KamerstukDossier
+from django.conf import settings
+
+from parlhistnl.models import Kamerstuk
+from parlhistnl.crawler.checkpoint import CrawlCheckpoint
+from parlhistnl.crawler.extraction import extract_broodtekst, extract_text_from_html
+from parlhistnl.crawler.fetch import fetch_urls, prefetch_ahead
+from parlhistnl.crawler.kamerstuktype import (
+    classify_kamerstuktype,
+    get_opgegeven_kamerstuktype,
+)
+from parlhistnl.crawler.sink import (
+    KAMERSTUK_FIELDS,
+    DatabaseSink,
+    get_kamerstukdossier_ids,
+    save_changed_fields,
+)
 from parlhistnl.crawler.utils import (
     CrawlerException,
-    get_url_or_error,
-    koop_sru_api_request_all,
+    get_content_hash,
+    get_metadata_xml_from_sru_record,
+    get_missing_metadata,
+    iter_records_with_existing,
+    koop_sru_api_iter_records,
     XML_NAMESPACES,
 )
 
 logger = logging.getLogger(__name__)
 
+# The metadata used by parse_kamerstuk, metadata.xml is requested if any of it is missing from the KOOP SRU record
+KAMERSTUK_REQUIRED_METADATA = [
+    "metadata[@name='DCTERMS.issued']",
+    "metadata[@name='OVERHEIDop.dossiertitel']",
+    "metadata[@name='OVERHEIDop.documenttitel']",
+    "metadata[@name='OVERHEIDop.vergaderjaar']",
+    "metadata[@scheme='OVERHEID.StatenGeneraal']",
+]
+
 
 def __get_documentdatum(xml: ET.Element) -> datetime.date:
     """Get the documentdatum from from a parsed metadata xml"""
@@ -103,206 +130,21 @@ def __get_kamer(xml: ET.Element) -> str:
         return "tk"
 
 
-def __get_kamerstuktype_from_title(
-    title: str, record: ET.Element, is_tail=False
-) -> str:
-    """Guess the kamerstuk document type from the title"""
+def parse_kamerstuk(
+    dossiernummer: str,
+    ondernummer: str,
+    raw_html: str,
+    raw_metadata_xml: str,
+    raw_html_is_inner_html=False,
+) -> dict:
+    """
+    Parse the raw html and raw metadata xml of a kamerstuk into the values of the Kamerstuk fields
 
-    title = title.lower()
-    title = title.replace("0", "o")
-    title = title.strip()
+    This does not touch the database or the network, so that it can be used to (re)build Kamerstukken from
+    memoized requests or stored raw data. The dossiertitel is included for the KamerstukDossier.
+    """
 
-    title_split = title.split("; ")
-    try:
-        title_tail = title_split[1]
-    except IndexError:
-        title_tail = ""
-
-    try:
-        opgegeven_kamerstuktype = record.find(
-            ".//overheidwetgeving:subrubriek[@scheme='OVERHEIDop.KamerstukTypen']",
-            XML_NAMESPACES,
-        ).text
-    except AttributeError:
-        opgegeven_kamerstuktype = ""
-
-    if opgegeven_kamerstuktype == "Amendement":
-        return Kamerstuk.KamerstukType.AMENDEMENT
-
-    if opgegeven_kamerstuktype == "Motie":
-        return Kamerstuk.KamerstukType.MOTIE
-
-    if opgegeven_kamerstuktype == "Voorstel van wet":
-        return Kamerstuk.KamerstukType.WETSVOORSTEL
-
-    if opgegeven_kamerstuktype == "Koninklijke boodschap" or title.startswith(
-        "koninklijke boodschap"
-    ):
-        return Kamerstuk.KamerstukType.KONINKLIJKE_BOODSCHAP
-
-    if title.startswith("geleidende brief"):
-        return Kamerstuk.KamerstukType.GELEIDENDE_BRIEF
-
-    if opgegeven_kamerstuktype == "Memorie van toelichting":
-        return Kamerstuk.KamerstukType.MEMORIE_VAN_TOELICHTING
-
-    if opgegeven_kamerstuktype == "Jaarverslag":
-        return Kamerstuk.KamerstukType.JAARVERSLAG
-
-    if opgegeven_kamerstuktype == "Verslag":
-        return Kamerstuk.KamerstukType.VERSLAG
-
-    if title.startswith("motie") or title.startswith("gewijzigde motie"):
-        return Kamerstuk.KamerstukType.MOTIE
-
-    if (
-        title.startswith("amendement")
-        or title.startswith("gewijzigd amendement")
-        or title.startswith("nader gewijzigd amendement")
-        or title.startswith("subamendement")
-        or title.startswith("gewijzigd subamendement")
-        or title.startswith("tweede nader gewijzigd amendement")
-        or title.startswith("derde nader gewijzigd amendement")
-        or title.startswith("vierde nader gewijzigd amendement")
-        or title.startswith("amdendement")
-    ):
-        return Kamerstuk.KamerstukType.AMENDEMENT
-
-    if (
-        title.startswith("voorstel van wet")
-        or title.startswith("gewijzigd voorstel van wet")
-        or title.startswith("ontwerp van wet")
-    ):
-        return Kamerstuk.KamerstukType.WETSVOORSTEL
-
-    if title.endswith("voorstel van wet") or title.endswith(
-        "gewijzigd voorstel van wet"
-    ):
-        return Kamerstuk.KamerstukType.WETSVOORSTEL
-
-    if (
-        title.startswith("advies afdeling advisering raad van state")
-        or title.startswith("advies raad van state")
-        or title.startswith("advies en nader rapport")
-    ):
-        return Kamerstuk.KamerstukType.ADVIES_RVS
-
-    if title.startswith("nota naar aanleiding van het") or title.endswith(
-        "nota naar aanleiding van het"
-    ):
-        return Kamerstuk.KamerstukType.NOTA_NA_VERSLAG
-
-    if (
-        title.startswith("voorlopig verslag")
-        or title.startswith("verslag")
-        or title.startswith("eindverslag")
-        or title.startswith("nader voorlopig verslag")
-    ):
-        return Kamerstuk.KamerstukType.VERSLAG
-
-    if (
-        title.endswith("voorlopig verslag")
-        or title.endswith("verslag")
-        or title.endswith("eindverslag")
-        or title.startswith("nader voorlopig verslag")
-    ):
-        return Kamerstuk.KamerstukType.VERSLAG
-
-    if title.startswith("memorie van toelichting") or title.endswith(
-        "memorie van toelichting"
-    ):
-        return Kamerstuk.KamerstukType.MEMORIE_VAN_TOELICHTING
-
-    if title.startswith("memorie van antwoord") or title.startswith(
-        "nadere memorie van antwoord"
-    ):
-        return Kamerstuk.KamerstukType.MEMORIE_VAN_ANTWOORD
-
-    if title.endswith("memorie van antwoord") or title.endswith(
-        "nadere memorie van antwoord"
-    ):
-        return Kamerstuk.KamerstukType.MEMORIE_VAN_ANTWOORD
-
-    if title.startswith(
-        "voorlichting van de afdeling advisering van de raad van state"
-    ):
-        return Kamerstuk.KamerstukType.VOORLICHTING_RVS
-
-    if title.lower().startswith("jaarverslag"):
-        return Kamerstuk.KamerstukType.JAARVERSLAG
-
-    if title.startswith("lijst van vragen en antwoorden"):
-        return Kamerstuk.KamerstukType.LIJST_VAN_VRAGEN_EN_ANTWOORDEN
-
-    if title.startswith("nota van verbetering"):
-        return Kamerstuk.KamerstukType.NOTA_VAN_VERBETERING
-
-    if "nota van wijziging" in title.lower():
-        # Beware, this lax check may result in errors
-        return Kamerstuk.KamerstukType.NOTA_VAN_WIJZIGING
-
-    if (
-        opgegeven_kamerstuktype == "Brief"
-        or title.startswith("brief")
-        or title.startswith("kabinetsreactie")
-        or title.startswith("reactie op")
-    ):
-        return Kamerstuk.KamerstukType.BRIEF
-
-    print(f"Can't determine KamerstukType for {title}, trying to run on the tail")
-
-    if not is_tail:
-        tail_type = __get_kamerstuktype_from_title(title_tail, record, is_tail=True)
-
-        print(f"Found type {tail_type} using tail {title_tail}")
-        return tail_type
-
-    return Kamerstuk.KamerstukType.ONBEKEND
-
-
-# TODO split this up just like handeling to enable easy re-indexing of existing kamerstukken
-def crawl_kamerstuk(
-    dossiernummer: str, ondernummer: str, update=False, preferred_url=None
-) -> Kamerstuk:
-    """Crawl a kamerstuk"""
-
-    logger.info("Crawling kamerstuk %s, %s", dossiernummer, ondernummer)
-
-    if preferred_url is None:
-        base_url: str = (
-            f"https://zoek.officielebekendmakingen.nl/kst-{dossiernummer}-{ondernummer}"
-        )
-        html_url = f"{base_url}.html"
-        meta_url = f"{base_url}/metadata.xml"
-    else:
-        html_url: str = preferred_url
-        meta_url = html_url.replace(".html", "/metadata.xml")
-
-    try:
-        existing_kst = Kamerstuk.objects.get(
-            hoofddossier__dossiernummer=dossiernummer, ondernummer=ondernummer
-        )
-        logger.info("Kamerstuk already exists")
-        if not update:
-            logger.info("Update set to false, returning existing kamerstuk")
-            return existing_kst
-    except Kamerstuk.DoesNotExist:
-        existing_kst = None
-
-    # First, check if it could actually exist
-    try:
-        text_response = get_url_or_error(html_url)
-    except CrawlerException as exc:
-        logger.critical("This kamerstuk seems to not exist")
-        raise CrawlerException("This kamerstuk seems to not exist") from exc
-
-    try:
-        meta_response = get_url_or_error(meta_url)
-    except CrawlerException as exc:
-        logger.fatal("This handeling seems to not exist")
-        raise CrawlerException("This handeling seems to not exist") from exc
-
-    xml = ET.fromstring(meta_response.text)
+    xml = ET.fromstring(raw_metadata_xml)
 
     try:
         documentdatum = __get_documentdatum(xml)
@@ -347,65 +189,222 @@ def crawl_kamerstuk(
         )
         raise CrawlerException("Failed to get core metadata") from exc
 
+    kamerstuktype = classify_kamerstuktype(
+        documenttitel, get_opgegeven_kamerstuktype(xml)
+    )
+
+    if raw_html_is_inner_html:
+        inner_html = raw_html
+        tekst = extract_text_from_html(raw_html)
+    else:
+        inner_html, tekst, matches = extract_broodtekst(raw_html)
+
+        if matches > 1:
+            logger.info(
+                "Got multiple matches where only one was expected %s %s",
+                dossiernummer,
+                ondernummer,
+            )
+
+        if matches == 0:
+            raise CrawlerException(
+                f"Could not find the text of kamerstuk {dossiernummer} {ondernummer}"
+            )
+
+    parsed = {
+        "dossiernummer": dossiernummer,
+        "ondernummer": ondernummer,
+        "dossiertitel": dossiertitel,
+        "vergaderjaar": vergaderjaar,
+        "kamer": kamer,
+        "kamerstuktype": kamerstuktype,
+        "documenttitel": documenttitel,
+        "indiener": indiener,
+        "tekst": tekst,
+        "raw_html": inner_html,
+        "raw_metadata_xml": raw_metadata_xml,
+        "documentdatum": documentdatum,
+    }
+    parsed["content_hash"] = get_content_hash(parsed)
+
+    return parsed
+
+
+def get_stored_kamerstuk_content_hash(
+    fields: dict[str, Any], dossiernummer: str, dossiertitel: str
+) -> str:
+    """
+    Get the content hash of a stored kamerstuk from the values of its KAMERSTUK_FIELDS and the dossiernummer and
+    dossiertitel of its hoofddossier, as parse_kamerstuk computes it. Used when fields are changed without parsing the
+    kamerstuk again, e.g. when reclassifying its kamerstuktype.
+    """
+
+    parsed = {
+        field: fields[field] for field in KAMERSTUK_FIELDS if field != "content_hash"
+    }
+    parsed["dossiernummer"] = dossiernummer
+    parsed["dossiertitel"] = dossiertitel
+
+    return get_content_hash(parsed)
+
+
+def get_kamerstuk_nummers_from_metadata(raw_metadata_xml: str) -> tuple[str, str]:
+    """Get the (hoofd)dossiernummer and ondernummer of a kamerstuk from its raw metadata xml"""
+
+    xml = ET.fromstring(raw_metadata_xml)
+
     try:
-        kamerstuktype = __get_kamerstuktype_from_title(documenttitel, xml)
-    except IndexError:
-        logger.error(
-            "Could not succesfully kamerstuktype for %s %s", dossiernummer, ondernummer
+        dossiernummer = xml.findall("metadata[@name='OVERHEIDop.dossiernummer']")[0].get(
+            "content"
+        )
+        ondernummer = xml.findall("metadata[@name='OVERHEIDop.ondernummer']")[0].get(
+            "content"
         )
+    except IndexError as exc:
+        raise CrawlerException(
+            "Could not find dossiernummer and ondernummer in metadata"
+        ) from exc
+
+    return dossiernummer, ondernummer
+
+
+def save_parsed_kamerstuk(
+    parsed: dict, existing_kst: Kamerstuk | None = None, update=False
+) -> Kamerstuk:
+    """Create a Kamerstuk (and its KamerstukDossier if needed) from the output of parse_kamerstuk, or update existing_kst"""
 
     # TODO add support for multi-dossier kamerstukken
-    dossier, created = KamerstukDossier.objects.get_or_create(
-        dossiernummer=dossiernummer
+    dossier_id = get_kamerstukdossier_ids(
+        {parsed["dossiernummer"]: parsed["dossiertitel"]}, update=update
+    )[parsed["dossiernummer"]]
+
+    if existing_kst is not None:
+        if (
+            existing_kst.hoofddossier_id == dossier_id
+            and existing_kst.content_hash == parsed["content_hash"]
+        ):
+            logger.info("Kamerstuk has not changed, not updating it")
+            return existing_kst
+
+        save_changed_fields(
+            existing_kst,
+            {
+                "hoofddossier_id": dossier_id,
+                **{field: parsed[field] for field in KAMERSTUK_FIELDS},
+            },
+        )
+        return existing_kst
+
+    return Kamerstuk.objects.create(
+        hoofddossier_id=dossier_id,
+        # TODO maybe verify the ondernummer?
+        **{field: parsed[field] for field in KAMERSTUK_FIELDS},
     )
-    if created or update:
-        dossier.dossiertitel = dossiertitel
-        dossier.save()
 
-    # TODO: Make specific function for extracting this inner html
-    soup = BeautifulSoup(text_response.text, "html.parser")
 
-    elems = soup.select("article div#broodtekst.stuk.broodtekst-container")
+def get_kamerstuk_urls(
+    dossiernummer: str, ondernummer: str, preferred_url=None
+) -> tuple[str, str]:
+    """Get the urls of the html and the metadata xml of a kamerstuk"""
 
-    if len(elems) > 1:
-        logger.info(
-            "Got multiple matches where only one was expected %s %s",
-            dossiernummer,
-            ondernummer,
+    if preferred_url is None:
+        base_url: str = (
+            f"https://zoek.officielebekendmakingen.nl/kst-{dossiernummer}-{ondernummer}"
         )
+        html_url = f"{base_url}.html"
+        meta_url = f"{base_url}/metadata.xml"
+    else:
+        html_url: str = preferred_url
+        meta_url = html_url.replace(".html", "/metadata.xml")
+
+    return html_url, meta_url
+
+
+def get_kamerstuk_metadata_from_sru_record(
+    sru_record: ET.Element | None,
+) -> str | None:
+    """
+    Get the metadata of a kamerstuk from its KOOP SRU record, in the format of metadata.xml. Returns None if
+    metadata.xml has to be requested instead, because PARLHIST_CRAWLER_METADATA_FROM_SRU_RECORD is disabled or
+    because the record lacks some of the metadata.
+    """
+
+    if sru_record is None or not settings.PARLHIST_CRAWLER_METADATA_FROM_SRU_RECORD:
+        return None
+
+    raw_metadata_xml = get_metadata_xml_from_sru_record(sru_record)
+
+    missing = get_missing_metadata(raw_metadata_xml, KAMERSTUK_REQUIRED_METADATA)
+    if len(missing) > 0:
+        logger.debug("SRU record lacks %s, requesting metadata.xml", missing)
+        return None
 
-    inner_html = str(elems[0])
-
-    tekst = elems[0].get_text()
-
-    if update and existing_kst is not None:
-        existing_kst.hoofddossier = dossier
-        existing_kst.vergaderjaar = vergaderjaar
-        existing_kst.kamer = kamer
-        existing_kst.kamerstuktype = kamerstuktype
-        existing_kst.documenttitel = documenttitel
-        existing_kst.indiener = indiener
-        existing_kst.tekst = tekst
-        existing_kst.raw_html = inner_html
-        existing_kst.raw_metadata_xml = meta_response.text
-        existing_kst.documentdatum = documentdatum
-        existing_kst.save()
-        kst = existing_kst
+    return raw_metadata_xml
+
+
+def crawl_kamerstuk(
+    dossiernummer: str,
+    ondernummer: str,
+    update=False,
+    preferred_url=None,
+    sru_record: ET.Element | None = None,
+    sink: DatabaseSink | None = None,
+) -> Kamerstuk:
+    """
+    Crawl a kamerstuk, taking its metadata from sru_record if possible (see get_kamerstuk_metadata_from_sru_record).
+
+    If sink is given, the kamerstuk is added to it instead of saved, the sink then updates or skips an existing
+    kamerstuk.
+    """
+
+    logger.info("Crawling kamerstuk %s, %s", dossiernummer, ondernummer)
+
+    html_url, meta_url = get_kamerstuk_urls(dossiernummer, ondernummer, preferred_url)
+
+    existing_kst = None
+    if sink is None:
+        try:
+            existing_kst = Kamerstuk.objects.get(
+                hoofddossier__dossiernummer=dossiernummer, ondernummer=ondernummer
+            )
+            logger.info("Kamerstuk already exists")
+            if not update:
+                logger.info("Update set to false, returning existing kamerstuk")
+                return existing_kst
+        except Kamerstuk.DoesNotExist:
+            pass
+
+    raw_metadata_xml = get_kamerstuk_metadata_from_sru_record(sru_record)
+
+    if raw_metadata_xml is None:
+        text_future, meta_future = fetch_urls([html_url, meta_url], revalidate=update)
     else:
-        # Note that if update is false and it already exists, this code path is unreachable
-        kst = Kamerstuk.objects.create(
-            vergaderjaar=vergaderjaar,
-            hoofddossier=dossier,
-            ondernummer=ondernummer,  # TODO maybe verify?
-            kamer=kamer,
-            kamerstuktype=kamerstuktype,
-            documenttitel=documenttitel,
-            indiener=indiener,
-            tekst=tekst,
-            raw_html=inner_html,
-            raw_metadata_xml=meta_response.text,
-            documentdatum=documentdatum,
-        )
+        (text_future,) = fetch_urls([html_url], revalidate=update)
+        meta_future = None
+
+    # First, check if it could actually exist
+    try:
+        text_response = text_future.result()
+    except CrawlerException as exc:
+        logger.critical("This kamerstuk seems to not exist")
+        raise CrawlerException("This kamerstuk seems to not exist") from exc
+
+    if meta_future is not None:
+        try:
+            raw_metadata_xml = meta_future.result().text
+        except CrawlerException as exc:
+            logger.fatal("This handeling seems to not exist")
+            raise CrawlerException("This handeling seems to not exist") from exc
+
+    parsed = parse_kamerstuk(
+        dossiernummer, ondernummer, text_response.text, raw_metadata_xml
+    )
+
+    if sink is not None:
+        return sink.add_kamerstuk(parsed)
+
+    # Note that if update is false and it already exists, existing_kst is never passed
+    kst = save_parsed_kamerstuk(parsed, existing_kst=existing_kst, update=update)
 
     logger.debug(kst)
 
@@ -414,21 +413,32 @@ def crawl_kamerstuk(
 
 @shared_task
 def crawl_kamerstuk_task(
-    dossiernummer: str, ondernummer: str, update=False, preferred_url=None
+    dossiernummer: str,
+    ondernummer: str,
+    update=False,
+    preferred_url=None,
+    sru_record_string: str | None = None,
 ) -> int:
     """Simple shared_task wrapper for crawl_kamerstuk"""
     kst = crawl_kamerstuk(
-        dossiernummer, ondernummer, update=update, preferred_url=preferred_url
+        dossiernummer,
+        ondernummer,
+        update=update,
+        preferred_url=preferred_url,
+        sru_record=(
+            ET.fromstring(sru_record_string) if sru_record_string is not None else None
+        ),
     )
     return kst.id
 
 
 def update_kamerstuktype(kst: Kamerstuk) -> None:
-    """Re-run the kamerstuktype detection for a given Kamerstuk"""
-
-    xml_record = ET.fromstring(kst.raw_metadata_xml)
+    """Re-run the kamerstuktype detection for a given Kamerstuk, and recompute its content hash if it changes"""
 
-    new_kamerstuktype = __get_kamerstuktype_from_title(kst.documenttitel, xml_record)
+    new_kamerstuktype = classify_kamerstuktype(
+        kst.documenttitel,
+        get_opgegeven_kamerstuktype(ET.fromstring(kst.raw_metadata_xml)),
+    )
 
     if new_kamerstuktype != kst.kamerstuktype:
         logger.info(
@@ -439,42 +449,179 @@ def update_kamerstuktype(kst: Kamerstuk) -> None:
         )
 
         kst.kamerstuktype = new_kamerstuktype
-        kst.save()
+        kst.content_hash = get_stored_kamerstuk_content_hash(
+            {field: getattr(kst, field) for field in KAMERSTUK_FIELDS},
+            kst.hoofddossier.dossiernummer,
+            kst.hoofddossier.dossiertitel,
+        )
+        kst.save(update_fields=["kamerstuktype", "content_hash", "bijgewerkt_op"])
     else:
         logger.debug(
             "Kamerstuktype detection resulted in the same type, no update needed."
         )
 
 
+def __get_kamerstuk_nummers_from_sru_record(
+    record: ET.Element,
+) -> tuple[str, str, str | None]:
+    """Get the dossiernummer, ondernummer and preferred url (if any) of a kamerstuk from its KOOP SRU record"""
+
+    dossiernummer_record = record.find(
+        ".//overheidwetgeving:dossiernummer", XML_NAMESPACES
+    ).text
+    ondernummer_record = record.find(
+        ".//overheidwetgeving:ondernummer", XML_NAMESPACES
+    ).text
+
+    try:
+        preferred_url = record.find(".//gzd:preferredUrl", XML_NAMESPACES).text
+        logger.debug("Found preferred url %s", preferred_url)
+    except AttributeError:
+        logger.warning(
+            "Couldn't find a preferred url for %s %s %s, falling back to default",
+            dossiernummer_record,
+            ondernummer_record,
+            record,
+        )
+        preferred_url = None
+
+    return dossiernummer_record, ondernummer_record, preferred_url
+
+
+def __get_kamerstuk_key_from_sru_record(record: ET.Element) -> tuple[str, str]:
+    """Get the dossiernummer and ondernummer of a kamerstuk from its KOOP SRU record"""
+
+    try:
+        dossiernummer, ondernummer, _ = __get_kamerstuk_nummers_from_sru_record(record)
+    except AttributeError as exc:
+        raise CrawlerException(
+            f"Could not find the dossiernummer and ondernummer in {record}"
+        ) from exc
+
+    return dossiernummer, ondernummer
+
+
+def get_existing_kamerstukken(
+    keys: list[tuple[str, str]],
+) -> dict[tuple[str, str], Kamerstuk]:
+    """Get the existing Kamerstukken for a list of (dossiernummer, ondernummer), using a single query"""
+
+    wanted_keys = set(keys)
+    if len(wanted_keys) == 0:
+        return {}
+
+    # Only the natural key is loaded, other fields are loaded when they are used
+    kamerstukken = (
+        Kamerstuk.objects.filter(
+            hoofddossier__dossiernummer__in={key[0] for key in wanted_keys},
+            ondernummer__in={key[1] for key in wanted_keys},
+        )
+        .select_related("hoofddossier")
+        .only("ondernummer", "hoofddossier__dossiernummer")
+    )
+
+    existing: dict[tuple[str, str], Kamerstuk] = {}
+    for kst in kamerstukken:
+        key = (kst.hoofddossier.dossiernummer, kst.ondernummer)
+        if key in wanted_keys:
+            existing[key] = kst
+
+    return existing
+
+
 def crawl_all_kamerstukken_within_koop_sru_query(
     query: str, update=False, queue_tasks=False
 ) -> list[Kamerstuk] | list[AsyncResult]:
     """ "Crawl all Kamerstukken which can be found by the given KOOP SRU query"""
 
+    # Crawling starts as soon as the first page of records has been received
+    return crawl_all_kamerstukken_from_sru_records(
+        koop_sru_api_iter_records(query), update=update, queue_tasks=queue_tasks
+    )
+
+
+def crawl_all_kamerstukken_from_sru_records(
+    records: Iterable[ET.Element],
+    update=False,
+    queue_tasks=False,
+    checkpoint: CrawlCheckpoint | None = None,
+    on_processed: Callable[[ET.Element, Kamerstuk | None], Any] | None = None,
+) -> list[Kamerstuk] | list[AsyncResult]:
+    """
+    Crawl the Kamerstukken of the given KOOP SRU records, marking every record as processed in checkpoint.
+
+    Unless update is true, records of Kamerstukken that already exist are skipped, these are looked up for many
+    records at once (see iter_records_with_existing). Crawled Kamerstukken are written to the database in batches
+    (see DatabaseSink), the checkpoint is only stored once the Kamerstukken before it have been written.
+
+    If given, on_processed is called for every record with its Kamerstuk, or None if it failed or was queued. The
+    Kamerstuk may not have been written yet, it has no id after this function returns if it could not be written.
+    """
+
     results: list[Kamerstuk] | list[AsyncResult] = []
-    records = koop_sru_api_request_all(query)
+    sink = None
+    if not queue_tasks:
+        sink = DatabaseSink(update=update)
+        if checkpoint is not None:
+            checkpoint.before_save = sink.flush
+
+    if update:
+        records_with_existing: Iterable[tuple[ET.Element, Kamerstuk | None]] = (
+            (record, None) for record in records
+        )
+    else:
+        records_with_existing = iter_records_with_existing(
+            records, __get_kamerstuk_key_from_sru_record, get_existing_kamerstukken
+        )
+
+    if not queue_tasks:
+
+        def get_record_urls(
+            record_with_existing: tuple[ET.Element, Kamerstuk | None],
+        ) -> list[str]:
+            record, existing_kst = record_with_existing
+            if existing_kst is not None:
+                return []
+
+            dossiernummer, ondernummer, preferred_url = (
+                __get_kamerstuk_nummers_from_sru_record(record)
+            )
+            html_url, meta_url = get_kamerstuk_urls(
+                dossiernummer, ondernummer, preferred_url
+            )
+            if get_kamerstuk_metadata_from_sru_record(record) is not None:
+                return [html_url]
+
+            return [html_url, meta_url]
+
+        # Fetch the next kamerstukken while the current one is being parsed and saved
+        records_with_existing = prefetch_ahead(
+            records_with_existing, get_record_urls, revalidate=update
+        )
+
+    for record, existing_kst in records_with_existing:
+        dossiernummer_record = ondernummer_record = kst = None
+        failed = False
+
+        if existing_kst is not None:
+            logger.debug(
+                "Kamerstuk %s %s already exists, skipping",
+                existing_kst.hoofddossier.dossiernummer,
+                existing_kst.ondernummer,
+            )
+            if not queue_tasks:
+                results.append(existing_kst)
+            if checkpoint is not None:
+                checkpoint.processed(record)
+            if on_processed is not None:
+                on_processed(record, existing_kst)
+            continue
 
-    for record in records:
         try:
             logger.debug("Crawling %s", record)
-            dossiernummer_record = record.find(
-                ".//overheidwetgeving:dossiernummer", XML_NAMESPACES
-            ).text
-            ondernummer_record = record.find(
-                ".//overheidwetgeving:ondernummer", XML_NAMESPACES
-            ).text
-
-            try:
-                preferred_url = record.find(".//gzd:preferredUrl", XML_NAMESPACES).text
-                logger.debug("Found preferred url %s", preferred_url)
-            except AttributeError:
-                logger.warning(
-                    "Couldn't find a preferred url for %s %s %s, falling back to default",
-                    dossiernummer_record,
-                    ondernummer_record,
-                    record,
-                )
-                preferred_url = None
+            dossiernummer_record, ondernummer_record, preferred_url = (
+                __get_kamerstuk_nummers_from_sru_record(record)
+            )
 
             if queue_tasks:
                 kst_task = crawl_kamerstuk_task.delay(
@@ -482,6 +629,7 @@ def crawl_all_kamerstukken_within_koop_sru_query(
                     ondernummer_record,
                     update=update,
                     preferred_url=preferred_url,
+                    sru_record_string=ET.tostring(record, encoding="unicode"),
                 )
                 results.append(kst_task)
             else:
@@ -490,13 +638,17 @@ def crawl_all_kamerstukken_within_koop_sru_query(
                     ondernummer_record,
                     update=update,
                     preferred_url=preferred_url,
+                    sru_record=record,
+                    sink=sink,
                 )
                 results.append(kst)
         except CrawlerException:
+            failed = True
             logger.error(
                 "Failed to crawl kst-%s-%s", dossiernummer_record, ondernummer_record
             )
         except Exception as exc:
+            failed = True
             logger.error(
                 "Got an unexpected exception %s in crawling kst %s %s",
                 exc,
@@ -504,4 +656,46 @@ def crawl_all_kamerstukken_within_koop_sru_query(
                 ondernummer_record,
             )
 
+        if checkpoint is not None:
+            checkpoint.processed(record, failed=failed, publication=kst)
+        if on_processed is not None:
+            on_processed(record, None if failed else kst)
+
+    if sink is not None:
+        sink.flush()
+        # Publications that could not be written have not been crawled
+        results = [result for result in results if result.pk is not None]
+
+    return results
+
+
+def crawl_all_kamerstukken_in_year(
+    year: int, update=False, queue_tasks=False, resume=False
+) -> list[Kamerstuk] | list[AsyncResult]:
+    """
+    Crawl all Kamerstukken with their documentdatum within the range of year-01-01 and year-12-31 (inclusive).
+
+    The query is split into smaller queries by date, which are requested concurrently. The progress is stored in a
+    checkpoint, with resume=True an interrupted crawl continues from this checkpoint.
+
+    year: any value between 1995 and the current year (inclusive)
+    """
+    current_year = datetime.date.today().year
+    if year not in range(1995, current_year + 1):
+        raise CrawlerException(f"Received invalid year {year}")
+
+    checkpoint = CrawlCheckpoint(
+        "c.product-area==officielepublicaties AND dt.type=Kamerstuk",
+        datetime.date(year, 1, 1),
+        datetime.date(year, 12, 31),
+        resume=resume,
+    )
+    results = crawl_all_kamerstukken_from_sru_records(
+        checkpoint.iter_records(),
+        update=update,
+        queue_tasks=queue_tasks,
+        checkpoint=checkpoint,
+    )
+    checkpoint.complete()
+
     return results
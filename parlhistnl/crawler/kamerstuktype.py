@@ -0,0 +1,226 @@
+"""
+parlhist/parlhistnl/crawler/kamerstuktype.py
+
+Classification of the type of a kamerstuk (Kamerstuk.KamerstukType) from its documenttitel and the kamerstuktype given
+in its metadata (the opgegeven kamerstuktype, which is often missing).
+
+The rules are declared in KAMERSTUKTYPE_RULES, and compiled once into a single regular expression over
+"{opgegeven kamerstuktype}\\x00{normalized title}". Every rule is an alternative anchored at the start of this string,
+so the first rule (in order of the table) that matches determines the type.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+from typing import Iterable, Literal
+
+from parlhistnl.crawler.utils import XML_NAMESPACES
+from parlhistnl.models import Kamerstuk
+
+logger = logging.getLogger(__name__)
+
+KamerstukType = Kamerstuk.KamerstukType
+
+# A rule matches if the opgegeven kamerstuktype is one of the values, or if the normalized title starts with, ends
+# with or contains one of the values. The first rule that matches determines the type.
+KAMERSTUKTYPE_RULES: list[
+    tuple[str, Literal["opgegeven", "startswith", "endswith", "contains"], tuple[str, ...]]
+] = [
+    (KamerstukType.AMENDEMENT, "opgegeven", ("Amendement",)),
+    (KamerstukType.MOTIE, "opgegeven", ("Motie",)),
+    (KamerstukType.WETSVOORSTEL, "opgegeven", ("Voorstel van wet",)),
+    (KamerstukType.KONINKLIJKE_BOODSCHAP, "opgegeven", ("Koninklijke boodschap",)),
+    (KamerstukType.KONINKLIJKE_BOODSCHAP, "startswith", ("koninklijke boodschap",)),
+    (KamerstukType.GELEIDENDE_BRIEF, "startswith", ("geleidende brief",)),
+    (KamerstukType.MEMORIE_VAN_TOELICHTING, "opgegeven", ("Memorie van toelichting",)),
+    (KamerstukType.JAARVERSLAG, "opgegeven", ("Jaarverslag",)),
+    (KamerstukType.VERSLAG, "opgegeven", ("Verslag",)),
+    (KamerstukType.MOTIE, "startswith", ("motie", "gewijzigde motie")),
+    (
+        KamerstukType.AMENDEMENT,
+        "startswith",
+        (
+            "amendement",
+            "gewijzigd amendement",
+            "nader gewijzigd amendement",
+            "subamendement",
+            "gewijzigd subamendement",
+            "tweede nader gewijzigd amendement",
+            "derde nader gewijzigd amendement",
+            "vierde nader gewijzigd amendement",
+            "amdendement",
+        ),
+    ),
+    (
+        KamerstukType.WETSVOORSTEL,
+        "startswith",
+        ("voorstel van wet", "gewijzigd voorstel van wet", "ontwerp van wet"),
+    ),
+    (
+        KamerstukType.WETSVOORSTEL,
+        "endswith",
+        ("voorstel van wet", "gewijzigd voorstel van wet"),
+    ),
+    (
+        KamerstukType.ADVIES_RVS,
+        "startswith",
+        (
+            "advies afdeling advisering raad van state",
+            "advies raad van state",
+            "advies en nader rapport",
+        ),
+    ),
+    (KamerstukType.NOTA_NA_VERSLAG, "startswith", ("nota naar aanleiding van het",)),
+    (KamerstukType.NOTA_NA_VERSLAG, "endswith", ("nota naar aanleiding van het",)),
+    (
+        KamerstukType.VERSLAG,
+        "startswith",
+        ("voorlopig verslag", "verslag", "eindverslag", "nader voorlopig verslag"),
+    ),
+    (
+        KamerstukType.VERSLAG,
+        "endswith",
+        ("voorlopig verslag", "verslag", "eindverslag"),
+    ),
+    (KamerstukType.MEMORIE_VAN_TOELICHTING, "startswith", ("memorie van toelichting",)),
+    (KamerstukType.MEMORIE_VAN_TOELICHTING, "endswith", ("memorie van toelichting",)),
+    (
+        KamerstukType.MEMORIE_VAN_ANTWOORD,
+        "startswith",
+        ("memorie van antwoord", "nadere memorie van antwoord"),
+    ),
+    (
+        KamerstukType.MEMORIE_VAN_ANTWOORD,
+        "endswith",
+        ("memorie van antwoord", "nadere memorie van antwoord"),
+    ),
+    (
+        KamerstukType.VOORLICHTING_RVS,
+        "startswith",
+        ("voorlichting van de afdeling advisering van de raad van state",),
+    ),
+    (KamerstukType.JAARVERSLAG, "startswith", ("jaarverslag",)),
+    (
+        KamerstukType.LIJST_VAN_VRAGEN_EN_ANTWOORDEN,
+        "startswith",
+        ("lijst van vragen en antwoorden",),
+    ),
+    (KamerstukType.NOTA_VAN_VERBETERING, "startswith", ("nota van verbetering",)),
+    # Beware, this lax check may result in errors
+    (KamerstukType.NOTA_VAN_WIJZIGING, "contains", ("nota van wijziging",)),
+    (KamerstukType.BRIEF, "opgegeven", ("Brief",)),
+    (
+        KamerstukType.BRIEF,
+        "startswith",
+        ("brief", "kabinetsreactie", "reactie op"),
+    ),
+]
+
+# The patterns of the rules, {values} is replaced by the alternatives of the values of a rule
+RULE_PATTERNS = {
+    "opgegeven": r"(?:{values})\x00",
+    "startswith": r"[^\x00]*\x00(?:{values})",
+    "endswith": r"[^\x00]*\x00.*(?:{values})\Z",
+    "contains": r"[^\x00]*\x00.*(?:{values})",
+}
+
+
+def __compile_rules(
+    rules: list[tuple[str, str, tuple[str, ...]]],
+) -> tuple[re.Pattern, dict[str, str]]:
+    """Compile the rules into one regular expression, with a named group per rule, mapped to the type of the rule"""
+
+    alternatives = []
+    types = {}
+    for index, (kamerstuktype, kind, values) in enumerate(rules):
+        group = f"rule{index}"
+        pattern = RULE_PATTERNS[kind].format(
+            values="|".join(re.escape(value) for value in values)
+        )
+        alternatives.append(f"(?P<{group}>{pattern})")
+        types[group] = kamerstuktype
+
+    return re.compile("|".join(alternatives), re.DOTALL), types
+
+
+__rules_pattern, __rule_types = __compile_rules(KAMERSTUKTYPE_RULES)
+
+
+def __normalize_title(title: str) -> str:
+    """Normalize a title before applying the rules"""
+
+    return title.lower().replace("0", "o").strip()
+
+
+def __match_rules(title: str, opgegeven_kamerstuktype: str) -> str | None:
+    """Get the type of the first rule that matches the normalized title, or None if no rule matches"""
+
+    match = __rules_pattern.match(f"{opgegeven_kamerstuktype}\x00{title}")
+    if match is None:
+        return None
+
+    return __rule_types[match.lastgroup]
+
+
+def get_opgegeven_kamerstuktype(xml: ET.Element) -> str:
+    """Get the kamerstuktype given in the (parsed) metadata, or an empty string if it is not given"""
+
+    subrubriek = xml.find(
+        ".//overheidwetgeving:subrubriek[@scheme='OVERHEIDop.KamerstukTypen']",
+        XML_NAMESPACES,
+    )
+    if subrubriek is None or subrubriek.text is None:
+        return ""
+
+    return subrubriek.text
+
+
+def classify_kamerstuktype(title: str, opgegeven_kamerstuktype: str = "") -> str:
+    """
+    Guess the type of a kamerstuk from its documenttitel and the kamerstuktype given in its metadata (if any).
+
+    If no rule matches the title, the part after the first "; " in the title (the tail) is tried as well, e.g. for
+    "Wijziging van de Wet; Memorie van toelichting".
+    """
+
+    title = __normalize_title(title)
+
+    kamerstuktype = __match_rules(title, opgegeven_kamerstuktype)
+    if kamerstuktype is not None:
+        return kamerstuktype
+
+    title_split = title.split("; ")
+    if len(title_split) > 1:
+        kamerstuktype = __match_rules(
+            __normalize_title(title_split[1]), opgegeven_kamerstuktype
+        )
+        if kamerstuktype is not None:
+            logger.debug("Found type %s using the tail of %s", kamerstuktype, title)
+            return kamerstuktype
+
+    logger.debug("Can't determine KamerstukType for %s", title)
+
+    return KamerstukType.ONBEKEND
+
+
+def classify_kamerstuktypes(titles: Iterable[tuple[str, str]]) -> list[str]:
+    """
+    Classify many kamerstukken at once, given as (documenttitel, opgegeven kamerstuktype). Returns their types in the
+    same order. Every distinct pair is only classified once.
+    """
+
+    kamerstuktypes: dict[tuple[str, str], str] = {}
+
+    def classify(title: tuple[str, str]) -> str:
+        kamerstuktype = kamerstuktypes.get(title)
+        if kamerstuktype is None:
+            kamerstuktype = classify_kamerstuktype(*title)
+            kamerstuktypes[title] = kamerstuktype
+        return kamerstuktype
+
+    return [classify(title) for title in titles]
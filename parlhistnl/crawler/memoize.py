@@ -0,0 +1,795 @@
+"""
+parlhist/parlhistnl/crawler/memoize.py
+
+Storage of memoized crawler requests.
+
+A memoized request is stored as a small JSON header (status code, url, resolved encoding and a
+selection of the response headers) followed by the compressed response body. Older memoized
+requests, which are pickled requests.Response objects, can still be read.
+
+Memoized requests are kept in a MemoStore, keyed by the sha1 of the url. Two backends are available,
+selected using PARLHIST_CRAWLER_MEMOIZE_BACKEND:
+    "file": one file per request in PARLHIST_CRAWLER_MEMOIZE_PATH (the original layout)
+    "sqlite": all requests in a single SQLite database in PARLHIST_CRAWLER_MEMOIZE_PATH
+
+To quickly recognize urls which have not been memoized yet, a store can have a MemoIndex: a Bloom filter
+of all keys in the store, which is shared by all processes on the same machine.
+
+Memoized requests expire after the TTL of their url class (see PARLHIST_CRAWLER_MEMOIZE_TTL_SECONDS), after which
+they are revalidated using a conditional request. If PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES is set, memoize_prune_task
+(e.g. scheduled using celery beat) and the memoize_prune command remove the least recently used memoized requests once
+the store has grown beyond this size. Pruning walks the whole store, so it is not done while crawling.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import pathlib
+import pickle
+import sqlite3
+import struct
+import threading
+import time
+
+from typing import BinaryIO, Iterator
+
+import requests
+from celery import shared_task
+from django.conf import settings
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+MEMOIZE_FORMAT_MAGIC = b"PHMEMO1\n"
+
+# Only these headers are kept, the rest of the response (cookies, connection state, ...) is not
+# needed to rebuild the database.
+MEMOIZED_HEADERS = ["Content-Type", "ETag", "Last-Modified", "Date"]
+
+
+class MemoizeException(Exception):
+    """For when a memoized request could not be read or written"""
+
+
+def __compress(body: bytes) -> tuple[str, bytes]:
+    """Compress body using zstd if available, or gzip otherwise"""
+
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(body)
+
+    return "gzip", gzip.compress(body, compresslevel=6)
+
+
+def __decompress(compression: str, data: bytes) -> bytes:
+    """Decompress data that was compressed using compression"""
+
+    if compression == "zstd":
+        if zstandard is None:
+            raise MemoizeException(
+                "Memoized request is compressed using zstd, but zstandard is not installed"
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    if compression == "gzip":
+        return gzip.decompress(data)
+
+    if compression == "none":
+        return data
+
+    raise MemoizeException(f"Unknown compression {compression} for memoized request")
+
+
+def is_legacy_memoized_data(data: bytes) -> bool:
+    """Is data a memoized request in the legacy (pickled requests.Response) format?"""
+
+    return not data.startswith(MEMOIZE_FORMAT_MAGIC)
+
+
+def encode_memoized_response(
+    response: requests.Response, request_url: str | None = None
+) -> bytes:
+    """Encode a response in the memoized request format
+
+    request_url is the url that was requested, which may differ from response.url after a redirect.
+    """
+
+    compression, compressed_body = __compress(response.content)
+
+    header = {
+        "url": response.url,
+        "request_url": request_url if request_url is not None else response.url,
+        "status_code": response.status_code,
+        "encoding": response.encoding,
+        "headers": {
+            name: response.headers[name]
+            for name in MEMOIZED_HEADERS
+            if name in response.headers
+        },
+        "compression": compression,
+        "memoized_at": time.time(),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    return (
+        MEMOIZE_FORMAT_MAGIC
+        + len(header_bytes).to_bytes(4, "big")
+        + header_bytes
+        + compressed_body
+    )
+
+
+def decode_memoized_header(data: bytes) -> dict:
+    """Decode only the header of a memoized request, without decompressing the body"""
+
+    if is_legacy_memoized_data(data):
+        raise MemoizeException("Legacy memoized requests do not have a header")
+
+    offset = len(MEMOIZE_FORMAT_MAGIC)
+    header_length = int.from_bytes(data[offset : offset + 4], "big")
+
+    return json.loads(data[offset + 4 : offset + 4 + header_length])
+
+
+def decode_memoized_response(data: bytes) -> requests.Response:
+    """Decode a memoized request into a requests.Response, also accepts the legacy pickle format"""
+
+    if is_legacy_memoized_data(data):
+        logger.debug("Reading memoized request in the legacy pickle format")
+        try:
+            return pickle.loads(data)
+        except Exception as exc:
+            raise MemoizeException("Could not unpickle legacy memoized request") from exc
+
+    offset = len(MEMOIZE_FORMAT_MAGIC)
+    header_length = int.from_bytes(data[offset : offset + 4], "big")
+    header = json.loads(data[offset + 4 : offset + 4 + header_length])
+
+    response = requests.Response()
+    response.status_code = header["status_code"]
+    response.url = header["url"]
+    response.encoding = header["encoding"]
+    response.headers = CaseInsensitiveDict(header["headers"])
+    try:
+        response._content = __decompress(  # pylint: disable=protected-access
+            header["compression"], data[offset + 4 + header_length :]
+        )
+    except MemoizeException:
+        raise
+    except Exception as exc:
+        raise MemoizeException("Could not decompress memoized request") from exc
+
+    return response
+
+
+def write_memoized_data(path: str, data: bytes) -> None:
+    """Atomically write already encoded memoized data to path"""
+
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    with open(temporary_path, "wb") as memoized_file:
+        memoized_file.write(data)
+
+    os.replace(temporary_path, path)
+
+
+def refresh_memoized_data(data: bytes) -> bytes:
+    """Mark already encoded memoized data as memoized right now, without re-encoding the body"""
+
+    if is_legacy_memoized_data(data):
+        response = decode_memoized_response(data)
+        return encode_memoized_response(response)
+
+    offset = len(MEMOIZE_FORMAT_MAGIC)
+    header_length = int.from_bytes(data[offset : offset + 4], "big")
+    header = json.loads(data[offset + 4 : offset + 4 + header_length])
+    header["memoized_at"] = time.time()
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    return (
+        MEMOIZE_FORMAT_MAGIC
+        + len(header_bytes).to_bytes(4, "big")
+        + header_bytes
+        + data[offset + 4 + header_length :]
+    )
+
+
+def get_memoized_at(data: bytes) -> float:
+    """Get the time at which a request was memoized, legacy memoized requests are considered to be memoized at 0"""
+
+    if is_legacy_memoized_data(data):
+        return 0.0
+
+    return decode_memoized_header(data)["memoized_at"]
+
+
+def get_memoize_url_class(url: str) -> str:
+    """Get the class of url, which determines how long memoized requests remain fresh"""
+
+    if url.startswith("https://repository.overheid.nl/sru"):
+        return "sru"
+
+    if url.endswith("metadata.xml"):
+        return "metadata"
+
+    return "document"
+
+
+def is_memoized_request_fresh(url: str, memoized_at: float) -> bool:
+    """Is a request to url that was memoized at memoized_at still fresh, or must it be revalidated?"""
+
+    ttl = settings.PARLHIST_CRAWLER_MEMOIZE_TTL_SECONDS.get(get_memoize_url_class(url))
+
+    if ttl is None:
+        return True
+
+    return time.time() - memoized_at < ttl
+
+
+def get_memoize_key(url: str) -> str:
+    """Get the key under which the request to url is memoized"""
+
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def get_memoized_url(data: bytes) -> str:
+    """Get the requested url of a memoized request, without decompressing the body if possible"""
+
+    if is_legacy_memoized_data(data):
+        return decode_memoized_response(data).url
+
+    header = decode_memoized_header(data)
+
+    return header.get("request_url", header["url"])
+
+
+class MemoIndex:
+    """
+    Persistent Bloom filter of the keys in a MemoStore.
+
+    If might_contain returns False, the key is definitely not in the store, so the store itself does not
+    have to be checked. The filter is memory mapped as a shared mapping, so keys added by one process are
+    immediately visible to all other processes using the same index file.
+
+    Setting a bit is not atomic, so keys are added while holding an exclusive lock on the lock file of the index
+    (see get_lock_path). Every process using the index holds a shared lock on the index file, so that the index is
+    not rebuilt while it is in use (see lock_for_rebuild).
+    """
+
+    HEADER_FORMAT = "<8sQI"
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    MAGIC = b"PHBLOOM1"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # fcntl locks are per process, so threads must also be serialized
+        self.__lock = threading.Lock()
+
+        while True:
+            self.__file = open(path, "r+b")
+            fcntl.flock(self.__file, fcntl.LOCK_SH)
+
+            # The index could have been replaced by a rebuilt index while waiting for the lock
+            if os.fstat(self.__file.fileno()).st_ino == os.stat(path).st_ino:
+                break
+            self.__file.close()
+
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0)
+
+        magic, self.number_of_bits, self.number_of_hashes = struct.unpack_from(
+            self.HEADER_FORMAT, self.__mmap
+        )
+        if magic != self.MAGIC:
+            raise MemoizeException(f"{path} is not a memoize index")
+
+    @classmethod
+    def create(cls, path: str, capacity: int, error_rate=0.01) -> "MemoIndex":
+        """Create a new, empty index in path, sized for capacity keys with the given false positive rate"""
+
+        number_of_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        number_of_bits += -number_of_bits % 8
+        number_of_hashes = max(1, round(number_of_bits / capacity * math.log(2)))
+
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as index_file:
+            index_file.write(
+                struct.pack(cls.HEADER_FORMAT, cls.MAGIC, number_of_bits, number_of_hashes)
+            )
+            index_file.truncate(cls.HEADER_SIZE + number_of_bits // 8)
+        os.replace(temporary_path, path)
+
+        return cls(path)
+
+    def close(self) -> None:
+        """Close the index, releasing its shared lock"""
+
+        self.__mmap.close()
+        self.__file.close()
+
+    @staticmethod
+    def get_lock_path(path: str) -> str:
+        """Get the path of the lock file of the index in path, which serializes adding keys and creating the index"""
+
+        return f"{path}.lock"
+
+    @staticmethod
+    def lock_for_rebuild(path: str) -> BinaryIO | None:
+        """
+        Lock the index in path (if it exists) exclusively, so that it can be replaced by a rebuilt index. Returns the
+        locked file, which is unlocked when it is closed. Raises a MemoizeException if the index is in use.
+        """
+
+        if not os.path.exists(path):
+            return None
+
+        index_file = open(path, "rb")
+        try:
+            fcntl.flock(index_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as exc:
+            index_file.close()
+            raise MemoizeException(
+                f"{path} is in use, stop all crawler processes before rebuilding it"
+            ) from exc
+
+        return index_file
+
+    def __get_bit_positions(self, key: str) -> Iterator[int]:
+        """Get the positions of the bits for key, using double hashing on the (sha1) key"""
+
+        first_hash = int(key[:16], 16)
+        second_hash = int(key[16:32], 16) | 1
+
+        for i in range(self.number_of_hashes):
+            yield (first_hash + i * second_hash) % self.number_of_bits
+
+    def might_contain(self, key: str) -> bool:
+        """Returns False if key is definitely not in the index"""
+
+        for position in self.__get_bit_positions(key):
+            if not self.__mmap[self.HEADER_SIZE + position // 8] & (1 << (position % 8)):
+                return False
+
+        return True
+
+    def add(self, key: str) -> None:
+        """Add key to the index"""
+
+        with self.__lock, open(self.get_lock_path(self.path), "ab") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            try:
+                for position in self.__get_bit_positions(key):
+                    offset = self.HEADER_SIZE + position // 8
+                    self.__mmap[offset] = self.__mmap[offset] | (1 << (position % 8))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class MemoStore:
+    """Base class for the storage backends of memoized requests"""
+
+    index: MemoIndex | None = None
+
+    def get(self, key: str) -> bytes | None:
+        """Get the memoized data stored under key, or None if nothing is stored under key"""
+        raise NotImplementedError
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store the memoized data under key, replacing existing data"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Delete the memoized data under key, if any"""
+        raise NotImplementedError
+
+    def keys(self) -> Iterator[str]:
+        """Iterate over all keys in this store"""
+        raise NotImplementedError
+
+    def compact(self) -> None:
+        """Reclaim unused space"""
+        raise NotImplementedError
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        """Iterate over all (key, size in bytes, time of last use) in this store"""
+        raise NotImplementedError
+
+    def check_storage(self) -> list[str]:
+        """Check the integrity of the storage itself, returns a list of found problems"""
+        return []
+
+    def prune(self, max_bytes: int) -> tuple[int, int]:
+        """
+        Remove the least recently used memoized requests until the store is at most 90% of max_bytes.
+
+        Returns the number of removed memoized requests and the number of removed bytes.
+        """
+
+        entries = list(self.entries())
+        total_bytes = sum(size for _, size, _ in entries)
+
+        if total_bytes <= max_bytes:
+            return 0, 0
+
+        target_bytes = int(max_bytes * 0.9)
+        removed = 0
+        removed_bytes = 0
+
+        for key, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total_bytes - removed_bytes <= target_bytes:
+                break
+
+            self.delete(key)
+            removed += 1
+            removed_bytes += size
+
+        logger.info(
+            "Pruned %s memoized requests (%s bytes) from the memoize store",
+            removed,
+            removed_bytes,
+        )
+
+        return removed, removed_bytes
+
+    def check(self) -> list[str]:
+        """Check the integrity of this store, returns a list of found problems"""
+
+        problems = self.check_storage()
+
+        for key in self.keys():
+            data = self.get(key)
+            if data is None:
+                continue
+
+            try:
+                url = get_memoized_url(data)
+                decode_memoized_response(data)
+            except Exception as exc:
+                problems.append(f"{key}: could not be decoded ({exc})")
+                continue
+
+            # Legacy memoized requests only know the url after redirects
+            if not is_legacy_memoized_data(data) and get_memoize_key(url) != key:
+                problems.append(f"{key}: stored under the wrong key for {url}")
+
+        return problems
+
+    def get_response(self, url: str) -> requests.Response | None:
+        """Get the memoized response for url, or None if it has not been memoized"""
+
+        memoized = self.get_memoized(url)
+        if memoized is None:
+            return None
+
+        return memoized[0]
+
+    def get_memoized(self, url: str) -> tuple[requests.Response, float] | None:
+        """Get the memoized response for url and the time it was memoized at, or None if it has not been memoized"""
+
+        key = get_memoize_key(url)
+
+        if self.index is not None and not self.index.might_contain(key):
+            return None
+
+        data = self.get(key)
+        if data is None:
+            return None
+
+        return decode_memoized_response(data), get_memoized_at(data)
+
+    def refresh(self, url: str) -> None:
+        """Mark the memoized request for url as fresh, e.g. after the server responded with 304 Not Modified"""
+
+        key = get_memoize_key(url)
+        data = self.get(key)
+
+        if data is not None:
+            self.put(key, refresh_memoized_data(data))
+
+    def put_response(self, url: str, response: requests.Response) -> None:
+        """Memoize response as the response for url"""
+
+        key = get_memoize_key(url)
+
+        self.put(key, encode_memoized_response(response, url))
+
+        if self.index is not None:
+            self.index.add(key)
+
+    def is_empty(self) -> bool:
+        """Returns True if nothing is stored in this store"""
+
+        return next(iter(self.keys()), None) is None
+
+
+# The time of last use of a memoized request is only updated if it is older than this, to avoid writing on every read
+LAST_USED_GRANULARITY_SECONDS = 24 * 60 * 60
+
+
+class FileMemoStore(MemoStore):
+    """
+    Stores every memoized request as a separate file, sharded in directories by the first characters of the key
+
+    The modification time of a file is used as the time the memoized request was last used.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __get_path(self, key: str) -> pathlib.Path:
+        """Get the full path of the file for key"""
+        return pathlib.Path(self.path, key[0], key[1], key)
+
+    def get(self, key: str) -> bytes | None:
+        path = self.__get_path(key)
+
+        try:
+            with open(path, "rb") as memoized_file:
+                data = memoized_file.read()
+                last_used = os.fstat(memoized_file.fileno()).st_mtime
+        except FileNotFoundError:
+            return None
+
+        if time.time() - last_used > LAST_USED_GRANULARITY_SECONDS:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.__get_path(key)
+
+        try:
+            write_memoized_data(str(path), data)
+        except FileNotFoundError:
+            # Only create the directory when it turns out not to exist
+            path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+            write_memoized_data(str(path), data)
+
+    def delete(self, key: str) -> None:
+        self.__get_path(key).unlink(missing_ok=True)
+
+    def keys(self) -> Iterator[str]:
+        for directory, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                if not filename.endswith(".tmp") and len(filename) == 40:
+                    yield filename
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        for key in self.keys():
+            try:
+                stat = self.__get_path(key).stat()
+            except FileNotFoundError:
+                continue
+
+            yield key, stat.st_size, stat.st_mtime
+
+    def compact(self) -> None:
+        """Remove left-over temporary files and empty directories"""
+
+        for directory, _, filenames in os.walk(self.path, topdown=False):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    logger.info("Removing left-over temporary file %s", filename)
+                    os.unlink(os.path.join(directory, filename))
+
+            if directory != self.path and not os.listdir(directory):
+                os.rmdir(directory)
+
+
+class SqliteMemoStore(MemoStore):
+    """Stores all memoized requests in a single SQLite database"""
+
+    # The number of rows read at once when iterating over the store
+    ITER_BATCH_SIZE = 1000
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__local = threading.local()
+
+    def __get_connection(self) -> sqlite3.Connection:
+        """Get a connection for the current process and thread"""
+
+        connection = getattr(self.__local, "connection", None)
+        if connection is None or self.__local.pid != os.getpid():
+            pathlib.Path(self.path).parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS memoized_requests "
+                "(key TEXT PRIMARY KEY, data BLOB NOT NULL, memoized_at REAL NOT NULL, accessed_at REAL)"
+            )
+            columns = [
+                row[1]
+                for row in connection.execute("PRAGMA table_info(memoized_requests)")
+            ]
+            if "accessed_at" not in columns:
+                connection.execute(
+                    "ALTER TABLE memoized_requests ADD COLUMN accessed_at REAL"
+                )
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+
+        return connection
+
+    def get(self, key: str) -> bytes | None:
+        connection = self.__get_connection()
+        row = connection.execute(
+            "SELECT data, coalesce(accessed_at, memoized_at) FROM memoized_requests WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        now = time.time()
+        if now - row[1] > LAST_USED_GRANULARITY_SECONDS:
+            connection.execute(
+                "UPDATE memoized_requests SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+
+        return row[0]
+
+    def put(self, key: str, data: bytes) -> None:
+        now = time.time()
+        self.__get_connection().execute(
+            "INSERT OR REPLACE INTO memoized_requests (key, data, memoized_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, data, now, now),
+        )
+
+    def delete(self, key: str) -> None:
+        self.__get_connection().execute(
+            "DELETE FROM memoized_requests WHERE key = ?", (key,)
+        )
+
+    def __iter_rows(self, columns: str) -> Iterator[tuple]:
+        """
+        Iterate over the rows of all memoized requests, ordered by key. The rows are read in batches, which are
+        completely fetched before they are yielded, so that the store can be written to while iterating.
+        """
+
+        connection = self.__get_connection()
+        last_key = ""
+
+        while True:
+            rows = connection.execute(
+                f"SELECT key, {columns} FROM memoized_requests WHERE key > ? ORDER BY key LIMIT ?",
+                (last_key, self.ITER_BATCH_SIZE),
+            ).fetchall()
+
+            yield from rows
+
+            if len(rows) < self.ITER_BATCH_SIZE:
+                return
+
+            last_key = rows[-1][0]
+
+    def keys(self) -> Iterator[str]:
+        for key, _ in self.__iter_rows("NULL"):
+            yield key
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        for key, size, used_at in self.__iter_rows(
+            "length(data), coalesce(accessed_at, memoized_at)"
+        ):
+            yield key, size, used_at
+
+    def compact(self) -> None:
+        connection = self.__get_connection()
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("VACUUM")
+
+    def check_storage(self) -> list[str]:
+        rows = self.__get_connection().execute("PRAGMA integrity_check").fetchall()
+
+        return [row[0] for row in rows if row[0] != "ok"]
+
+
+__memo_store: MemoStore | None = None
+__memo_store_lock = threading.Lock()
+
+
+def get_memo_store() -> MemoStore:
+    """Get the MemoStore configured in the settings"""
+
+    global __memo_store
+
+    # All threads must share the same store (and index), also when they request it at the same time
+    with __memo_store_lock:
+        if __memo_store is None:
+            __memo_store = create_memo_store(
+                settings.PARLHIST_CRAWLER_MEMOIZE_BACKEND,
+                settings.PARLHIST_CRAWLER_MEMOIZE_PATH,
+            )
+
+            if settings.PARLHIST_CRAWLER_MEMOIZE_USE_INDEX:
+                __memo_store.index = load_memo_index(
+                    __memo_store, settings.PARLHIST_CRAWLER_MEMOIZE_PATH
+                )
+
+    return __memo_store
+
+
+def get_memo_index_path(path: str) -> str:
+    """Get the path of the MemoIndex for the memoize store in path"""
+
+    return f"{path}/memoized-requests.bloom"
+
+
+def load_memo_index(memo_store: MemoStore, path: str) -> MemoIndex | None:
+    """
+    Load the MemoIndex of memo_store, which is located in path.
+
+    A new index is only created if the store is still empty, as an index that misses existing keys would
+    lead to unnecessary requests. Use the memoize_build_index command to build an index for an existing store.
+    """
+
+    index_path = get_memo_index_path(path)
+    pathlib.Path(path).mkdir(mode=0o755, parents=True, exist_ok=True)
+
+    # Another process could be creating the index at the same time
+    with open(MemoIndex.get_lock_path(index_path), "ab") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        try:
+            if os.path.exists(index_path):
+                return MemoIndex(index_path)
+
+            if memo_store.is_empty():
+                return MemoIndex.create(
+                    index_path, settings.PARLHIST_CRAWLER_MEMOIZE_INDEX_CAPACITY
+                )
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    logger.warning(
+        "No memoize index exists for the existing memoized requests in %s, run memoize_build_index to create one",
+        path,
+    )
+    return None
+
+
+def create_memo_store(backend: str, path: str) -> MemoStore:
+    """Create a MemoStore of the given backend type in path"""
+
+    if backend == "file":
+        return FileMemoStore(path)
+
+    if backend == "sqlite":
+        return SqliteMemoStore(f"{path}/memoized-requests.sqlite3")
+
+    raise MemoizeException(f"Unknown memoize backend {backend}")
+
+
+@shared_task
+def memoize_prune_task(max_bytes: int | None = None) -> tuple[int, int]:
+    """
+    Celery task to prune the memoize store to max_bytes (default PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES), e.g. nightly
+    using celery beat. Returns the number of removed memoized requests and the number of removed bytes.
+    """
+
+    if max_bytes is None:
+        max_bytes = settings.PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES
+
+    if max_bytes is None:
+        logger.warning("PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES is not set, not pruning")
+        return 0, 0
+
+    return get_memo_store().prune(max_bytes)
@@ -0,0 +1,275 @@
+"""
+parlhist/parlhistnl/crawler/ratelimit.py
+
+Rate limiting of the requests sent by the crawler, shared by all processes (e.g. celery workers).
+
+Every host has a token bucket: a request may only be sent once a token is available, and tokens are added at the
+current rate of the host. The rate is adjusted using AIMD (additive increase, multiplicative decrease): it slowly
+increases after every successful request, up to the maximum rate of the host, and it is cut down after a
+429 Too Many Requests response, a server error or a slow response.
+
+Every host also has a circuit breaker: after too many consecutive failed requests, or when the server asks us to
+wait using a Retry-After header, the circuit opens and no requests are sent to the host until it closes again.
+
+The state of the buckets is stored in a RateLimitBackend, which determines which processes share the rate limit:
+    - "local": only the threads of the current process
+    - "file": all processes on the current machine (a json file, locked using fcntl)
+    - "database": all processes using the same database (the CrawlerRateLimitState model)
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend:
+    """Base class for the storage of the rate limit state of every host"""
+
+    def update(self, host: str, function: Callable[[dict], Any]) -> Any:
+        """Atomically update the state of host using function, which modifies the state in place. Returns its result."""
+        raise NotImplementedError
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """Keeps the rate limit state in memory, shared by all threads of this process"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.states: dict[str, dict] = {}
+
+    def update(self, host: str, function: Callable[[dict], Any]) -> Any:
+        with self.lock:
+            return function(self.states.setdefault(host, {}))
+
+
+class FileRateLimitBackend(RateLimitBackend):
+    """Keeps the rate limit state in a json file, shared by all processes on this machine"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # fcntl locks are per process, so threads must also be serialized
+        self.lock = threading.Lock()
+
+    def update(self, host: str, function: Callable[[dict], Any]) -> Any:
+        with self.lock, open(self.path, "a+", encoding="utf-8") as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+
+            try:
+                state_file.seek(0)
+                content = state_file.read()
+                states = json.loads(content) if content != "" else {}
+
+                result = function(states.setdefault(host, {}))
+
+                state_file.seek(0)
+                state_file.truncate()
+                json.dump(states, state_file)
+                state_file.flush()
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+        return result
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    """Keeps the rate limit state in the database, shared by all processes on all machines using this database"""
+
+    def update(self, host: str, function: Callable[[dict], Any]) -> Any:
+        # Imported here, as the crawler utilities are imported before the models are ready
+        from parlhistnl.models import CrawlerRateLimitState
+
+        with transaction.atomic():
+            CrawlerRateLimitState.objects.get_or_create(host=host)
+            rate_limit_state = CrawlerRateLimitState.objects.select_for_update().get(
+                host=host
+            )
+
+            result = function(rate_limit_state.state)
+            rate_limit_state.save(update_fields=["state"])
+
+        return result
+
+
+def create_rate_limit_backend(backend: str) -> RateLimitBackend:
+    """Create the RateLimitBackend of the given type"""
+
+    if backend == "local":
+        return LocalRateLimitBackend()
+    if backend == "file":
+        return FileRateLimitBackend(settings.PARLHIST_CRAWLER_RATELIMIT_PATH)
+    if backend == "database":
+        return DatabaseRateLimitBackend()
+
+    raise ValueError(f"Unknown rate limit backend {backend}")
+
+
+def get_host_setting(setting: dict[str, float], host: str) -> float:
+    """Get the value of a per-host setting for host, falling back to the value for "*" """
+
+    return setting.get(host, setting["*"])
+
+
+class RateLimiter:
+    """Token bucket rate limiter per host, with AIMD adjustment of the rate and a circuit breaker"""
+
+    def __init__(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+
+    def __refill(self, host: str, state: dict, now: float) -> None:
+        """Add the tokens gained since the last update of the bucket of host"""
+
+        max_rate = get_host_setting(
+            settings.PARLHIST_CRAWLER_RATELIMIT_MAX_RATE, host
+        )
+        state.setdefault("rate", max_rate)
+        state.setdefault("tokens", settings.PARLHIST_CRAWLER_RATELIMIT_BURST)
+        state.setdefault("updated_at", now)
+
+        state["tokens"] = min(
+            settings.PARLHIST_CRAWLER_RATELIMIT_BURST,
+            state["tokens"] + (now - state["updated_at"]) * state["rate"],
+        )
+        state["updated_at"] = now
+
+    def acquire(self, host: str) -> float:
+        """Wait until a request to host may be sent, returns the number of seconds waited"""
+
+        def take_token(state: dict) -> float:
+            now = time.time()
+            self.__refill(host, state, now)
+
+            # While the circuit is open, no requests may be sent at all
+            open_seconds = max(0.0, state.get("open_until", 0.0) - now)
+
+            # Tokens may become negative: this reserves a token for a request that has to wait for it
+            state["tokens"] -= 1
+            if state["tokens"] >= 0:
+                return open_seconds
+
+            return open_seconds + -state["tokens"] / state["rate"]
+
+        wait_seconds = self.backend.update(host, take_token)
+
+        if wait_seconds > 0:
+            logger.debug(
+                "Waiting %.2f seconds before sending a request to %s", wait_seconds, host
+            )
+            time.sleep(wait_seconds)
+
+        return wait_seconds
+
+    def report(
+        self, host: str, status_code: int | None, elapsed_seconds: float
+    ) -> None:
+        """
+        Adjust the rate of host after a response (status_code None if no response was received), and open the
+        circuit of host after too many consecutive failed requests.
+        """
+
+        def adjust_rate(state: dict) -> None:
+            self.__refill(host, state, time.time())
+
+            max_rate = get_host_setting(
+                settings.PARLHIST_CRAWLER_RATELIMIT_MAX_RATE, host
+            )
+            min_rate = get_host_setting(
+                settings.PARLHIST_CRAWLER_RATELIMIT_MIN_RATE, host
+            )
+            is_slow = (
+                elapsed_seconds
+                > settings.PARLHIST_CRAWLER_RATELIMIT_SLOW_RESPONSE_SECONDS
+            )
+
+            if status_code is None or status_code == 429 or status_code >= 500:
+                state["failures"] = state.get("failures", 0) + 1
+
+                if (
+                    state["failures"]
+                    >= settings.PARLHIST_CRAWLER_CIRCUIT_BREAKER_FAILURES
+                ):
+                    logger.error(
+                        "%s consecutive failed requests to %s, pausing all requests to it for %s seconds",
+                        state["failures"],
+                        host,
+                        settings.PARLHIST_CRAWLER_CIRCUIT_BREAKER_OPEN_SECONDS,
+                    )
+                    state["open_until"] = (
+                        time.time()
+                        + settings.PARLHIST_CRAWLER_CIRCUIT_BREAKER_OPEN_SECONDS
+                    )
+                    state["failures"] = 0
+            else:
+                state["failures"] = 0
+
+            if status_code == 429:
+                state["rate"] = max(min_rate, state["rate"] / 2)
+                logger.warning(
+                    "Received 429 from %s, decreasing rate to %.2f requests/second",
+                    host,
+                    state["rate"],
+                )
+            elif status_code is None or status_code >= 500 or is_slow:
+                state["rate"] = max(min_rate, state["rate"] * 0.75)
+                logger.info(
+                    "Slow or failed request to %s, decreasing rate to %.2f requests/second",
+                    host,
+                    state["rate"],
+                )
+            else:
+                state["rate"] = min(
+                    max_rate, state["rate"] + settings.PARLHIST_CRAWLER_RATELIMIT_INCREASE
+                )
+
+        self.backend.update(host, adjust_rate)
+
+    def pause(self, host: str, seconds: float) -> None:
+        """Open the circuit of host for the given number of seconds, e.g. after a Retry-After header"""
+
+        def open_circuit(state: dict) -> None:
+            state["open_until"] = max(
+                state.get("open_until", 0.0), time.time() + seconds
+            )
+
+        logger.warning("Pausing all requests to %s for %.1f seconds", host, seconds)
+        self.backend.update(host, open_circuit)
+
+
+__rate_limiter: RateLimiter | None = None
+__rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the RateLimiter configured in the settings"""
+
+    global __rate_limiter
+
+    # All threads must share the same rate limiter, also when they request it at the same time
+    with __rate_limiter_lock:
+        if __rate_limiter is None:
+            __rate_limiter = RateLimiter(
+                create_rate_limit_backend(settings.PARLHIST_CRAWLER_RATELIMIT_BACKEND)
+            )
+
+    return __rate_limiter
+
+
+def get_host(url: str) -> str:
+    """Get the host of url, which determines the rate limit that applies to it"""
+
+    return urllib.parse.urlsplit(url).netloc
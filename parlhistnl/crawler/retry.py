@@ -0,0 +1,140 @@
+"""
+parlhist/parlhistnl/crawler/retry.py
+
+Sending requests with retries: transient failures (connection errors, timeouts, 429 and 5xx responses) are retried
+with an exponential backoff with jitter, respecting the Retry-After header, up to a maximum number of attempts.
+
+Every request goes through the shared rate limiter of its host, which also acts as circuit breaker: after too many
+consecutive failures all workers pause sending requests to that host.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import email.utils
+import logging
+import random
+import time
+
+import requests
+from django.conf import settings
+
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.ratelimit import get_host, get_rate_limiter
+from parlhistnl.crawler.session import get_session
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse the value of a Retry-After header (a number of seconds or a HTTP date) into a number of seconds"""
+
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        logger.warning("Could not parse Retry-After header %s", value)
+        return None
+
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def get_backoff_seconds(attempt: int, retry_after: float | None = None) -> float:
+    """The number of seconds to wait before the next attempt (attempt starts at 0), using full jitter"""
+
+    backoff_seconds = random.uniform(
+        0,
+        min(
+            settings.PARLHIST_CRAWLER_RETRY_MAX_BACKOFF_SECONDS,
+            settings.PARLHIST_CRAWLER_RETRY_BACKOFF_SECONDS * 2**attempt,
+        ),
+    )
+
+    if retry_after is not None:
+        return max(backoff_seconds, retry_after)
+
+    return backoff_seconds
+
+
+def send_request(url: str, **kwargs) -> requests.Response:
+    """
+    Send a GET request to url, respecting the shared rate limit of its host and retrying transient failures.
+
+    Returns the response, which may still have a retryable status code if all attempts failed. Raises a
+    CrawlerException if no response could be received at all.
+    """
+
+    rate_limiter = get_rate_limiter()
+    host = get_host(url)
+    max_attempts = settings.PARLHIST_CRAWLER_RETRY_MAX_ATTEMPTS
+
+    for attempt in range(max_attempts):
+        rate_limiter.acquire(host)
+        started_at = time.monotonic()
+
+        try:
+            response = get_session().get(
+                url, timeout=settings.PARLHIST_CRAWLER_HTTP_TIMEOUT_SECONDS, **kwargs
+            )
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ) as exc:
+            rate_limiter.report(host, None, time.monotonic() - started_at)
+
+            if attempt + 1 == max_attempts:
+                raise CrawlerException(
+                    f"Request to {url} failed after {max_attempts} attempts"
+                ) from exc
+
+            backoff_seconds = get_backoff_seconds(attempt)
+            logger.warning(
+                "Request to %s failed (%s), retrying in %.1f seconds",
+                url,
+                exc,
+                backoff_seconds,
+            )
+            time.sleep(backoff_seconds)
+            continue
+
+        rate_limiter.report(host, response.status_code, time.monotonic() - started_at)
+
+        if response.status_code not in RETRY_STATUS_CODES:
+            return response
+
+        if attempt + 1 == max_attempts:
+            logger.error(
+                "Request to %s still has status code %s after %s attempts",
+                url,
+                response.status_code,
+                max_attempts,
+            )
+            return response
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            # The server asks all of us to wait, not just this request
+            rate_limiter.pause(host, retry_after)
+
+        backoff_seconds = get_backoff_seconds(attempt, retry_after)
+        logger.warning(
+            "Received status code %s from %s, retrying in %.1f seconds",
+            response.status_code,
+            url,
+            backoff_seconds,
+        )
+        time.sleep(backoff_seconds)
+
+    # Not reachable, the last attempt always returns or raises
+    raise CrawlerException(f"Request to {url} failed")
@@ -0,0 +1,106 @@
+"""
+parlhist/parlhistnl/crawler/session.py
+
+Shared HTTP sessions for all requests sent by the crawler.
+
+Every process (e.g. every celery worker) has a single requests.Session, which is shared by all its threads, so that
+connections to zoek.officielebekendmakingen.nl and repository.overheid.nl are kept alive and reused between requests
+and threads, instead of setting up a new TCP and TLS connection for every request. The connection pool of the session
+is large enough for all crawler threads that may send requests at the same time.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+__lock = threading.Lock()
+__session: requests.Session | None = None
+
+
+def __reset_after_fork() -> None:
+    """Forget the session of the parent process in a forked process (e.g. a celery worker)"""
+
+    global __lock, __session  # pylint: disable=global-statement
+
+    # Connections must not be shared between processes, and the lock may have been held by another thread of the parent
+    __lock = threading.Lock()
+    __session = None
+
+
+os.register_at_fork(after_in_child=__reset_after_fork)
+
+
+def get_pool_maxsize() -> int:
+    """
+    Get the number of connections per host kept by the session: at least PARLHIST_CRAWLER_HTTP_POOL_MAXSIZE, and at
+    least the number of crawler threads that may send requests at the same time
+    """
+
+    return max(
+        settings.PARLHIST_CRAWLER_HTTP_POOL_MAXSIZE,
+        settings.PARLHIST_CRAWLER_FETCH_WORKERS
+        + settings.PARLHIST_CRAWLER_SRU_PAGE_WORKERS
+        * max(
+            settings.PARLHIST_CRAWLER_SRU_SHARD_WORKERS,
+            settings.PARLHIST_CRAWLER_DOSSIER_WORKERS,
+        ),
+    )
+
+
+def create_session() -> requests.Session:
+    """Create a new requests.Session with connection pooling and the configured headers"""
+
+    session = requests.Session()
+    session.headers.update(settings.PARLHIST_CRAWLER_HTTP_HEADERS)
+
+    adapter = HTTPAdapter(
+        pool_connections=settings.PARLHIST_CRAWLER_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=get_pool_maxsize(),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get the session of the current process, which is shared by all its threads"""
+
+    global __session  # pylint: disable=global-statement
+
+    session = __session
+    if session is not None:
+        return session
+
+    with __lock:
+        if __session is None:
+            logger.debug("Creating a new HTTP session for process %s", os.getpid())
+            __session = create_session()
+
+        return __session
+
+
+def close_session() -> None:
+    """Close the session of the current process and its connections, a new session is created when it is needed"""
+
+    global __session  # pylint: disable=global-statement
+
+    with __lock:
+        if __session is not None:
+            __session.close()
+            __session = None
+
+
+atexit.register(close_session)
@@ -0,0 +1,424 @@
+"""
+parlhist/parlhistnl/crawler/sink.py
+
+Writing parsed publications to the database in batches.
+
+A DatabaseSink buffers the output of parse_kamerstuk, parse_staatsblad and parse_handeling, and writes a batch using
+one upsert (bulk_create with update_conflicts) per type of publication, within one transaction. The natural keys of
+the publications are unique, so concurrent crawlers cannot create the same publication twice.
+
+KamerstukDossiers are created using the same kind of upsert, and their ids are cached within the process, as most
+kamerstukken belong to a dossier that already exists.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+import threading
+from typing import Any, TypeVar
+
+from django.conf import settings
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
+
+from parlhistnl.models import Handeling, Kamerstuk, KamerstukDossier, Staatsblad
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T", bound=models.Model)
+
+# The fields of a Kamerstuk set from the output of parse_kamerstuk
+KAMERSTUK_FIELDS = [
+    "ondernummer",
+    "vergaderjaar",
+    "kamer",
+    "kamerstuktype",
+    "documenttitel",
+    "indiener",
+    "tekst",
+    "raw_html",
+    "raw_metadata_xml",
+    "documentdatum",
+    "content_hash",
+]
+# The fields which identify a publication
+KAMERSTUK_UNIQUE_FIELDS = ["hoofddossier", "ondernummer"]
+STAATSBLAD_UNIQUE_FIELDS = ["jaargang", "nummer", "versienummer"]
+HANDELING_UNIQUE_FIELDS = ["identifier"]
+
+__dossier_ids: dict[str, int] = {}
+__dossier_ids_lock = threading.Lock()
+
+
+def __cache_dossier_ids(dossier_ids: dict[str, int]) -> None:
+    """Add the ids of KamerstukDossiers to the cache of this process"""
+
+    with __dossier_ids_lock:
+        __dossier_ids.update(dossier_ids)
+
+
+def clear_kamerstukdossier_cache() -> None:
+    """Clear the cached ids of KamerstukDossiers, e.g. after dossiers have been deleted"""
+
+    with __dossier_ids_lock:
+        __dossier_ids.clear()
+
+
+def save_changed_fields(obj: models.Model, values: dict[str, Any]) -> list[str]:
+    """
+    Set the values (by field name) that differ from those of obj, and only save these fields. Nothing is saved if
+    nothing has changed. Returns the names of the changed fields.
+    """
+
+    changed_fields = [
+        field for field, value in values.items() if getattr(obj, field) != value
+    ]
+    if len(changed_fields) == 0:
+        return []
+
+    for field in changed_fields:
+        setattr(obj, field, values[field])
+    obj.save(update_fields=changed_fields + ["bijgewerkt_op"])
+
+    return changed_fields
+
+
+def get_kamerstukdossier_ids(
+    dossiertitels: dict[str, str], update=False
+) -> dict[str, int]:
+    """
+    Get the ids of the KamerstukDossiers with the given dossiernummers (mapped to their dossiertitel), creating the
+    dossiers that do not exist yet. With update, the dossiertitel of existing dossiers is updated if it has changed.
+    """
+
+    dossier_ids: dict[str, int] = {}
+    if not update:
+        with __dossier_ids_lock:
+            dossier_ids = {
+                dossiernummer: __dossier_ids[dossiernummer]
+                for dossiernummer in dossiertitels
+                if dossiernummer in __dossier_ids
+            }
+
+    missing = set(dossiertitels) - set(dossier_ids)
+    if len(missing) == 0:
+        return dossier_ids
+
+    existing_dossiers = KamerstukDossier.objects.filter(
+        dossiernummer__in=missing
+    ).values_list("dossiernummer", "id", "dossiertitel")
+    existing = {row[0]: (row[1], row[2]) for row in existing_dossiers}
+
+    # Concurrent crawlers can create the same dossiers, these conflicts are ignored
+    new_dossiernummers = sorted(missing - set(existing))
+    if len(new_dossiernummers) > 0:
+        KamerstukDossier.objects.bulk_create(
+            [
+                KamerstukDossier(
+                    dossiernummer=dossiernummer,
+                    dossiertitel=dossiertitels[dossiernummer],
+                )
+                for dossiernummer in new_dossiernummers
+            ],
+            ignore_conflicts=True,
+        )
+        # The ids of created dossiers are not returned by every database, so they are queried
+        created_dossiers = KamerstukDossier.objects.filter(
+            dossiernummer__in=new_dossiernummers
+        ).values_list("dossiernummer", "id", "dossiertitel")
+        existing.update((row[0], (row[1], row[2])) for row in created_dossiers)
+
+    found_ids = {}
+    for dossiernummer, (dossier_id, dossiertitel) in existing.items():
+        found_ids[dossiernummer] = dossier_id
+
+        if update and dossiertitel != dossiertitels[dossiernummer]:
+            KamerstukDossier.objects.filter(id=dossier_id).update(
+                dossiertitel=dossiertitels[dossiernummer], bijgewerkt_op=timezone.now()
+            )
+
+    dossier_ids.update(found_ids)
+
+    # Only cache the ids once they are committed, a rolled back dossier does not exist
+    transaction.on_commit(lambda: __cache_dossier_ids(found_ids))
+
+    return dossier_ids
+
+
+class DatabaseSink:
+    """
+    Buffers parsed publications, and writes them to the database in batches of batch_size publications (default
+    PARLHIST_CRAWLER_SINK_BATCH_SIZE), see flush.
+
+    Publications that already exist are updated if update is true, and skipped otherwise. The add methods return the
+    (unsaved) object of the publication, which has an id once it has been written. A publication that could not be
+    written still has no id after flush. Use the sink as a context manager to write the remaining publications at the
+    end.
+    """
+
+    def __init__(self, update=False, batch_size: int | None = None) -> None:
+        self.update = update
+        self.batch_size = batch_size or settings.PARLHIST_CRAWLER_SINK_BATCH_SIZE
+
+        self.kamerstukken: list[tuple[Kamerstuk, str, str]] = []
+        self.staatsbladen: list[Staatsblad] = []
+        self.handelingen: list[Handeling] = []
+
+        # The number of publications written, skipped and failed so far
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def __enter__(self) -> "DatabaseSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self) -> int:
+        return len(self.kamerstukken) + len(self.staatsbladen) + len(self.handelingen)
+
+    def __added(self) -> None:
+        """Write the buffered publications if the batch is full"""
+
+        if len(self) >= self.batch_size:
+            self.flush()
+
+    def add_kamerstuk(self, parsed: dict[str, Any]) -> Kamerstuk:
+        """Add a Kamerstuk (the output of parse_kamerstuk), its KamerstukDossier is created when it is written"""
+
+        kst = Kamerstuk(**{field: parsed[field] for field in KAMERSTUK_FIELDS})
+        self.kamerstukken.append(
+            (kst, parsed["dossiernummer"], parsed["dossiertitel"])
+        )
+        self.__added()
+
+        return kst
+
+    def add_staatsblad(self, parsed: dict[str, Any]) -> Staatsblad:
+        """Add a Staatsblad (the output of parse_staatsblad)"""
+
+        stb = Staatsblad(**parsed)
+        self.staatsbladen.append(stb)
+        self.__added()
+
+        return stb
+
+    def add_handeling(self, parsed: dict[str, Any]) -> Handeling:
+        """Add a Handeling (the output of parse_handeling)"""
+
+        handeling = Handeling(**parsed)
+        self.handelingen.append(handeling)
+        self.__added()
+
+        return handeling
+
+    @staticmethod
+    def __get_key(obj: models.Model, unique_fields: list[str]) -> tuple:
+        """Get the natural key of an object, with values as stored in the database"""
+
+        return tuple(
+            obj._meta.get_field(field).get_prep_value(
+                getattr(obj, obj._meta.get_field(field).attname)
+            )
+            for field in unique_fields
+        )
+
+    def __get_existing(
+        self, model: type[T], objs: list[T], unique_fields: list[str]
+    ) -> dict[tuple, tuple[int, str]]:
+        """Get the id and content hash of the objects that already exist, by their natural key, using a single query"""
+
+        keys = {self.__get_key(obj, unique_fields) for obj in objs}
+        if len(keys) == 0:
+            return {}
+
+        attnames = [model._meta.get_field(field).attname for field in unique_fields]
+        existing = model.objects.filter(
+            **{
+                f"{attname}__in": {key[index] for key in keys}
+                for index, attname in enumerate(attnames)
+            }
+        ).values_list(*attnames, "id", "content_hash")
+
+        return {
+            tuple(row[:-2]): (row[-2], row[-1])
+            for row in existing
+            if tuple(row[:-2]) in keys
+        }
+
+    def __update_changed(
+        self, model: type[T], objs: list[T], unique_fields: list[str]
+    ) -> int:
+        """Only save the fields of the existing objects that differ from objs, returns the number of changed objects"""
+
+        fields = [
+            field
+            for field in model._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in unique_fields
+            and field.name not in ("toegevoegd_op", "bijgewerkt_op")
+        ]
+        existing_objs = model.objects.in_bulk([obj.pk for obj in objs])
+
+        changed = 0
+        for obj in objs:
+            changed_fields = save_changed_fields(
+                existing_objs[obj.pk],
+                {field.attname: getattr(obj, field.attname) for field in fields},
+            )
+            if len(changed_fields) > 0:
+                logger.debug("Updated %s of %s", changed_fields, obj.pk)
+                changed += 1
+
+        return changed
+
+    def __upsert(self, model: type[T], objs: list[T], unique_fields: list[str]) -> int:
+        """
+        Create objs, or update the existing objects with the same natural key if update is true (otherwise these are
+        skipped). Existing objects are only updated if their content hash has changed, and then only the changed
+        fields are saved. Sets the id of every object. Returns the number of created or updated objects.
+        """
+
+        # A publication could have been added twice, only the last one is written
+        unique_objs = list({self.__get_key(obj, unique_fields): obj for obj in objs}.values())
+        existing = self.__get_existing(model, unique_objs, unique_fields)
+
+        new_objs: list[T] = []
+        changed_objs: list[T] = []
+        for obj in unique_objs:
+            key = self.__get_key(obj, unique_fields)
+            if key not in existing:
+                new_objs.append(obj)
+                continue
+
+            obj.pk, content_hash = existing[key]
+            if self.update and content_hash != obj.content_hash:
+                changed_objs.append(obj)
+
+        if len(new_objs) > 0:
+            # A concurrent crawler could have created the same publications in the meantime
+            model.objects.bulk_create(
+                new_objs,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=[
+                    field.name
+                    for field in model._meta.concrete_fields
+                    if not field.primary_key
+                    and field.name not in unique_fields
+                    and field.name != "toegevoegd_op"
+                ],
+            )
+
+        written = len(new_objs) + self.__update_changed(
+            model, changed_objs, unique_fields
+        )
+
+        ids = {self.__get_key(obj, unique_fields): obj.pk for obj in unique_objs}
+        for obj in objs:
+            obj.pk = ids[self.__get_key(obj, unique_fields)]
+
+        return written
+
+    def __write(
+        self,
+        kamerstukken: list[tuple[Kamerstuk, str, str]],
+        staatsbladen: list[Staatsblad],
+        handelingen: list[Handeling],
+    ) -> int:
+        """Write publications in one transaction, returns the number of written publications"""
+
+        with transaction.atomic():
+            written = 0
+
+            if len(kamerstukken) > 0:
+                dossier_ids = get_kamerstukdossier_ids(
+                    {
+                        dossiernummer: dossiertitel
+                        for _, dossiernummer, dossiertitel in kamerstukken
+                    },
+                    update=self.update,
+                )
+                for kst, dossiernummer, _ in kamerstukken:
+                    kst.hoofddossier_id = dossier_ids[dossiernummer]
+
+                written += self.__upsert(
+                    Kamerstuk,
+                    [kst for kst, _, _ in kamerstukken],
+                    KAMERSTUK_UNIQUE_FIELDS,
+                )
+
+            written += self.__upsert(Staatsblad, staatsbladen, STAATSBLAD_UNIQUE_FIELDS)
+            written += self.__upsert(Handeling, handelingen, HANDELING_UNIQUE_FIELDS)
+
+        return written
+
+    def flush(self) -> int:
+        """
+        Write all buffered publications in one transaction, returns the number of written publications.
+
+        If the transaction fails, every publication is written in its own transaction, so that a single publication
+        that cannot be written does not prevent the others from being written. The publications that could not be
+        written are left without an id.
+        """
+
+        if len(self) == 0:
+            return 0
+
+        buffered = len(self)
+        kamerstukken, staatsbladen, handelingen = (
+            self.kamerstukken,
+            self.staatsbladen,
+            self.handelingen,
+        )
+        self.kamerstukken = []
+        self.staatsbladen = []
+        self.handelingen = []
+
+        try:
+            written = self.__write(kamerstukken, staatsbladen, handelingen)
+        except DatabaseError as exc:
+            logger.error(
+                "Could not write a batch of %s publications (%s), writing them one by one",
+                buffered,
+                exc,
+            )
+
+            written = 0
+            single_publications: list[
+                tuple[str, models.Model, tuple[list, list, list]]
+            ] = []
+            for kamerstuk in kamerstukken:
+                identifier = f"kst-{kamerstuk[1]}-{kamerstuk[0].ondernummer}"
+                single_publications.append(
+                    (identifier, kamerstuk[0], ([kamerstuk], [], []))
+                )
+            for stb in staatsbladen:
+                identifier = f"stb-{stb.jaargang}-{stb.nummer}"
+                single_publications.append((identifier, stb, ([], [stb], [])))
+            for handeling in handelingen:
+                single_publications.append(
+                    (handeling.identifier, handeling, ([], [], [handeling]))
+                )
+
+            for identifier, obj, publication in single_publications:
+                # The id may have been set before the transaction of the batch was rolled back
+                obj.pk = None
+                try:
+                    written += self.__write(*publication)
+                except DatabaseError as single_exc:
+                    logger.error("Could not write %s (%s)", identifier, single_exc)
+                    obj.pk = None
+                    self.failed += 1
+                    buffered -= 1
+
+        logger.debug("Wrote %s publications, skipped %s", written, buffered - written)
+
+        self.written += written
+        self.skipped += buffered - written
+
+        return written
@@ -12,20 +12,42 @@ import datetime
 import logging
 import xml.etree.ElementTree as ET
 
-from bs4 import BeautifulSoup
+from concurrent.futures import Future
+from typing import Iterable
+
 from celery import shared_task
 from celery.result import AsyncResult
+from django.conf import settings
 
 from parlhistnl.models import Staatsblad
+from parlhistnl.crawler.checkpoint import CrawlCheckpoint
+from parlhistnl.crawler.extraction import (
+    extract_broodtekst,
+    extract_text_from_html,
+    extract_text_from_xml,
+)
+from parlhistnl.crawler.fetch import fetch_urls, prefetch_ahead
+from parlhistnl.crawler.sink import DatabaseSink, save_changed_fields
 from parlhistnl.crawler.utils import (
     CrawlerException,
-    get_url_or_error,
-    koop_sru_api_request_all,
+    get_content_hash,
+    get_metadata_xml_from_sru_record,
+    get_missing_metadata,
+    iter_records_with_existing,
+    koop_sru_api_iter_records,
     XML_NAMESPACES,
 )
 
 logger = logging.getLogger(__name__)
 
+# The metadata used by parse_staatsblad, metadata.xml is requested if any of it is missing from the KOOP SRU record
+STAATSBLAD_REQUIRED_METADATA = [
+    "metadata[@name='DCTERMS.issued']",
+    "metadata[@name='OVERHEIDop.datumOndertekening']",
+    "metadata[@name='DC.title']",
+    "metadata[@name='DC.type'][@scheme='OVERHEIDop.Staatsblad']",
+]
+
 
 def __get_publicatiedatum(xml: ET.Element) -> datetime.date:
     """Get the publicatiedatum from from a parsed metadata xml"""
@@ -89,83 +111,32 @@ def __get_staatsblad_type(xml: ET.Element, titel: str) -> Staatsblad.StaatsbladT
     return Staatsblad.StaatsbladType.ONBEKEND
 
 
-# TODO split this up just like handeling to enable easy re-indexing of existing Staatsblad publications
-def crawl_staatsblad(
-    jaargang: int, nummer: str, versienummer="", update=False, preferred_url=None
-) -> Staatsblad:
-    """Crawl a Staatsblad"""
-
-    logger.info("Crawling Staatsblad %s, %s, %s", jaargang, nummer, versienummer)
-
-    if preferred_url is None:
-        if versienummer == "":
-            base_url: str = (
-                f"https://zoek.officielebekendmakingen.nl/stb-{jaargang}-{nummer}"
-            )
-        else:
-            base_url: str = (
-                f"https://zoek.officielebekendmakingen.nl/stb-{jaargang}-{nummer}-{versienummer}"
-            )
-        html_url = f"{base_url}.html"
-        meta_url = f"{base_url}/metadata.xml"
-    else:
-        html_url: str = preferred_url
-        meta_url = html_url.replace(".html", "/metadata.xml")
-
-    xml_url = html_url.replace(".html", ".xml")
-
-    try:
-        existing_stb = Staatsblad.objects.get(
-            jaargang=jaargang, nummer=nummer, versienummer=versienummer
-        )
-        logger.info("Staatsblad already exists")
-        if not update:
-            logger.info("Update set to false, returning existing Staatsblad")
-            return existing_stb
-    except Staatsblad.DoesNotExist:
-        existing_stb = None
-
-    # First, check if it could actually exist
-    try:
-        text_response = get_url_or_error(html_url)
-    except CrawlerException as exc:
-        logger.critical(
-            "Could not retrieve HTML version for this Staatsblad, tried %s", html_url
-        )
-        raise CrawlerException(
-            "Could not retrieve HTML version for this Staatsblad"
-        ) from exc
-
-    try:
-        meta_response = get_url_or_error(meta_url)
-    except CrawlerException as exc:
-        logger.fatal(
-            "Could not retrieve XML metadata for this Staatsblad, tried %s", meta_url
-        )
-        raise CrawlerException(
-            "Could not retrieve XML metadata for this Staatsblad"
-        ) from exc
+def parse_staatsblad(
+    jaargang: int,
+    nummer: str,
+    versienummer: str,
+    raw_html: str | None,
+    raw_xml: str,
+    raw_metadata_xml: str,
+    preferred_url=None,
+    raw_html_is_inner_html=False,
+) -> dict:
+    """
+    Parse the raw html, raw xml and raw metadata xml of a Staatsblad into the values of the Staatsblad fields
 
-    try:
-        xml_response = get_url_or_error(xml_url)
-    except CrawlerException as exc:
-        logger.fatal(
-            "Could not retrieve XML metadata for this Staatsblad, tried %s", xml_url
-        )
-        raise CrawlerException(
-            "Could not retrieve XML metadata for this Staatsblad"
-        ) from exc
+    This does not touch the database or the network, so that it can be used to (re)build Staatsbladen from
+    memoized requests or stored raw data. If raw_html is None, the text is extracted from the raw xml.
+    """
 
-    metadata_xml = ET.fromstring(meta_response.text)
+    metadata_xml = ET.fromstring(raw_metadata_xml)
 
     try:
         publicatiedatum = __get_publicatiedatum(metadata_xml)
     except IndexError:
         logger.error(
-            "Could not get publicatiedatum for %s %s (%s), using fallback date 1800-01-01",
+            "Could not get publicatiedatum for %s %s, using fallback date 1800-01-01",
             jaargang,
             nummer,
-            meta_url,
         )
         publicatiedatum = datetime.date(1800, 1, 1)
 
@@ -173,19 +144,16 @@ def crawl_staatsblad(
         ondertekendatum = __get_ondertekendatum(metadata_xml)
     except IndexError:
         logger.error(
-            "Could not get ondertekendatum for %s %s (%s), using fallback date 1800-01-01",
+            "Could not get ondertekendatum for %s %s, using fallback date 1800-01-01",
             jaargang,
             nummer,
-            meta_url,
         )
         ondertekendatum = datetime.date(1800, 1, 1)
 
     try:
         titel = __get_titel(metadata_xml)
     except IndexError as exc:
-        logger.critical(
-            "Could not get titel for %s %s (%s)", jaargang, nummer, meta_url
-        )
+        logger.critical("Could not get titel for %s %s", jaargang, nummer)
         raise CrawlerException("Failed to get core metadata") from exc
 
     try:
@@ -209,56 +177,231 @@ def crawl_staatsblad(
                 "content"
             )]
 
-    # TODO: Make specific function for extracting this inner html
-    soup = BeautifulSoup(text_response.text, "html.parser")
+    if raw_html is None:
+        inner_html = ""
+        tekst = extract_text_from_xml(raw_xml)
+    elif raw_html_is_inner_html:
+        inner_html = raw_html
+        tekst = extract_text_from_html(raw_html)
+    else:
+        inner_html, tekst, matches = extract_broodtekst(raw_html)
 
-    inner_text_elements = soup.select(
-        "article div#broodtekst.stuk.broodtekst-container"
-    )
+        if matches > 1:
+            logger.warning(
+                "While extracting the inner html text, multiple matches were found where only one was expected %s %s",
+                jaargang,
+                nummer,
+            )
 
-    if len(inner_text_elements) > 1:
-        logger.warning(
-            "While extracting the inner html text, multiple matches were found where only one was expected %s",
+        if matches == 0:
+            raise CrawlerException(
+                f"Could not find the text of Staatsblad {jaargang} {nummer}"
+            )
+
+    parsed = {
+        "jaargang": jaargang,
+        "nummer": nummer,
+        "versienummer": versienummer,
+        "titel": titel,
+        "tekst": tekst,
+        "raw_html": inner_html,
+        "raw_xml": raw_xml,
+        "raw_metadata_xml": raw_metadata_xml,
+        "metadata_json": metadata_json,
+        "publicatiedatum": publicatiedatum,
+        "ondertekendatum": ondertekendatum,
+        "staatsblad_type": staatsblad_type,
+        "preferred_url": preferred_url,
+    }
+    parsed["content_hash"] = get_content_hash(parsed)
+
+    return parsed
+
+
+def save_parsed_staatsblad(
+    parsed: dict, existing_stb: Staatsblad | None = None
+) -> Staatsblad:
+    """Create a Staatsblad from the output of parse_staatsblad, or update existing_stb"""
+
+    if existing_stb is not None:
+        if existing_stb.content_hash == parsed["content_hash"]:
+            logger.info("Staatsblad has not changed, not updating it")
+            return existing_stb
+
+        save_changed_fields(existing_stb, parsed)
+        return existing_stb
+
+    return Staatsblad.objects.create(**parsed)
+
+
+def get_staatsblad_urls(
+    jaargang: int, nummer: str, versienummer="", preferred_url=None
+) -> tuple[str, str, str]:
+    """Get the urls of the html, the metadata xml and the xml of a Staatsblad"""
+
+    if preferred_url is None:
+        if versienummer == "":
+            base_url: str = (
+                f"https://zoek.officielebekendmakingen.nl/stb-{jaargang}-{nummer}"
+            )
+        else:
+            base_url: str = (
+                f"https://zoek.officielebekendmakingen.nl/stb-{jaargang}-{nummer}-{versienummer}"
+            )
+        html_url = f"{base_url}.html"
+        meta_url = f"{base_url}/metadata.xml"
+    else:
+        html_url: str = preferred_url
+        meta_url = html_url.replace(".html", "/metadata.xml")
+
+    xml_url = html_url.replace(".html", ".xml")
+
+    return html_url, meta_url, xml_url
+
+
+def get_staatsblad_metadata_from_sru_record(
+    sru_record: ET.Element | None,
+) -> str | None:
+    """
+    Get the metadata of a Staatsblad from its KOOP SRU record, in the format of metadata.xml. Returns None if
+    metadata.xml has to be requested instead, because PARLHIST_CRAWLER_METADATA_FROM_SRU_RECORD is disabled or
+    because the record lacks some of the metadata.
+    """
+
+    if sru_record is None or not settings.PARLHIST_CRAWLER_METADATA_FROM_SRU_RECORD:
+        return None
+
+    raw_metadata_xml = get_metadata_xml_from_sru_record(sru_record)
+
+    missing = get_missing_metadata(raw_metadata_xml, STAATSBLAD_REQUIRED_METADATA)
+    if len(missing) > 0:
+        logger.debug("SRU record lacks %s, requesting metadata.xml", missing)
+        return None
+
+    return raw_metadata_xml
+
+
+def __get_staatsblad_html(html_future: Future, html_url: str) -> str:
+    """Get the html of a Staatsblad from the future returned by fetch_urls"""
+
+    # First, check if it could actually exist
+    try:
+        return html_future.result().text
+    except CrawlerException as exc:
+        logger.critical(
+            "Could not retrieve HTML version for this Staatsblad, tried %s",
             html_url,
         )
+        raise CrawlerException(
+            "Could not retrieve HTML version for this Staatsblad"
+        ) from exc
+
+
+def crawl_staatsblad(
+    jaargang: int,
+    nummer: str,
+    versienummer="",
+    update=False,
+    preferred_url=None,
+    sru_record: ET.Element | None = None,
+    sink: DatabaseSink | None = None,
+) -> Staatsblad:
+    """
+    Crawl a Staatsblad, taking its metadata from sru_record if possible (see get_staatsblad_metadata_from_sru_record).
+
+    If sink is given, the Staatsblad is added to it instead of saved, the sink then updates or skips an existing
+    Staatsblad.
+    """
+
+    logger.info("Crawling Staatsblad %s, %s, %s", jaargang, nummer, versienummer)
+
+    html_url, meta_url, xml_url = get_staatsblad_urls(
+        jaargang, nummer, versienummer, preferred_url
+    )
 
-    inner_html = str(inner_text_elements[0])
-
-    tekst = inner_text_elements[0].get_text()
-
-    if update and existing_stb is not None:
-        existing_stb.jaargang = jaargang
-        existing_stb.versienummer = versienummer
-        existing_stb.titel = titel
-        existing_stb.publicatiedatum = publicatiedatum
-        existing_stb.ondertekendatum = ondertekendatum
-        existing_stb.tekst = tekst
-        existing_stb.raw_html = inner_html
-        existing_stb.raw_xml = xml_response.text
-        existing_stb.raw_metadata_xml = meta_response.text
-        existing_stb.metadata_json = metadata_json
-        existing_stb.staatsblad_type = staatsblad_type
-        existing_stb.preferred_url = preferred_url
-        existing_stb.save()
-        stb = existing_stb
+    existing_stb = None
+    if sink is None:
+        try:
+            existing_stb = Staatsblad.objects.get(
+                jaargang=jaargang, nummer=nummer, versienummer=versienummer
+            )
+            logger.info("Staatsblad already exists")
+            if not update:
+                logger.info("Update set to false, returning existing Staatsblad")
+                return existing_stb
+        except Staatsblad.DoesNotExist:
+            pass
+
+    raw_metadata_xml = get_staatsblad_metadata_from_sru_record(sru_record)
+    text_from_xml = settings.PARLHIST_CRAWLER_TEXT_FROM_XML
+
+    urls = [xml_url]
+    if raw_metadata_xml is None:
+        urls.append(meta_url)
+    if not text_from_xml:
+        urls.append(html_url)
+    futures = dict(zip(urls, fetch_urls(urls, revalidate=update)))
+
+    if html_url in futures:
+        raw_html = __get_staatsblad_html(futures[html_url], html_url)
     else:
-        # Note that if update is false and it already exists, this code path is unreachable
-        stb = Staatsblad.objects.create(
-            jaargang=jaargang,
-            nummer=nummer,
-            versienummer=versienummer,
-            titel=titel,
-            tekst=tekst,
-            raw_html=inner_html,
-            raw_xml=xml_response.text,
-            raw_metadata_xml=meta_response.text,
-            metadata_json=metadata_json,
-            publicatiedatum=publicatiedatum,
-            ondertekendatum=ondertekendatum,
-            staatsblad_type=staatsblad_type,
+        raw_html = None
+
+    if meta_url in futures:
+        try:
+            raw_metadata_xml = futures[meta_url].result().text
+        except CrawlerException as exc:
+            logger.fatal(
+                "Could not retrieve XML metadata for this Staatsblad, tried %s",
+                meta_url,
+            )
+            raise CrawlerException(
+                "Could not retrieve XML metadata for this Staatsblad"
+            ) from exc
+
+    try:
+        xml_response = futures[xml_url].result()
+    except CrawlerException as exc:
+        logger.fatal(
+            "Could not retrieve XML metadata for this Staatsblad, tried %s", xml_url
+        )
+        raise CrawlerException(
+            "Could not retrieve XML metadata for this Staatsblad"
+        ) from exc
+
+    parsed = parse_staatsblad(
+        jaargang,
+        nummer,
+        versienummer,
+        raw_html,
+        xml_response.text,
+        raw_metadata_xml,
+        preferred_url=preferred_url,
+    )
+
+    if raw_html is None and parsed["tekst"] == "":
+        logger.warning(
+            "Could not extract the text of Staatsblad %s %s from its xml, requesting the html",
+            jaargang,
+            nummer,
+        )
+        (html_future,) = fetch_urls([html_url], revalidate=update)
+        parsed = parse_staatsblad(
+            jaargang,
+            nummer,
+            versienummer,
+            __get_staatsblad_html(html_future, html_url),
+            xml_response.text,
+            raw_metadata_xml,
             preferred_url=preferred_url,
         )
 
+    if sink is not None:
+        return sink.add_staatsblad(parsed)
+
+    # Note that if update is false and it already exists, existing_stb is never passed
+    stb = save_parsed_staatsblad(parsed, existing_stb=existing_stb)
+
     logger.debug(stb)
 
     return stb
@@ -266,7 +409,12 @@ def crawl_staatsblad(
 
 @shared_task
 def crawl_staatsblad_task(
-    jaargang: int, nummer: str, versienummer="", update=False, preferred_url=None
+    jaargang: int,
+    nummer: str,
+    versienummer="",
+    update=False,
+    preferred_url=None,
+    sru_record_string: str | None = None,
 ) -> int:
     """Wrapper function for crawl_staatsblad as a celery tasks that returns just the id of the staatsblad in the database"""
     stb = crawl_staatsblad(
@@ -275,10 +423,98 @@ def crawl_staatsblad_task(
         versienummer=versienummer,
         update=update,
         preferred_url=preferred_url,
+        sru_record=(
+            ET.fromstring(sru_record_string) if sru_record_string is not None else None
+        ),
     )
     return stb.id
 
 
+def __get_staatsblad_nummers_from_sru_record(
+    record: ET.Element,
+) -> tuple[int, str, str, str | None]:
+    """Get the jaargang, nummer, versienummer and preferred url (if any) of a Staatsblad from its KOOP SRU record"""
+
+    jaargang_record_xml = record.find(".//overheidwetgeving:jaargang", XML_NAMESPACES)
+    if jaargang_record_xml is None:
+        raise CrawlerException(f"Could not find jaargang record in {record}")
+    jaargang_record = jaargang_record_xml.text
+    if jaargang_record is None or jaargang_record == "":
+        raise CrawlerException(f"Jaargang record has no text in {record}")
+
+    try:
+        jaargang_record = int(jaargang_record)
+    except ValueError as exc:
+        raise CrawlerException(
+            f"Jaargang record could not be converted to int {jaargang_record}, {record}"
+        ) from exc
+
+    nummer_record_xml = record.find(
+        ".//overheidwetgeving:publicatienummer", XML_NAMESPACES
+    )
+    if nummer_record_xml is None:
+        raise CrawlerException(f"Could not find nummer record in {record}")
+    nummer_record = nummer_record_xml.text
+    if nummer_record is None or nummer_record == "":
+        raise CrawlerException(f"Nummer record has no text in {record}")
+
+    versienummer_xml = record.find(".//overheidwetgeving:versienummer", XML_NAMESPACES)
+    if versienummer_xml is not None:
+        logger.debug("Found versienummer, expecting verbeterblad...")
+        versienummer = versienummer_xml.text
+    else:
+        versienummer = ""
+
+    logger.debug("Found jaargang %s, nummer %s", jaargang_record, nummer_record)
+
+    try:
+        preferred_url = record.find(".//gzd:preferredUrl", XML_NAMESPACES).text
+        logger.debug("Found preferred url %s", preferred_url)
+    except AttributeError:
+        logger.warning(
+            "Couldn't find a preferred url for %s %s %s, falling back to default",
+            jaargang_record,
+            nummer_record,
+            record,
+        )
+        preferred_url = None
+
+    return jaargang_record, nummer_record, versienummer, preferred_url
+
+
+def __get_staatsblad_key_from_sru_record(record: ET.Element) -> tuple[int, str, str]:
+    """Get the jaargang, nummer and versienummer of a Staatsblad from its KOOP SRU record"""
+
+    jaargang, nummer, versienummer, _ = __get_staatsblad_nummers_from_sru_record(record)
+
+    return jaargang, nummer, versienummer
+
+
+def get_existing_staatsbladen(
+    keys: list[tuple[int, str, str]],
+) -> dict[tuple[int, str, str], Staatsblad]:
+    """Get the existing Staatsbladen for a list of (jaargang, nummer, versienummer), using a single query"""
+
+    wanted_keys = set(keys)
+    # The nummer of a Staatsblad is stored as an integer
+    nummers = {int(key[1]) for key in wanted_keys if key[1].isdigit()}
+    if len(nummers) == 0:
+        return {}
+
+    # Only the natural key is loaded, other fields are loaded when they are used
+    staatsbladen = Staatsblad.objects.filter(
+        jaargang__in={key[0] for key in wanted_keys}, nummer__in=nummers
+    ).only("jaargang", "nummer", "versienummer")
+
+    existing: dict[tuple[int, str, str], Staatsblad] = {}
+    for stb in staatsbladen:
+        key = (stb.jaargang, str(stb.nummer), stb.versienummer)
+        if key in wanted_keys:
+            existing[key] = stb
+
+    return existing
+
+
 def crawl_all_staatsblad_publicaties_within_koop_sru_query(
     query: str, update=False, queue_tasks=False
 ) -> list[Staatsblad] | list[AsyncResult]:
@@ -290,59 +526,92 @@ def crawl_all_staatsblad_publicaties_within_koop_sru_query(
         (w.publicatienaam=Staatsblad AND dt.type=Wet AND dt.date >= 2024-01-01 AND dt.date <= 2024-12-31)
     """
 
+    # Crawling starts as soon as the first page of records has been received
+    return crawl_all_staatsblad_publicaties_from_sru_records(
+        koop_sru_api_iter_records(query), update=update, queue_tasks=queue_tasks
+    )
+
+
+def crawl_all_staatsblad_publicaties_from_sru_records(
+    records: Iterable[ET.Element],
+    update=False,
+    queue_tasks=False,
+    checkpoint: CrawlCheckpoint | None = None,
+) -> list[Staatsblad] | list[AsyncResult]:
+    """
+    Crawl the Staatsbladen of the given KOOP SRU records, marking every record as processed in checkpoint.
+
+    Unless update is true, records of Staatsbladen that already exist are skipped, these are looked up for many
+    records at once (see iter_records_with_existing). Crawled Staatsbladen are written to the database in batches
+    (see DatabaseSink), the checkpoint is only stored once the Staatsbladen before it have been written.
+    """
+
     results: list[Staatsblad] | list[AsyncResult] = []
-    records = koop_sru_api_request_all(query)
+    sink = None
+    if not queue_tasks:
+        sink = DatabaseSink(update=update)
+        if checkpoint is not None:
+            checkpoint.before_save = sink.flush
+
+    if update:
+        records_with_existing: Iterable[tuple[ET.Element, Staatsblad | None]] = (
+            (record, None) for record in records
+        )
+    else:
+        records_with_existing = iter_records_with_existing(
+            records, __get_staatsblad_key_from_sru_record, get_existing_staatsbladen
+        )
 
-    for record in records:
-        try:
-            logger.debug("Crawling %s", record)
-            jaargang_record_xml = record.find(
-                ".//overheidwetgeving:jaargang", XML_NAMESPACES
-            )
-            if jaargang_record_xml is None:
-                raise CrawlerException(f"Could not find jaargang record in {record}")
-            jaargang_record = jaargang_record_xml.text
-            if jaargang_record is None or jaargang_record == "":
-                raise CrawlerException(f"Jaargang record has no text in {record}")
-
-            try:
-                jaargang_record = int(jaargang_record)
-            except ValueError as exc:
-                raise CrawlerException(
-                    f"Jaargang record could not be converted to int {jaargang_record}, {record}"
-                ) from exc
-
-            nummer_record_xml = record.find(
-                ".//overheidwetgeving:publicatienummer", XML_NAMESPACES
+    if not queue_tasks:
+
+        def get_record_urls(
+            record_with_existing: tuple[ET.Element, Staatsblad | None],
+        ) -> list[str]:
+            record, existing_stb = record_with_existing
+            if existing_stb is not None:
+                return []
+
+            jaargang, nummer, versienummer, preferred_url = (
+                __get_staatsblad_nummers_from_sru_record(record)
             )
-            if nummer_record_xml is None:
-                raise CrawlerException(f"Could not find nummer record in {record}")
-            nummer_record = nummer_record_xml.text
-            if nummer_record is None or nummer_record == "":
-                raise CrawlerException(f"Nummer record has no text in {record}")
-
-            versienummer_xml = record.find(
-                ".//overheidwetgeving:versienummer", XML_NAMESPACES
+            html_url, meta_url, xml_url = get_staatsblad_urls(
+                jaargang, nummer, versienummer, preferred_url
             )
-            if versienummer_xml is not None:
-                logger.debug("Found versienummer, expecting verbeterblad...")
-                versienummer = versienummer_xml.text
-            else:
-                versienummer = ""
+            urls = [xml_url]
+            if get_staatsblad_metadata_from_sru_record(record) is None:
+                urls.append(meta_url)
+            if not settings.PARLHIST_CRAWLER_TEXT_FROM_XML:
+                urls.append(html_url)
 
-            logger.debug("Found jaargang %s, nummer %s", jaargang_record, nummer_record)
+            return urls
 
-            try:
-                preferred_url = record.find(".//gzd:preferredUrl", XML_NAMESPACES).text
-                logger.debug("Found preferred url %s", preferred_url)
-            except AttributeError:
-                logger.warning(
-                    "Couldn't find a preferred url for %s %s %s, falling back to default",
-                    jaargang_record,
-                    nummer_record,
-                    record,
-                )
-                preferred_url = None
+        # Fetch the next Staatsbladen while the current one is being parsed and saved
+        records_with_existing = prefetch_ahead(
+            records_with_existing, get_record_urls, revalidate=update
+        )
+
+    for record, existing_stb in records_with_existing:
+        jaargang_record = nummer_record = stb = None
+        failed = False
+
+        if existing_stb is not None:
+            logger.debug(
+                "Staatsblad %s %s %s already exists, skipping",
+                existing_stb.jaargang,
+                existing_stb.nummer,
+                existing_stb.versienummer,
+            )
+            if not queue_tasks:
+                results.append(existing_stb)
+            if checkpoint is not None:
+                checkpoint.processed(record)
+            continue
+
+        try:
+            logger.debug("Crawling %s", record)
+            jaargang_record, nummer_record, versienummer, preferred_url = (
+                __get_staatsblad_nummers_from_sru_record(record)
+            )
 
             if queue_tasks:
                 async_stb = crawl_staatsblad_task.delay(
@@ -351,6 +620,7 @@ def crawl_all_staatsblad_publicaties_within_koop_sru_query(
                     versienummer=versienummer,
                     update=update,
                     preferred_url=preferred_url,
+                    sru_record_string=ET.tostring(record, encoding="unicode"),
                 )
                 results.append(async_stb)
             else:
@@ -360,11 +630,15 @@ def crawl_all_staatsblad_publicaties_within_koop_sru_query(
                     versienummer=versienummer,
                     update=update,
                     preferred_url=preferred_url,
+                    sru_record=record,
+                    sink=sink,
                 )
                 results.append(stb)
         except CrawlerException:
+            failed = True
             logger.error("Failed to crawl stb-%s-%s", jaargang_record, nummer_record)
         except Exception as exc:
+            failed = True
             logger.error(
                 "Got an unexpected exception %s in crawling stb %s %s",
                 exc,
@@ -372,23 +646,44 @@ def crawl_all_staatsblad_publicaties_within_koop_sru_query(
                 nummer_record,
             )
 
+        if checkpoint is not None:
+            checkpoint.processed(record, failed=failed, publication=stb)
+
+    if sink is not None:
+        sink.flush()
+        # Publications that could not be written have not been crawled
+        results = [result for result in results if result.pk is not None]
+
     return results
 
 
 def crawl_all_staatsblad_publicaties_in_year(
-    year: int, update=False, queue_tasks=False
+    year: int, update=False, queue_tasks=False, resume=False
 ) -> list[Staatsblad] | list[AsyncResult]:
     """
     Crawl all the Staatsblad publicaties with their publicatiedatum within the range of year-01-01 and year-12-31 (inclusive).
 
+    The query is split into smaller queries by date, which are requested concurrently. The progress is stored in a
+    checkpoint, with resume=True an interrupted crawl continues from this checkpoint.
+
     year: any value between 1995 and the current year (inclusive)
     """
     current_year = datetime.date.today().year
     if year not in range(1995, current_year + 1):
         raise CrawlerException("Received invalid year %s", year)
 
-    return crawl_all_staatsblad_publicaties_within_koop_sru_query(
-        f"(w.publicatienaam=Staatsblad AND dt.date >= {year}-01-01 AND dt.date <= {year}-12-31)",
+    checkpoint = CrawlCheckpoint(
+        "w.publicatienaam=Staatsblad",
+        datetime.date(year, 1, 1),
+        datetime.date(year, 12, 31),
+        resume=resume,
+    )
+    results = crawl_all_staatsblad_publicaties_from_sru_records(
+        checkpoint.iter_records(),
         update=update,
         queue_tasks=queue_tasks,
+        checkpoint=checkpoint,
     )
+    checkpoint.complete()
+
+    return results
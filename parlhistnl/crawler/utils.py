@@ -8,21 +8,48 @@ SPDX-FileCopyrightText: 2025 Universiteit Leiden <m.a.staal [at] law.leidenuniv.
 SPDX-License-Identifier: EUPL-1.2
 """
 
+import collections
+import datetime
 import hashlib
+import io
+import itertools
+import json
 import logging
-import pathlib
-import pickle
 import time
 import xml.etree.ElementTree as ET
 
-from typing import Literal
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Hashable,
+    Iterable,
+    Iterator,
+    Literal,
+    TypeVar,
+)
 from xml.etree.ElementTree import Element
 
 import requests
 
 from django.conf import settings
 
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.memoize import (
+    MemoizeException,
+    get_memo_store,
+    is_memoized_request_fresh,
+)
+from parlhistnl.crawler.retry import (
+    RETRY_STATUS_CODES,
+    get_backoff_seconds,
+    send_request,
+)
+
 logger = logging.getLogger(__name__)
+K = TypeVar("K", bound=Hashable)
+M = TypeVar("M")
 XML_NAMESPACES = {
     "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
     "dcterms": "http://purl.org/dc/terms/",
@@ -36,23 +63,6 @@ XML_NAMESPACES = {
 }
 
 
-class CrawlerException(Exception):
-    """For when something goes wrong during crawling"""
-
-
-def __get_memoized_path(url: str) -> str:
-    """Get the full memoized path given a url"""
-    fn = hashlib.sha1(url.encode("utf-8")).hexdigest()
-    base_path = pathlib.Path(
-        f"{settings.PARLHIST_CRAWLER_MEMOIZE_PATH}/{fn[0]}/{fn[1]}"
-    )
-    base_path.mkdir(mode=0o755, parents=True, exist_ok=True)
-
-    full_path = f"{base_path}/{fn}"
-
-    return full_path
-
-
 def __check_response_status_code(response: requests.Response) -> None:
     """Check the status code of a response; if it is not 200, throw an CrawlerException"""
 
@@ -65,62 +75,98 @@ def __check_response_status_code(response: requests.Response) -> None:
         )
 
 
-inter_request_delay_seconds = 0.25
+def __send_revalidation_request(
+    url: str, memoized_response: requests.Response | None, **kwargs
+) -> requests.Response | None:
+    """
+    Send a request to url to revalidate memoized_response. Returns None if the request failed (no response, or still a
+    transient failure after all retries) while a memoized copy exists, which is then used instead, so that an outage
+    does not make memoized requests unavailable. Without a memoized copy, a failure is raised as usual.
+    """
+
+    try:
+        response = send_request(url, **kwargs)
+    except CrawlerException as exc:
+        if memoized_response is None:
+            raise
+
+        logger.warning(
+            "Could not revalidate memoized request to %s (%s), using the memoized copy",
+            url,
+            exc,
+        )
+        return None
+
+    if response.status_code in RETRY_STATUS_CODES and memoized_response is not None:
+        logger.warning(
+            "Could not revalidate memoized request to %s (status code %s), using the memoized copy",
+            url,
+            response.status_code,
+        )
+        return None
+
+    return response
 
 
 # TODO: Would be nice to also pass custom parameters, cookies and timeout values
 def get_url_or_error(
-    url: str, memoize=settings.PARLHIST_CRAWLER_DEFAULT_USE_MEMOIZATION
+    url: str,
+    memoize=settings.PARLHIST_CRAWLER_DEFAULT_USE_MEMOIZATION,
+    revalidate=False,
 ) -> requests.Response:
     """Try to get a page, or throw a CrawlerException if it fails
 
     By default, it memoizes the requests in order to lower issues at the receiver end, but to
     be able to still easily change behaviour on our side.
+    Memoized requests that are expired, or all memoized requests if revalidate is True, are
+    revalidated with a conditional request (If-None-Match / If-Modified-Since). If the server cannot
+    be reached, the memoized request is used as it is.
     Also fixes encoding
     """
 
-    # This is a bit of a naive approach, I'm not even sure if this would work between celery
-    # workers and tasks. I guess the proper approach would be to save this in an (in memory) database
-    # somewhere?
-    global inter_request_delay_seconds
-    logger.debug("inter_request_delay_seconds: %s", inter_request_delay_seconds)
+    memoized_response = None
+    request_headers = {}
 
     if memoize:
         logger.debug("Checking if memoized version exists for %s", url)
         # First try if a memoized version of this request exists
-        full_path = __get_memoized_path(url)
-        if pathlib.Path(full_path).exists():
-            logger.debug("Memoized request exists, returning that instead")
-            # Recover memoized request
-            with open(full_path, "rb") as pickle_file:
-                response = pickle.load(pickle_file)
-                __check_response_status_code(response)
-                return response
+        try:
+            memoized = get_memo_store().get_memoized(url)
+        except MemoizeException as exc:
+            raise CrawlerException(f"Could not read memoized request for {url}") from exc
+
+        if memoized is not None:
+            memoized_response, memoized_at = memoized
+
+            if not revalidate and is_memoized_request_fresh(url, memoized_at):
+                logger.debug("Memoized request exists, returning that instead")
+                __check_response_status_code(memoized_response)
+                return memoized_response
+
+            logger.debug("Memoized request exists, revalidating it")
+            if "ETag" in memoized_response.headers:
+                request_headers["If-None-Match"] = memoized_response.headers["ETag"]
+            if "Last-Modified" in memoized_response.headers:
+                request_headers["If-Modified-Since"] = memoized_response.headers[
+                    "Last-Modified"
+                ]
         else:
             logger.debug("No memoized version exists, hitting server")
 
-    try:
-        response = requests.get(url, timeout=30)
-        logger.debug(
-            "Actual request was sent, sleeping to prevent service disruption at receiver end"
-        )
-        time.sleep(inter_request_delay_seconds)
-    except requests.exceptions.ReadTimeout as exc:
-        raise CrawlerException from exc
-
-    # This will potentially go on forever... Is that the right approach?
-    if response.status_code == 429:
-        logger.error("Received HTTP 429 Too Many Requests status code, backing off and retrying")
-
-        inter_request_delay_seconds *= 2
+    # Transient failures (connection errors, 429 and 5xx responses) are retried with a backoff
+    response = __send_revalidation_request(
+        url, memoized_response, headers=request_headers
+    )
 
-        while response.status_code == 429:
-            response = requests.get(url, timeout=30)
-            inter_request_delay_seconds *= 2
+    if response is None:
+        __check_response_status_code(memoized_response)
+        return memoized_response
 
-    else:
-        if inter_request_delay_seconds > 0.25:
-            inter_request_delay_seconds /= 2
+    if response.status_code == 304 and memoized_response is not None:
+        logger.debug("Memoized request to %s is not modified, refreshing it", url)
+        get_memo_store().refresh(url)
+        __check_response_status_code(memoized_response)
+        return memoized_response
 
     __check_response_status_code(response)
 
@@ -133,32 +179,66 @@ def get_url_or_error(
         response.encoding = response.apparent_encoding
 
     if memoize:
-        full_path = __get_memoized_path(url)
-
-        logger.debug("Memoizing request to %s", full_path)
+        logger.debug("Memoizing request to %s", url)
 
-        with open(full_path, "wb") as pickle_file:
-            pickle.dump(response, pickle_file, pickle.HIGHEST_PROTOCOL)
+        get_memo_store().put_response(url, response)
 
     return response
 
 
-def koop_sru_api_request(
-    query: str, start_record: int, maximum_records: int
-) -> Element:
-    """Query the KOOP SRU API, return the complete response xml."""
-    api_url = "https://repository.overheid.nl/sru"
+KOOP_SRU_API_URL = "https://repository.overheid.nl/sru"
+SRU_RECORDS_TAG = f"{{{XML_NAMESPACES['sru']}}}records"
+SRU_RECORD_TAG = f"{{{XML_NAMESPACES['sru']}}}record"
+SRU_NUMBER_OF_RECORDS_TAG = f"{{{XML_NAMESPACES['sru']}}}numberOfRecords"
+
 
-    resp = requests.get(
-        api_url,
+def get_koop_sru_api_url(query: str, start_record: int, maximum_records: int) -> str:
+    """Get the url of a KOOP SRU API request, which also identifies the page in the memoize store"""
+
+    return requests.Request(
+        "GET",
+        KOOP_SRU_API_URL,
         params={
             "httpAccept": "application/xml",
             "startRecord": start_record,
             "maximumRecords": maximum_records,
             "query": query,
         },
-        timeout=25,
-    )
+    ).prepare().url
+
+
+def koop_sru_api_request_raw(
+    query: str,
+    start_record: int,
+    maximum_records: int,
+    memoize=settings.PARLHIST_CRAWLER_DEFAULT_USE_MEMOIZATION,
+) -> bytes:
+    """Query the KOOP SRU API, return the raw response xml. Note that start_record starts at 1.
+
+    If memoize is True, pages are memoized, and are reused until they expire (see PARLHIST_CRAWLER_MEMOIZE_TTL_SECONDS).
+    An expired page is still used if the KOOP SRU API cannot be reached.
+    """
+
+    url = get_koop_sru_api_url(query, start_record, maximum_records)
+    memoized_response = None
+
+    if memoize:
+        try:
+            memoized = get_memo_store().get_memoized(url)
+        except MemoizeException as exc:
+            raise CrawlerException(f"Could not read memoized request for {url}") from exc
+
+        if memoized is not None:
+            memoized_response, memoized_at = memoized
+
+            if is_memoized_request_fresh(url, memoized_at):
+                logger.debug("Using memoized SRU API page %s", url)
+                return memoized_response.content
+
+    resp = __send_revalidation_request(url, memoized_response)
+
+    if resp is None:
+        return memoized_response.content
 
     if resp.status_code != 200:
         logger.error(
@@ -168,32 +248,424 @@ def koop_sru_api_request(
             f"Non-200 status code while retrieving SRU API with query {query}"
         )
 
-    xml: Element = ET.fromstring(resp.text)
+    if memoize:
+        get_memo_store().put_response(url, resp)
+
+    return resp.content
+
+
+def koop_sru_api_request(
+    query: str, start_record: int, maximum_records: int
+) -> Element:
+    """Query the KOOP SRU API, return the complete response xml."""
+
+    xml: Element = ET.fromstring(
+        koop_sru_api_request_raw(query, start_record, maximum_records)
+    )
 
     return xml
 
 
-def koop_sru_api_request_all(query: str) -> list[Element]:
-    """Query the KOOP SRU API. Returns all records for the query, even if this requires multiple requests.
+def get_koop_sru_api_number_of_records(raw_xml: bytes) -> int:
+    """Get the total number of records for the query from a raw KOOP SRU API response, without parsing the records"""
+
+    for _, element in ET.iterparse(io.BytesIO(raw_xml)):
+        if element.tag == SRU_NUMBER_OF_RECORDS_TAG:
+            return int(element.text)
+
+    raise CrawlerException("Could not find numberOfRecords in SRU API response")
+
+
+def iter_koop_sru_api_records(raw_xml: bytes) -> Iterator[Element]:
+    """
+    Incrementally parse a raw KOOP SRU API response, yielding every record as soon as it has been parsed.
+
+    Yielded records are removed from the parsed response, so they are freed once the caller no longer needs them.
+    """
+
+    records_xml = None
+
+    for event, element in ET.iterparse(io.BytesIO(raw_xml), events=("start", "end")):
+        if event == "start":
+            if element.tag == SRU_RECORDS_TAG:
+                records_xml = element
+        elif element.tag == SRU_RECORD_TAG and records_xml is not None:
+            records_xml.remove(element)
+            yield element
+
+
+def koop_sru_api_iter_records(
+    query: str,
+    maximum_records: int = 1000,
+    memoize=settings.PARLHIST_CRAWLER_DEFAULT_USE_MEMOIZATION,
+) -> Iterator[Element]:
+    """Query the KOOP SRU API. Yields all records for the query in order, page by page.
+
+    Once the first page has been received, the next pages are requested by a pool of
+    PARLHIST_CRAWLER_SRU_PAGE_WORKERS threads, at most one page per thread ahead of the page being yielded.
 
     See https://data.overheid.nl/sites/default/files/dataset/d0cca537-44ea-48cf-9880-fa21e1a7058f/resources/Handleiding%2BSRU%2B2.0.pdf
     for more information about this API.
     """
 
-    start_record = 0
-    maximum_records = 1000
-    xml = koop_sru_api_request(query, start_record, maximum_records)
-    records = xml.findall("sru:records/sru:record", XML_NAMESPACES)
+    # SRU counts records starting at 1
+    raw_xml = koop_sru_api_request_raw(query, 1, maximum_records, memoize)
+    number_of_records = get_koop_sru_api_number_of_records(raw_xml)
+    logger.info("Found %s records for query %s", number_of_records, query)
+
+    yield from iter_koop_sru_api_records(raw_xml)
 
-    number_of_records = int(xml.find("sru:numberOfRecords", XML_NAMESPACES).text)
+    start_records = iter(
+        range(1 + maximum_records, number_of_records + 1, maximum_records)
+    )
+    workers = settings.PARLHIST_CRAWLER_SRU_PAGE_WORKERS
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="parlhist-sru"
+    ) as executor:
+        pending_pages: collections.deque[tuple[int, Future]] = collections.deque()
+
+        def request_next_page() -> None:
+            start_record = next(start_records, None)
+            if start_record is not None:
+                pending_pages.append(
+                    (
+                        start_record,
+                        executor.submit(
+                            koop_sru_api_request_raw,
+                            query,
+                            start_record,
+                            maximum_records,
+                            memoize,
+                        ),
+                    )
+                )
+
+        for _ in range(workers):
+            request_next_page()
+
+        while len(pending_pages) > 0:
+            start_record, page_future = pending_pages.popleft()
+            raw_xml = page_future.result()
+            request_next_page()
+
+            records_on_page = 0
+            for record in iter_koop_sru_api_records(raw_xml):
+                records_on_page += 1
+                yield record
+
+            if records_on_page == 0:
+                logger.warning(
+                    "Received no records starting at %s of %s for query %s",
+                    start_record,
+                    number_of_records,
+                    query,
+                )
 
-    while len(records) < number_of_records:
-        # We need another request to get all the records!
-        start_record = start_record + maximum_records
-        xml = koop_sru_api_request(query, start_record, maximum_records)
-        records += xml.findall("sru:records/sru:record", XML_NAMESPACES)
 
-    return records
+def koop_sru_api_request_all(query: str) -> list[Element]:
+    """Query the KOOP SRU API. Returns all records for the query, even if this requires multiple requests.
+
+    Prefer koop_sru_api_iter_records, which does not keep all records in memory.
+    """
+
+    return list(koop_sru_api_iter_records(query))
+
+
+def koop_sru_api_count(
+    query: str, memoize=settings.PARLHIST_CRAWLER_DEFAULT_USE_MEMOIZATION
+) -> int:
+    """Get the number of records for a KOOP SRU query, without requesting any records"""
+
+    return get_koop_sru_api_number_of_records(
+        koop_sru_api_request_raw(query, 1, 0, memoize)
+    )
+
+
+def __get_date_window_query(
+    base_query: str, start: datetime.date, end: datetime.date
+) -> str:
+    """Restrict base_query to records with a dt.date between start and end (inclusive)"""
+
+    return (
+        f"({base_query} AND dt.date >= {start.isoformat()}"
+        f" AND dt.date <= {end.isoformat()})"
+    )
+
+
+def __split_date_window(
+    start: datetime.date, end: datetime.date
+) -> list[tuple[datetime.date, datetime.date]]:
+    """Split a date window into months, or if it is within one month into weeks, or else into days"""
+
+    if (start.year, start.month) != (end.year, end.month):
+        windows = []
+        window_start = start
+        while window_start <= end:
+            next_month = (
+                window_start.replace(day=1) + datetime.timedelta(days=32)
+            ).replace(day=1)
+            window_end = min(end, next_month - datetime.timedelta(days=1))
+            windows.append((window_start, window_end))
+            window_start = next_month
+        return windows
+
+    window_length = 7 if (end - start).days >= 7 else 1
+
+    windows = []
+    window_start = start
+    while window_start <= end:
+        window_end = min(
+            end, window_start + datetime.timedelta(days=window_length - 1)
+        )
+        windows.append((window_start, window_end))
+        window_start = window_end + datetime.timedelta(days=1)
+    return windows
+
+
+def plan_koop_sru_api_shards(
+    base_query: str,
+    start: datetime.date,
+    end: datetime.date,
+    executor: ThreadPoolExecutor,
+    include_outside_window=False,
+) -> list[str]:
+    """
+    Split the records of base_query with a dt.date from start to end (inclusive) into queries (shards) with at most
+    PARLHIST_CRAWLER_SRU_SHARD_SIZE records each, by recursively splitting the date window into months, weeks and
+    days, using count-only requests.
+
+    With include_outside_window, records with a dt.date before start or after end get their own shards, so no records
+    of base_query are lost. If the shards then do not add up to all records of base_query, base_query itself is
+    returned.
+    """
+
+    shard_size = settings.PARLHIST_CRAWLER_SRU_SHARD_SIZE
+
+    def plan_window(
+        window_start: datetime.date, window_end: datetime.date, count: int
+    ) -> list[str]:
+        query = __get_date_window_query(base_query, window_start, window_end)
+
+        if count <= shard_size or window_start == window_end:
+            if count > shard_size:
+                logger.warning(
+                    "Cannot split %s (%s records) any further", query, count
+                )
+            return [query] if count > 0 else []
+
+        windows = __split_date_window(window_start, window_end)
+        counts = list(
+            executor.map(
+                koop_sru_api_count,
+                [__get_date_window_query(base_query, *window) for window in windows],
+            )
+        )
+
+        if sum(counts) != count:
+            logger.warning(
+                "The %s records of %s do not add up to the %s records of its shards, not splitting it",
+                count,
+                query,
+                sum(counts),
+            )
+            return [query]
+
+        shards = []
+        for window, window_count in zip(windows, counts):
+            shards += plan_window(*window, window_count)
+        return shards
+
+    if not include_outside_window:
+        window_query = __get_date_window_query(base_query, start, end)
+        window_count = koop_sru_api_count(window_query)
+        shards = plan_window(start, end, window_count)
+
+        logger.info(
+            "Split %s (%s records) into %s shards",
+            window_query,
+            window_count,
+            len(shards),
+        )
+
+        return shards
+
+    remainder_queries = [
+        f"({base_query} AND dt.date < {start.isoformat()})",
+        f"({base_query} AND dt.date > {end.isoformat()})",
+    ]
+    total_count, window_count, *remainder_counts = executor.map(
+        koop_sru_api_count,
+        [base_query, __get_date_window_query(base_query, start, end)]
+        + remainder_queries,
+    )
+
+    if window_count + sum(remainder_counts) != total_count:
+        logger.warning(
+            "Not all %s records of %s have a dt.date, not splitting it",
+            total_count,
+            base_query,
+        )
+        return [base_query]
+
+    shards = plan_window(start, end, window_count)
+    for remainder_query, remainder_count in zip(remainder_queries, remainder_counts):
+        if remainder_count > 0:
+            shards.append(remainder_query)
+
+    logger.info(
+        "Split %s (%s records) into %s shards", base_query, total_count, len(shards)
+    )
+
+    return shards
+
+
+def koop_sru_api_iter_shards(
+    base_query: str,
+    start: datetime.date,
+    end: datetime.date,
+    skip_shards: Container[str] = (),
+    include_outside_window=False,
+) -> Iterator[tuple[str, list[Element]]]:
+    """
+    Query the KOOP SRU API for all records of base_query from start to end, split into shards by date (see
+    plan_koop_sru_api_shards, also for include_outside_window). Yields every shard query with all its records, in the
+    order of the shards. Shards in skip_shards are not requested.
+
+    The shards are requested concurrently by PARLHIST_CRAWLER_SRU_SHARD_WORKERS threads, a failed shard is retried
+    up to PARLHIST_CRAWLER_SRU_SHARD_ATTEMPTS times.
+    """
+
+    workers = settings.PARLHIST_CRAWLER_SRU_SHARD_WORKERS
+
+    def request_shard(shard_query: str) -> list[Element]:
+        for attempt in range(settings.PARLHIST_CRAWLER_SRU_SHARD_ATTEMPTS):
+            try:
+                return list(koop_sru_api_iter_records(shard_query))
+            except CrawlerException as exc:
+                if attempt + 1 == settings.PARLHIST_CRAWLER_SRU_SHARD_ATTEMPTS:
+                    raise
+
+                backoff_seconds = get_backoff_seconds(attempt)
+                logger.warning(
+                    "Failed to request shard %s (%s), retrying in %.1f seconds",
+                    shard_query,
+                    exc,
+                    backoff_seconds,
+                )
+                time.sleep(backoff_seconds)
+
+        raise CrawlerException(f"Failed to request shard {shard_query}")
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="parlhist-sru-shard"
+    ) as executor:
+        shards = iter(
+            shard_query
+            for shard_query in plan_koop_sru_api_shards(
+                base_query,
+                start,
+                end,
+                executor,
+                include_outside_window=include_outside_window,
+            )
+            if shard_query not in skip_shards
+        )
+        pending_shards: collections.deque[tuple[str, Future]] = collections.deque()
+
+        def request_next_shard() -> None:
+            shard_query = next(shards, None)
+            if shard_query is not None:
+                pending_shards.append(
+                    (shard_query, executor.submit(request_shard, shard_query))
+                )
+
+        for _ in range(workers):
+            request_next_shard()
+
+        while len(pending_shards) > 0:
+            shard_query, shard_future = pending_shards.popleft()
+            shard_records = shard_future.result()
+            request_next_shard()
+
+            yield shard_query, shard_records
+
+
+def koop_sru_api_iter_sharded_records(
+    base_query: str,
+    start: datetime.date,
+    end: datetime.date,
+    include_outside_window=False,
+) -> Iterator[Element]:
+    """
+    Query the KOOP SRU API for all records of base_query from start to end, split into shards by date (see
+    koop_sru_api_iter_shards). Records are yielded shard by shard, in the order of the shards.
+    """
+
+    for _, shard_records in koop_sru_api_iter_shards(
+        base_query, start, end, include_outside_window=include_outside_window
+    ):
+        yield from shard_records
+
+
+def iter_records_with_existing(
+    records: Iterable[Element],
+    get_key: Callable[[Element], K],
+    get_existing: Callable[[list[K]], dict[K, M]],
+) -> Iterator[tuple[Element, M | None]]:
+    """
+    Iterate over KOOP SRU records together with the already existing object of every record, or None if it does not
+    exist yet.
+
+    get_key gets the natural key of a record, get_existing gets the existing objects for a list of keys. It is called
+    once for every PARLHIST_CRAWLER_EXISTING_BATCH_SIZE records, instead of querying the database for every record.
+    If get_key raises a CrawlerException, the record is yielded with None, so that it fails when it is crawled.
+    """
+
+    records_iterator = iter(records)
+
+    while True:
+        batch = list(
+            itertools.islice(
+                records_iterator, settings.PARLHIST_CRAWLER_EXISTING_BATCH_SIZE
+            )
+        )
+        if len(batch) == 0:
+            return
+
+        keys: list[K | None] = []
+        for record in batch:
+            try:
+                keys.append(get_key(record))
+            except CrawlerException:
+                keys.append(None)
+
+        existing = get_existing([key for key in keys if key is not None])
+        logger.debug("%s of %s records already exist", len(existing), len(batch))
+
+        for record, key in zip(batch, keys):
+            yield record, (existing.get(key) if key is not None else None)
+
+
+def get_content_hash(parsed: dict[str, Any]) -> str:
+    """
+    Get a hash of the output of a parse function (e.g. parse_kamerstuk), to find out whether a publication has changed
+    since it was last crawled without comparing all its fields.
+    """
+
+    content_hash = hashlib.sha256()
+
+    for key in sorted(parsed):
+        value = parsed[key]
+        if not isinstance(value, bytes):
+            value = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+
+        content_hash.update(key.encode("utf-8"))
+        content_hash.update(b"\x00")
+        content_hash.update(value)
+        content_hash.update(b"\x00")
+
+    return content_hash.hexdigest()
 
 
 def __retrieve_xml_element_or_fail(xml: ET.Element, path: str) -> ET.Element:
@@ -244,3 +716,78 @@ def shorten_kamer(creator: str) -> Literal["ek", "tk"]:
         return "ek"
 
     raise CrawlerException(f"Could not find the appropriate abbreviation for {creator}")
+
+
+# The prefixes of the names of metadata elements in metadata.xml, by namespace of the elements in the SRU record
+SRU_METADATA_NAME_PREFIXES = {
+    XML_NAMESPACES["dcterms"]: "DCTERMS",
+    XML_NAMESPACES["overheidwetgeving"]: "OVERHEIDop",
+    "http://standaarden.overheid.nl/owms/terms/": "OVERHEID",
+}
+# The Dublin Core elements, which are named DC.* instead of DCTERMS.* in metadata.xml
+DC_ELEMENTS = {
+    "contributor",
+    "coverage",
+    "creator",
+    "date",
+    "description",
+    "format",
+    "identifier",
+    "language",
+    "publisher",
+    "relation",
+    "rights",
+    "source",
+    "subject",
+    "title",
+    "type",
+}
+
+
+def get_metadata_xml_from_sru_record(sru_record: Element) -> str:
+    """
+    Convert the metadata embedded in a KOOP SRU record (gzd:originalData) into the format of metadata.xml, e.g.
+    <dcterms:issued>2024-01-01</dcterms:issued> becomes <metadata name="DCTERMS.issued" content="2024-01-01"/>.
+    """
+
+    metadata_xml = ET.Element("metadata_gegevens")
+    original_data = sru_record.find(".//gzd:originalData", XML_NAMESPACES)
+
+    if original_data is not None:
+        for element in original_data.iter():
+            if not element.tag.startswith("{") or element.text is None:
+                continue
+
+            namespace, local_name = element.tag[1:].split("}")
+            prefix = SRU_METADATA_NAME_PREFIXES.get(namespace)
+            content = element.text.strip()
+            if prefix is None or content == "":
+                continue
+
+            if prefix == "DCTERMS" and local_name in DC_ELEMENTS:
+                prefix = "DC"
+
+            metadata = ET.SubElement(
+                metadata_xml,
+                "metadata",
+                name=f"{prefix}.{local_name}",
+                content=content,
+            )
+            if "scheme" in element.attrib:
+                # e.g. overheid:StatenGeneraal in the SRU record is OVERHEID.StatenGeneraal in metadata.xml
+                metadata.set(
+                    "scheme",
+                    element.attrib["scheme"]
+                    .replace("overheidop:", "OVERHEIDop.")
+                    .replace("overheid:", "OVERHEID."),
+                )
+
+    return ET.tostring(metadata_xml, encoding="unicode")
+
+
+def get_missing_metadata(raw_metadata_xml: str, required_paths: list[str]) -> list[str]:
+    """Get the paths in required_paths (e.g. "metadata[@name='DC.title']") which are not found in raw_metadata_xml"""
+
+    metadata_xml = ET.fromstring(raw_metadata_xml)
+
+    return [path for path in required_paths if metadata_xml.find(path) is None]
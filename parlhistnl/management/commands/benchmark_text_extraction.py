@@ -0,0 +1,116 @@
+"""
+parlhist/parlhistnl/management/commands/benchmark_text_extraction.py
+
+Compare extracting the text of Staatsbladen and Handelingen from their html page with extracting it from their xml,
+using memoized requests as corpus.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import itertools
+import logging
+import time
+from typing import Any, Iterable
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.base import CommandParser
+
+from parlhistnl.crawler.extraction import extract_broodtekst, extract_text_from_xml
+from parlhistnl.crawler.memoize import get_memo_store
+from parlhistnl.management.commands.rebuild_from_memoized import (
+    get_memoized_url_for_key,
+    group_memoized_urls,
+    read_manifest,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Compare extracting the text of publications from their html with extracting it from their xml."""
+
+    help = "Compare extracting the text of Staatsbladen and Handelingen from their html with extracting it from their xml, using memoized requests."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--type",
+            type=str,
+            action="append",
+            choices=["stb", "h"],
+            help="Only use this type of publication (stb or h), can be given multiple times. Default: all types",
+        )
+        parser.add_argument(
+            "--manifest",
+            type=str,
+            help="A file with the memoized urls of the corpus (one per line), instead of all memoized requests",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=500,
+            help="The maximum number of publications to use",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        publication_types = options["type"] or ["stb", "h"]
+        memo_store = get_memo_store()
+
+        if options["manifest"] is not None:
+            urls: Iterable[str | None] = read_manifest(options["manifest"])
+        else:
+            urls = map(get_memoized_url_for_key, memo_store.keys())
+
+        documents = group_memoized_urls(urls, publication_types)
+        if len(documents) == 0:
+            raise CommandError("No memoized publications with both html and xml found")
+
+        sizes = {"html": 0, "xml": 0}
+        seconds = {"html": 0.0, "xml": 0.0}
+        empty_xml_texts = 0
+        benchmarked = 0
+
+        for identifier, document_urls in itertools.islice(
+            documents.items(), options["limit"]
+        ):
+            html_response = memo_store.get_response(document_urls["html"])
+            xml_response = memo_store.get_response(document_urls["xml"])
+            if html_response is None or xml_response is None:
+                logger.warning("Skipping %s, not all requests are memoized", identifier)
+                continue
+
+            raw_html = html_response.text
+            raw_xml = xml_response.text
+            sizes["html"] += len(html_response.content)
+            sizes["xml"] += len(xml_response.content)
+
+            started_at = time.perf_counter()
+            extract_broodtekst(raw_html)
+            seconds["html"] += time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            xml_text = extract_text_from_xml(raw_xml)
+            seconds["xml"] += time.perf_counter() - started_at
+
+            if xml_text == "":
+                empty_xml_texts += 1
+            benchmarked += 1
+
+        self.stdout.write(f"Benchmarked {benchmarked} publications")
+        for manifestation in ["html", "xml"]:
+            self.stdout.write(
+                f"{manifestation:>4}: {sizes[manifestation] / 1024 / 1024:10.1f} MiB downloaded, "
+                f"{seconds[manifestation]:8.2f} seconds parsing "
+                f"({seconds[manifestation] / max(benchmarked, 1) * 1000:.2f} ms per publication)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"The xml is {sizes['xml'] / max(sizes['html'], 1):.0%} of the size of the html, and is parsed "
+                f"{seconds['html'] / max(seconds['xml'], 1e-9):.1f} times as fast. "
+                f"{empty_xml_texts} publications would need the html as fallback."
+            )  # pylint: disable=no-member
+        )
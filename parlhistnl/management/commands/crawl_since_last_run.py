@@ -0,0 +1,65 @@
+"""
+parlhist/parlhistnl/management/commands/crawl_since_last_run.py
+
+Crawl all Kamerstukken, Staatsbladen and Handelingen added or modified since the last run of this command.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import datetime
+import logging
+from typing import Any
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.base import CommandParser
+
+from parlhistnl.crawler.harvest import HARVEST_QUERIES, crawl_since_last_run
+from parlhistnl.crawler.utils import CrawlerException
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Crawl all publications added or modified since the last run of this command."""
+
+    help = "Crawl all publications added or modified since the last run of this command."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--type",
+            action="append",
+            choices=list(HARVEST_QUERIES),
+            dest="publicatietypen",
+            help="Only crawl this type of publication (kst, stb or h), may be given multiple times (default: all)",
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            help="Crawl publications modified on or after this date (YYYY-MM-DD) instead of since the last run, required for the first run",
+        )
+        parser.add_argument(
+            "--queue-tasks", action="store_true", help="Queue tasks using Celery"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        publicatietypen = options["publicatietypen"] or list(HARVEST_QUERIES)
+
+        for publicatietype in publicatietypen:
+            try:
+                results = crawl_since_last_run(
+                    publicatietype,
+                    since=options["since"],
+                    queue_tasks=options["queue_tasks"],
+                )
+            except CrawlerException as exc:
+                raise CommandError(str(exc)) from exc
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Crawled {len(results)} publications of {publicatietype}"
+                )  # pylint: disable=no-member
+            )
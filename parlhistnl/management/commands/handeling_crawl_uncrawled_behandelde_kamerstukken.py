@@ -14,8 +14,12 @@ import logging
 from typing import Any
 
 from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
 
-from parlhistnl.crawler.handeling import crawl_uncrawled_behandelde_kamerstukken
+from parlhistnl.crawler.handeling import (
+    crawl_all_uncrawled_behandelde_kamerstukken,
+    crawl_uncrawled_behandelde_kamerstukken,
+)
 from parlhistnl.models import Handeling, Kamerstuk
 
 logger = logging.getLogger(__name__)
@@ -26,9 +30,27 @@ class Command(BaseCommand):
 
     help = "Crawl one Vergadering and all its subitems"
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            help="Crawl the uncrawled behandelde kamerstukken of all handelingen at once, crawling every kamerstuk only once",
+        )
+
     def handle(self, *args: Any, **options: Any) -> str | None:
         """Crawl one Vergadering and all its subitems"""
 
+        if options["batch"]:
+            relations, failed = crawl_all_uncrawled_behandelde_kamerstukken()
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Successfully added {relations} behandelde kamerstukken, {failed} kamerstukken could not be crawled"
+                )  # pylint: disable=no-member
+            )
+            return
+
         handelingen = Handeling.objects.exclude(
             data__uncrawled__behandelde_kamerstukken=[]
         )
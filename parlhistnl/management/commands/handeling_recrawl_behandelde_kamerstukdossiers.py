@@ -10,13 +10,17 @@ SPDX-FileCopyrightText: 2023 Martijn Staal <parlhist [at] martijn-staal.nl>
 SPDX-FileCopyrightText: 2024 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
 """
 
+import datetime
 import logging
 from typing import Any
 
+from django.conf import settings
 from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
 import django_rq
 
 from parlhistnl.crawler.handeling import recrawl_behandelde_kamerstukdossiers
+from parlhistnl.crawler.kamerdossier import recrawl_kamerstukdossiers
 from parlhistnl.models import Handeling
 
 logger = logging.getLogger(__name__)
@@ -43,9 +47,49 @@ class Command(BaseCommand):
 
     help = "Crawl one Vergadering and all its subitems"
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            help="Recrawl the behandelde kamerstukdossiers of all handelingen at once, recrawling every dossier only once",
+        )
+        parser.add_argument(
+            "--max-age-days",
+            type=float,
+            default=settings.PARLHIST_CRAWLER_DOSSIER_MAX_AGE_DAYS,
+            help="With --batch, skip dossiers that were crawled less than this many days ago",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PARLHIST_CRAWLER_DOSSIER_WORKERS,
+            help="With --batch, the number of dossiers that are recrawled concurrently",
+        )
+
     def handle(self, *args: Any, **options: Any) -> str | None:
         """Crawl one Vergadering and all its subitems"""
 
+        if options["batch"]:
+            dossiernummers = (
+                Handeling.behandelde_kamerstukdossiers.through.objects.values_list(
+                    "kamerstukdossier__dossiernummer", flat=True
+                ).distinct()
+            )
+
+            recrawled, skipped, failed = recrawl_kamerstukdossiers(
+                dossiernummers,
+                max_age=datetime.timedelta(days=options["max_age_days"]),
+                workers=options["workers"],
+            )
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Recrawled {recrawled} kamerstukdossiers, skipped {skipped} recently crawled, {failed} failed"
+                )  # pylint: disable=no-member
+            )
+            return
+
         handelingen = Handeling.objects.all()
 
         ENQUEUE_JOBS = False
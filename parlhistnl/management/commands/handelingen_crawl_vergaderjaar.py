@@ -33,13 +33,18 @@ class Command(BaseCommand):
         parser.add_argument(
             "--queue-tasks", action="store_true", help="Queue tasks using Celery"
         )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted crawl from its checkpoint",
+        )
 
     def handle(self, *args: Any, **options: Any) -> str | None:
         year = options["vergaderjaar"]
 
         self.stdout.write(self.style.NOTICE(f"Crawling year {year}"))
         handelingen = crawl_all_handelingen_in_vergaderjaar(
-            year, queue_tasks=options["queue_tasks"]
+            year, queue_tasks=options["queue_tasks"], resume=options["resume"]
         )
 
         self.stdout.write(self.style.SUCCESS(f"Crawled {handelingen}"))
@@ -19,7 +19,7 @@ from typing import Any
 from django.core.management import BaseCommand
 from django.core.management.base import CommandParser
 
-from parlhistnl.crawler.kamerstuk import crawl_all_kamerstukken_within_koop_sru_query
+from parlhistnl.crawler.kamerstuk import crawl_all_kamerstukken_in_year
 
 logger = logging.getLogger(__name__)
 
@@ -49,27 +49,33 @@ class Command(BaseCommand):
         parser.add_argument(
             "--queue-tasks", action="store_true", help="Queue tasks using Celery"
         )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted crawl from its checkpoint",
+        )
 
     def handle(self, *args: Any, **options: Any) -> str | None:
         """Crawl one Vergadering and all its subitems"""
 
         year = options["year"]
 
-        koop_sru_query = f"(c.product-area==officielepublicaties AND dt.type=Kamerstuk AND dt.date >={year}-01-01 AND dt.date <= {year}-12-31)"
-
-        kamerstukken = crawl_all_kamerstukken_within_koop_sru_query(
-            koop_sru_query, update=options["update"], queue_tasks=options["queue_tasks"]
+        kamerstukken = crawl_all_kamerstukken_in_year(
+            year,
+            update=options["update"],
+            queue_tasks=options["queue_tasks"],
+            resume=options["resume"],
         )
 
         logger.info(
-            "Crawling using management command with koop query %s with update=%s",
-            koop_sru_query,
+            "Crawling using management command for year %s with update=%s",
+            year,
             options["update"],
         )
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully crawled kamerstukken using KOOP SRU query {koop_sru_query}"
+                f"Successfully crawled kamerstukken of {year}"
             )  # pylint: disable=no-member
         )
 
@@ -0,0 +1,84 @@
+"""
+parlhist/parlhistnl/management/commands/memoize_build_index.py
+
+(Re)build the index of the memoized requests, used to quickly recognize urls that have not been memoized yet.
+
+The index cannot be rebuilt while crawler processes (e.g. celery workers) are using it, as keys they add while the
+index is being rebuilt would be lost. These processes must be stopped first, the command refuses to run otherwise.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+import os
+from typing import Any
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.core.management.base import CommandParser
+
+from parlhistnl.crawler.memoize import (
+    MemoIndex,
+    MemoizeException,
+    create_memo_store,
+    get_memo_index_path,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """(Re)build the index of the memoized requests."""
+
+    help = "(Re)build the index of the memoized requests, used to quickly recognize urls that have not been memoized yet. Stop all crawler processes first."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--capacity",
+            type=int,
+            default=settings.PARLHIST_CRAWLER_MEMOIZE_INDEX_CAPACITY,
+            help="The number of memoized requests the index is sized for",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        memoize_path = settings.PARLHIST_CRAWLER_MEMOIZE_PATH
+        memo_store = create_memo_store(
+            settings.PARLHIST_CRAWLER_MEMOIZE_BACKEND, memoize_path
+        )
+
+        index_path = get_memo_index_path(memoize_path)
+        try:
+            locked_index_file = MemoIndex.lock_for_rebuild(index_path)
+        except MemoizeException as exc:
+            raise CommandError(str(exc)) from exc
+
+        try:
+            new_index_path = f"{index_path}.new"
+            index = MemoIndex.create(new_index_path, options["capacity"])
+
+            number_of_keys = 0
+            for key in memo_store.keys():
+                index.add(key)
+                number_of_keys += 1
+
+            os.replace(new_index_path, index_path)
+            os.remove(MemoIndex.get_lock_path(new_index_path))
+        finally:
+            # Processes waiting to use the index continue with the rebuilt index
+            if locked_index_file is not None:
+                locked_index_file.close()
+
+        if number_of_keys > options["capacity"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"The index contains more keys ({number_of_keys}) than it is sized for, consider increasing PARLHIST_CRAWLER_MEMOIZE_INDEX_CAPACITY"
+                )
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Built memoize index with {number_of_keys} keys")
+        )
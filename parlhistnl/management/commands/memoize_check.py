@@ -0,0 +1,52 @@
+"""
+parlhist/parlhistnl/management/commands/memoize_check.py
+
+Check the integrity of the store of memoized requests.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+from typing import Any
+
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+
+from parlhistnl.crawler.memoize import get_memo_store
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Check the integrity of the store of memoized requests."""
+
+    help = "Check the integrity of the store of memoized requests."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--delete-broken",
+            action="store_true",
+            help="Delete memoized requests that could not be decoded, so that they are requested again",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        memo_store = get_memo_store()
+
+        problems = memo_store.check()
+
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(problem))
+
+            key = problem.split(":")[0]
+            if options["delete_broken"] and len(key) == 40:
+                logger.info("Deleting broken memoized request %s", key)
+                memo_store.delete(key)
+
+        if problems:
+            self.stdout.write(self.style.ERROR(f"Found {len(problems)} problems"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No problems found"))
@@ -0,0 +1,37 @@
+"""
+parlhist/parlhistnl/management/commands/memoize_compact.py
+
+Reclaim unused space in the store of memoized requests.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+from typing import Any
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from parlhistnl.crawler.memoize import get_memo_store
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Reclaim unused space in the store of memoized requests."""
+
+    help = "Reclaim unused space in the store of memoized requests."
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Compacting {settings.PARLHIST_CRAWLER_MEMOIZE_BACKEND} memoize store"
+            )
+        )
+
+        get_memo_store().compact()
+
+        self.stdout.write(self.style.SUCCESS("Compacted memoize store"))
@@ -0,0 +1,51 @@
+"""
+parlhist/parlhistnl/management/commands/memoize_copy.py
+
+Copy all memoized requests from one memoize store to another, e.g. from the file backend to the sqlite backend.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+from typing import Any
+
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+
+from parlhistnl.crawler.memoize import create_memo_store
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Copy all memoized requests from one memoize store to another."""
+
+    help = "Copy all memoized requests from one memoize store to another, e.g. from the file backend to the sqlite backend."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument("source_backend", type=str, choices=["file", "sqlite"])
+        parser.add_argument("source_path", type=str)
+        parser.add_argument("target_backend", type=str, choices=["file", "sqlite"])
+        parser.add_argument("target_path", type=str)
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        source = create_memo_store(options["source_backend"], options["source_path"])
+        target = create_memo_store(options["target_backend"], options["target_path"])
+
+        copied = 0
+        for key in source.keys():
+            data = source.get(key)
+            if data is None:
+                continue
+
+            target.put(key, data)
+            copied += 1
+
+            if copied % 10000 == 0:
+                logger.info("Copied %s memoized requests", copied)
+
+        self.stdout.write(self.style.SUCCESS(f"Copied {copied} memoized requests"))
@@ -0,0 +1,81 @@
+"""
+parlhist/parlhistnl/management/commands/memoize_migrate_legacy.py
+
+Convert memoized requests in the legacy pickle format to the compressed memoized request format.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+from typing import Any
+
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+
+from parlhistnl.crawler.memoize import (
+    decode_memoized_response,
+    encode_memoized_response,
+    get_memo_store,
+    is_legacy_memoized_data,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Convert memoized requests in the legacy pickle format to the compressed memoized request format."""
+
+    help = "Convert memoized requests in the legacy pickle format to the compressed memoized request format."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the legacy memoized requests, do not convert them",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        memo_store = get_memo_store()
+
+        converted = 0
+        already_converted = 0
+        failed = 0
+        bytes_before = 0
+        bytes_after = 0
+
+        for key in memo_store.keys():
+            data = memo_store.get(key)
+            if data is None:
+                continue
+
+            if not is_legacy_memoized_data(data):
+                already_converted += 1
+                continue
+
+            try:
+                new_data = encode_memoized_response(decode_memoized_response(data))
+            except Exception as exc:
+                logger.error("Could not convert memoized request %s (%s)", key, exc)
+                failed += 1
+                continue
+
+            bytes_before += len(data)
+            bytes_after += len(new_data)
+            converted += 1
+
+            if not options["dry_run"]:
+                memo_store.put(key, new_data)
+
+            if converted % 10000 == 0:
+                logger.info("Converted %s memoized requests", converted)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Converted {converted} legacy memoized requests ({bytes_before} bytes to {bytes_after} bytes), "
+                f"{already_converted} were already converted, {failed} failed"
+            )  # pylint: disable=no-member
+        )
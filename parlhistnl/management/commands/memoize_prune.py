@@ -0,0 +1,50 @@
+"""
+parlhist/parlhistnl/management/commands/memoize_prune.py
+
+Remove the least recently used memoized requests until the store of memoized requests is below a maximum size.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+from typing import Any
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.management.base import CommandError, CommandParser
+
+from parlhistnl.crawler.memoize import get_memo_store
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Remove the least recently used memoized requests until the store of memoized requests is below a maximum size."""
+
+    help = "Remove the least recently used memoized requests until the store of memoized requests is below a maximum size."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--max-bytes",
+            type=int,
+            default=settings.PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES,
+            help="The maximum size of the memoize store in bytes. Default: PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        if options["max_bytes"] is None:
+            raise CommandError(
+                "No maximum size given, use --max-bytes or set PARLHIST_CRAWLER_MEMOIZE_MAX_BYTES"
+            )
+
+        removed, removed_bytes = get_memo_store().prune(options["max_bytes"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Removed {removed} memoized requests ({removed_bytes} bytes)"
+            )  # pylint: disable=no-member
+        )
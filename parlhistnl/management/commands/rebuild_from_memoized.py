@@ -0,0 +1,277 @@
+"""
+parlhist/parlhistnl/management/commands/rebuild_from_memoized.py
+
+Rebuild the Kamerstukken, Staatsbladen and Handelingen in the database from the memoized requests, without
+sending any requests. Parsing is done in multiple worker processes, writing to the database in batches.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+from typing import Any, Iterable, Iterator
+
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import connections
+
+from parlhistnl.crawler.handeling import parse_handeling
+from parlhistnl.crawler.kamerstuk import (
+    get_kamerstuk_nummers_from_metadata,
+    parse_kamerstuk,
+)
+from parlhistnl.crawler.memoize import get_memo_store, get_memoized_url
+from parlhistnl.crawler.sink import DatabaseSink
+from parlhistnl.crawler.staatsblad import parse_staatsblad
+from parlhistnl.crawler.utils import CrawlerException
+
+logger = logging.getLogger(__name__)
+
+MEMOIZED_URL_PATTERNS = [
+    # e.g. https://zoek.officielebekendmakingen.nl/kst-36496-54.html or .../stb-2024-193/metadata.xml
+    re.compile(
+        r"^https://zoek\.officielebekendmakingen\.nl/(?P<identifier>(?:kst|stb|h)-[^/]+?)(?P<manifestation>\.html|\.xml|/metadata\.xml)$"
+    ),
+    # e.g. https://repository.overheid.nl/frbr/officielepublicaties/h-tk/20212022/h-tk-20212022-1-2/1/xml/h-tk-20212022-1-2.xml
+    re.compile(
+        r"^https://repository\.overheid\.nl/frbr/officielepublicaties/.+/(?P<identifier>(?:kst|stb|h)-[^/]+)/\d+/(?P<manifestation>metadata/metadata\.xml|xml/[^/]+\.xml|html/[^/]+\.html)$"
+    ),
+]
+stb_identifier_pattern = re.compile(r"^stb-(\d{4})-(\d+)(?:-(n\d+))?$")
+
+PUBLICATION_TYPES = {"kst": "Kamerstuk", "stb": "Staatsblad", "h": "Handeling"}
+REQUIRED_MANIFESTATIONS = {
+    "kst": {"html", "metadata"},
+    "stb": {"html", "metadata", "xml"},
+    "h": {"html", "metadata", "xml"},
+}
+
+
+def classify_memoized_url(url: str) -> tuple[str, str] | None:
+    """Get the identifier and the manifestation (html, xml or metadata) of a memoized url, if it is a publication"""
+
+    for pattern in MEMOIZED_URL_PATTERNS:
+        match = pattern.match(url)
+        if match is None:
+            continue
+
+        manifestation = match.group("manifestation")
+        if "metadata" in manifestation:
+            return match.group("identifier"), "metadata"
+        if manifestation.endswith(".xml"):
+            return match.group("identifier"), "xml"
+        return match.group("identifier"), "html"
+
+    return None
+
+
+def get_memoized_url_for_key(key: str) -> str | None:
+    """Get the url of the memoized request stored under key (run in a worker process)"""
+
+    data = get_memo_store().get(key)
+    if data is None:
+        return None
+
+    try:
+        return get_memoized_url(data)
+    except Exception as exc:
+        logger.error("Could not read the url of memoized request %s (%s)", key, exc)
+        return None
+
+
+def group_memoized_urls(
+    urls: Iterable[str | None], publication_types: list[str]
+) -> dict[str, dict[str, str]]:
+    """Group the memoized urls per publication, only keeping publications with all required manifestations"""
+
+    documents: dict[str, dict[str, str]] = {}
+
+    for url in urls:
+        if url is None:
+            continue
+
+        classified = classify_memoized_url(url)
+        if classified is None:
+            continue
+
+        identifier, manifestation = classified
+        if identifier.split("-")[0] not in publication_types:
+            continue
+
+        document = documents.setdefault(identifier, {})
+
+        # Prefer the zoek.officielebekendmakingen.nl html, as this is the preferred url
+        if (
+            manifestation == "html"
+            and "zoek.officielebekendmakingen.nl" in document.get("html", "")
+        ):
+            continue
+
+        document[manifestation] = url
+
+    return {
+        identifier: urls
+        for identifier, urls in documents.items()
+        if REQUIRED_MANIFESTATIONS[identifier.split("-")[0]].issubset(urls)
+    }
+
+
+def __read_memoized(url: str) -> str:
+    """Read the text of a memoized request, without ever hitting the network"""
+
+    response = get_memo_store().get_response(url)
+
+    if response is None:
+        raise CrawlerException(f"No memoized request for {url}")
+    if response.status_code != 200:
+        raise CrawlerException(f"Memoized request for {url} has status code {response.status_code}")
+
+    return response.text
+
+
+def parse_memoized_document(
+    document: tuple[str, dict[str, str]],
+) -> tuple[str, str, dict | None]:
+    """Parse one publication from the memoized requests (run in a worker process)"""
+
+    identifier, urls = document
+    publication_type = identifier.split("-")[0]
+
+    try:
+        if publication_type == "kst":
+            raw_metadata_xml = __read_memoized(urls["metadata"])
+            dossiernummer, ondernummer = get_kamerstuk_nummers_from_metadata(
+                raw_metadata_xml
+            )
+            parsed = parse_kamerstuk(
+                dossiernummer, ondernummer, __read_memoized(urls["html"]), raw_metadata_xml
+            )
+        elif publication_type == "stb":
+            match = stb_identifier_pattern.match(identifier)
+            if match is None:
+                raise CrawlerException(f"Invalid Staatsblad identifier {identifier}")
+
+            parsed = parse_staatsblad(
+                int(match.group(1)),
+                match.group(2),
+                match.group(3) or "",
+                __read_memoized(urls["html"]),
+                __read_memoized(urls["xml"]),
+                __read_memoized(urls["metadata"]),
+                preferred_url=urls["html"],
+            )
+        else:
+            parsed = parse_handeling(
+                identifier,
+                None,
+                __read_memoized(urls["metadata"]),
+                __read_memoized(urls["html"]),
+                False,
+                __read_memoized(urls["xml"]),
+                preferred_url=urls["html"],
+            )
+    except Exception as exc:
+        logger.error("Could not rebuild %s from memoized requests (%s)", identifier, exc)
+        return publication_type, identifier, None
+
+    return publication_type, identifier, parsed
+
+
+def read_manifest(path: str) -> Iterator[str]:
+    """Read a manifest file, containing one url per line"""
+
+    with open(path, "rt", encoding="utf-8") as manifest_file:
+        for line in manifest_file:
+            line = line.strip()
+            if line != "" and not line.startswith("#"):
+                yield line
+
+
+class Command(BaseCommand):
+    """Rebuild the Kamerstukken, Staatsbladen and Handelingen in the database from the memoized requests."""
+
+    help = "Rebuild the Kamerstukken, Staatsbladen and Handelingen in the database from the memoized requests, without sending any requests."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--type",
+            type=str,
+            action="append",
+            choices=["kst", "stb", "h"],
+            help="Only rebuild this type of publication (kst, stb or h), can be given multiple times. Default: all types",
+        )
+        parser.add_argument(
+            "--manifest",
+            type=str,
+            help="A file with the memoized urls to rebuild from (one per line), instead of all memoized requests",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="The number of worker processes used for parsing",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of publications written to the database in one transaction",
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Update publications already in the database",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        publication_types = options["type"] or list(PUBLICATION_TYPES)
+
+        # Publications are written in batches, in one transaction per batch
+        sink = DatabaseSink(update=options["update"], batch_size=options["batch_size"])
+
+        # Database connections must not be shared with the forked worker processes
+        connections.close_all()
+
+        with multiprocessing.get_context("fork").Pool(options["workers"]) as pool:
+            if options["manifest"] is not None:
+                urls: Iterable[str | None] = read_manifest(options["manifest"])
+            else:
+                self.stdout.write(self.style.NOTICE("Listing all memoized requests"))
+                urls = pool.imap_unordered(
+                    get_memoized_url_for_key, get_memo_store().keys(), chunksize=256
+                )
+
+            documents = group_memoized_urls(urls, publication_types)
+            self.stdout.write(
+                self.style.NOTICE(f"Rebuilding {len(documents)} publications")
+            )
+
+            failed = 0
+            add_to_sink = {
+                "kst": sink.add_kamerstuk,
+                "stb": sink.add_staatsblad,
+                "h": sink.add_handeling,
+            }
+
+            with sink:
+                for publication_type, identifier, parsed in pool.imap_unordered(
+                    parse_memoized_document, documents.items(), chunksize=16
+                ):
+                    if parsed is None:
+                        failed += 1
+                        continue
+
+                    add_to_sink[publication_type](parsed)
+                    logger.debug("Rebuilt %s", identifier)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {sink.written} publications, skipped {sink.skipped} existing publications, {failed + sink.failed} failed"
+            )  # pylint: disable=no-member
+        )
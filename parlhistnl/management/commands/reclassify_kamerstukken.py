@@ -0,0 +1,189 @@
+"""
+parlhist/parlhistnl/management/commands/reclassify_kamerstukken.py
+
+Reclassify the kamerstuktype of Kamerstukken, e.g. after changing the rules in parlhistnl/crawler/kamerstuktype.py.
+
+Only the documenttitel of every kamerstuk is read, the raw metadata xml is only parsed for the kamerstukken of which
+the metadata contains a kamerstuktype. The changed kamerstukken are updated in batches using bulk_update, together
+with their content hash, which includes the kamerstuktype.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import collections
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.base import CommandParser
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.utils import timezone
+
+from parlhistnl.crawler.kamerstuk import get_stored_kamerstuk_content_hash
+from parlhistnl.crawler.kamerstuktype import (
+    classify_kamerstuktypes,
+    get_opgegeven_kamerstuktype,
+)
+from parlhistnl.crawler.sink import KAMERSTUK_FIELDS
+from parlhistnl.management.commands.reparse import parse_filters
+from parlhistnl.models import Kamerstuk
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of ids in one query, as some databases limit the number of query parameters
+ID_BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    """Reclassify the kamerstuktype of Kamerstukken."""
+
+    help = "Reclassify the kamerstuktype of Kamerstukken using the current rules, without sending any requests."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "--filter",
+            type=str,
+            action="append",
+            default=[],
+            help="Only reclassify the kamerstukken matching this filter (field=value, using Django's lookups, e.g. kamerstuktype=Onbekend), can be given multiple times",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="The number of kamerstukken read from the database at once",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report which kamerstuktypes would change, without updating the kamerstukken",
+        )
+
+    def __get_opgegeven_kamerstuktypes(
+        self, ids: list[int], chunk_size: int
+    ) -> dict[int, str]:
+        """Get the kamerstuktype given in the metadata of the kamerstukken with the given ids"""
+
+        opgegeven_kamerstuktypes = {}
+        for start in range(0, len(ids), ID_BATCH_SIZE):
+            for pk, raw_metadata_xml in (
+                Kamerstuk.objects.filter(id__in=ids[start : start + ID_BATCH_SIZE])
+                .values_list("id", "raw_metadata_xml")
+                .iterator(chunk_size=chunk_size)
+            ):
+                try:
+                    opgegeven_kamerstuktypes[pk] = get_opgegeven_kamerstuktype(
+                        ET.fromstring(raw_metadata_xml)
+                    )
+                except ET.ParseError as exc:
+                    logger.error(
+                        "Could not parse the metadata of kamerstuk %s (%s)", pk, exc
+                    )
+
+        return opgegeven_kamerstuktypes
+
+    def __update_kamerstuktypes(
+        self, new_kamerstuktypes: dict[int, str], chunk_size: int
+    ) -> None:
+        """Update the kamerstuktype of the kamerstukken with the given ids, and recompute their content hash"""
+
+        ids = sorted(new_kamerstuktypes)
+        now = timezone.now()
+
+        with transaction.atomic():
+            for start in range(0, len(ids), ID_BATCH_SIZE):
+                updated_kamerstukken: list[Kamerstuk] = []
+                for row in (
+                    Kamerstuk.objects.filter(
+                        id__in=ids[start : start + ID_BATCH_SIZE]
+                    )
+                    .values(
+                        "id",
+                        "hoofddossier__dossiernummer",
+                        "hoofddossier__dossiertitel",
+                        *KAMERSTUK_FIELDS,
+                    )
+                    .iterator(chunk_size=chunk_size)
+                ):
+                    row["kamerstuktype"] = new_kamerstuktypes[row["id"]]
+                    updated_kamerstukken.append(
+                        Kamerstuk(
+                            id=row["id"],
+                            kamerstuktype=row["kamerstuktype"],
+                            content_hash=get_stored_kamerstuk_content_hash(
+                                row,
+                                row["hoofddossier__dossiernummer"],
+                                row["hoofddossier__dossiertitel"],
+                            ),
+                            bijgewerkt_op=now,
+                        )
+                    )
+
+                Kamerstuk.objects.bulk_update(
+                    updated_kamerstukken,
+                    ["kamerstuktype", "content_hash", "bijgewerkt_op"],
+                    batch_size=chunk_size,
+                )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        filters = parse_filters(options["filter"])
+        try:
+            queryset = (
+                Kamerstuk.objects.filter(**filters)
+                .order_by()
+                .annotate(
+                    # The kamerstuktype can only be given in the metadata using this scheme
+                    has_opgegeven_kamerstuktype=ExpressionWrapper(
+                        Q(raw_metadata_xml__contains="OVERHEIDop.KamerstukTypen"),
+                        output_field=BooleanField(),
+                    )
+                )
+                .values_list(
+                    "id", "documenttitel", "kamerstuktype", "has_opgegeven_kamerstuktype"
+                )
+            )
+        except Exception as exc:
+            raise CommandError(f"Invalid filter ({exc})") from exc
+
+        kamerstukken = list(queryset.iterator(chunk_size=options["chunk_size"]))
+
+        opgegeven_kamerstuktypes = self.__get_opgegeven_kamerstuktypes(
+            [pk for pk, _, _, has_opgegeven in kamerstukken if has_opgegeven],
+            options["chunk_size"],
+        )
+
+        new_kamerstuktypes = classify_kamerstuktypes(
+            (documenttitel, opgegeven_kamerstuktypes.get(pk, ""))
+            for pk, documenttitel, _, _ in kamerstukken
+        )
+
+        changed_kamerstuktypes: dict[int, str] = {}
+        changes: collections.Counter[tuple[str, str]] = collections.Counter()
+        for (pk, _, kamerstuktype, _), new_kamerstuktype in zip(
+            kamerstukken, new_kamerstuktypes
+        ):
+            if new_kamerstuktype != kamerstuktype:
+                changed_kamerstuktypes[pk] = new_kamerstuktype
+                changes[(kamerstuktype, new_kamerstuktype)] += 1
+
+        for (kamerstuktype, new_kamerstuktype), count in changes.most_common():
+            self.stdout.write(
+                self.style.NOTICE(f"{kamerstuktype} -> {new_kamerstuktype}: {count}")
+            )
+
+        if not options["dry_run"]:
+            self.__update_kamerstuktypes(
+                changed_kamerstuktypes, options["chunk_size"]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reclassified {len(kamerstukken)} kamerstukken, {'would change' if options['dry_run'] else 'changed'} {sum(changes.values())}"
+            )  # pylint: disable=no-member
+        )
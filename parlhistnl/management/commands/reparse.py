@@ -0,0 +1,281 @@
+"""
+parlhist/parlhistnl/management/commands/reparse.py
+
+Reparse Kamerstukken, Staatsbladen or Handelingen from their stored raw html, raw xml and raw metadata xml, without
+sending any requests, e.g. after improving the text extraction or the kamerstuktype detection.
+
+Rows are streamed from the database in chunks (using a server-side cursor where the database supports it), the
+chunks are parsed in multiple worker processes, and only the columns that changed are written back using bulk_update.
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import collections
+import itertools
+import logging
+import multiprocessing
+import os
+from typing import Any
+
+from django.core.management import BaseCommand, CommandError
+from django.core.management.base import CommandParser
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from parlhistnl.crawler.handeling import parse_handeling
+from parlhistnl.crawler.kamerstuk import parse_kamerstuk
+from parlhistnl.crawler.sink import (
+    HANDELING_UNIQUE_FIELDS,
+    KAMERSTUK_UNIQUE_FIELDS,
+    STAATSBLAD_UNIQUE_FIELDS,
+)
+from parlhistnl.crawler.staatsblad import parse_staatsblad
+from parlhistnl.crawler.utils import get_content_hash
+from parlhistnl.models import Handeling, Kamerstuk, Staatsblad
+
+logger = logging.getLogger(__name__)
+
+PUBLICATION_MODELS: dict[str, type[models.Model]] = {
+    "kst": Kamerstuk,
+    "stb": Staatsblad,
+    "h": Handeling,
+}
+# The fields which identify a publication are never changed by reparsing it
+IDENTIFYING_FIELDS = {
+    "kst": KAMERSTUK_UNIQUE_FIELDS,
+    "stb": STAATSBLAD_UNIQUE_FIELDS,
+    "h": HANDELING_UNIQUE_FIELDS,
+}
+# Fields of a Handeling which cannot be derived from the stored raw data: the KOOP SRU record it was crawled from and
+# the crawl state of its behandelde kamerstukken (see Handeling.data), these are kept as they are
+HANDELING_KEPT_FIELDS = ["sru_record_xml", "data"]
+
+
+def get_reparsed_fields(publication_type: str) -> list[str]:
+    """Get the names of the fields that are compared with the reparsed values, and updated if they differ"""
+
+    return [
+        field.name
+        for field in PUBLICATION_MODELS[publication_type]._meta.concrete_fields
+        if not field.primary_key
+        and not field.is_relation
+        and field.name not in ("toegevoegd_op", "bijgewerkt_op")
+    ]
+
+
+def __parse_row(publication_type: str, row: dict[str, Any]) -> dict:
+    """Parse the stored raw data of a publication, as the crawlers would when crawling it"""
+
+    # The stored raw_html is the inner html of the publication, or empty if its text was extracted from the xml
+    if publication_type == "kst":
+        return parse_kamerstuk(
+            row["hoofddossier__dossiernummer"],
+            row["ondernummer"],
+            row["raw_html"],
+            row["raw_metadata_xml"],
+            raw_html_is_inner_html=True,
+        )
+
+    if publication_type == "stb":
+        return parse_staatsblad(
+            row["jaargang"],
+            str(row["nummer"]),
+            row["versienummer"],
+            row["raw_html"] if row["raw_html"] != "" else None,
+            row["raw_xml"],
+            row["raw_metadata_xml"],
+            preferred_url=row["preferred_url"],
+            raw_html_is_inner_html=True,
+        )
+
+    parsed = parse_handeling(
+        row["identifier"],
+        None,
+        row["raw_metadata_xml"],
+        row["raw_html"] if row["raw_html"] != "" else None,
+        True,
+        row["raw_xml"],
+        preferred_url=row["preferred_url"],
+    )
+    del parsed["content_hash"]
+    for field in HANDELING_KEPT_FIELDS:
+        parsed[field] = row[field]
+    # BinaryFields are read as a memoryview on some databases
+    parsed["sru_record_xml"] = bytes(parsed["sru_record_xml"])
+    parsed["content_hash"] = get_content_hash(parsed)
+
+    return parsed
+
+
+def reparse_row(
+    publication: tuple[str, dict[str, Any]],
+) -> tuple[int, dict[str, Any] | None]:
+    """
+    Reparse one publication (run in a worker process). Returns its id and the values of the fields that changed, or
+    None if it could not be parsed.
+    """
+
+    publication_type, row = publication
+
+    try:
+        parsed = __parse_row(publication_type, row)
+    except Exception as exc:
+        logger.error("Could not reparse %s %s (%s)", publication_type, row["id"], exc)
+        return row["id"], None
+
+    compared_fields = set(get_reparsed_fields(publication_type)) - set(
+        IDENTIFYING_FIELDS[publication_type]
+    )
+
+    return row["id"], {
+        field: value
+        for field, value in parsed.items()
+        if field in compared_fields and row[field] != value
+    }
+
+
+def parse_filters(filters: list[str]) -> dict[str, str]:
+    """Parse filters given as field=value (e.g. vergaderjaar=20232024 or kamerstuktype=Onbekend)"""
+
+    parsed_filters = {}
+    for query_filter in filters:
+        field, separator, value = query_filter.partition("=")
+        if separator == "" or field == "":
+            raise CommandError(f"Invalid filter {query_filter}, expected field=value")
+        parsed_filters[field] = value
+
+    return parsed_filters
+
+
+class Command(BaseCommand):
+    """Reparse publications from their stored raw data, updating the fields that changed."""
+
+    help = "Reparse Kamerstukken, Staatsbladen or Handelingen from their stored raw data, without sending any requests, and update the fields that changed."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add arguments"""
+        parser.add_argument(
+            "type",
+            type=str,
+            choices=list(PUBLICATION_MODELS),
+            help="The type of publication to reparse (kst, stb or h)",
+        )
+        parser.add_argument(
+            "--filter",
+            type=str,
+            action="append",
+            default=[],
+            help="Only reparse the publications matching this filter (field=value, using Django's lookups, e.g. kamerstuktype=Onbekend or vergaderjaar__startswith=2023), can be given multiple times",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="The number of worker processes used for parsing",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="The number of publications read from the database, parsed and written at once",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of publications updated in one query",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report which fields would change, without updating the publications",
+        )
+
+    def __write_changes(
+        self,
+        model: type[models.Model],
+        changes: list[tuple[int, dict[str, Any]]],
+        batch_size: int,
+    ) -> None:
+        """Update the changed fields of a chunk of publications, using one bulk_update per set of changed fields"""
+
+        now = timezone.now()
+        objs_per_fields: dict[tuple[str, ...], list[models.Model]] = (
+            collections.defaultdict(list)
+        )
+        for pk, changed in changes:
+            objs_per_fields[tuple(sorted(changed))].append(
+                model(pk=pk, bijgewerkt_op=now, **changed)
+            )
+
+        with transaction.atomic():
+            for fields, objs in objs_per_fields.items():
+                model.objects.bulk_update(
+                    objs, [*fields, "bijgewerkt_op"], batch_size=batch_size
+                )
+
+    def handle(self, *args: Any, **options: Any) -> str | None:
+        publication_type = options["type"]
+        model = PUBLICATION_MODELS[publication_type]
+
+        columns = ["id", *get_reparsed_fields(publication_type)]
+        if publication_type == "kst":
+            columns.append("hoofddossier__dossiernummer")
+
+        filters = parse_filters(options["filter"])
+        try:
+            queryset = (
+                model.objects.filter(**filters)
+                .order_by()
+                .values(*columns)
+            )
+        except Exception as exc:
+            raise CommandError(f"Invalid filter ({exc})") from exc
+
+        reparsed, updated, failed = 0, 0, 0
+        changed_fields: collections.Counter[str] = collections.Counter()
+
+        # Database connections must not be shared with the forked worker processes
+        connections.close_all()
+
+        with multiprocessing.get_context("fork").Pool(options["workers"]) as pool:
+            rows = queryset.iterator(chunk_size=options["chunk_size"])
+
+            while True:
+                # Only one chunk is read ahead, as the pool would otherwise read all rows into memory at once
+                chunk = list(itertools.islice(rows, options["chunk_size"]))
+                if len(chunk) == 0:
+                    break
+
+                changes = []
+                for pk, changed in pool.imap_unordered(
+                    reparse_row,
+                    ((publication_type, row) for row in chunk),
+                    chunksize=16,
+                ):
+                    reparsed += 1
+                    if changed is None:
+                        failed += 1
+                    elif len(changed) > 0:
+                        changes.append((pk, changed))
+                        changed_fields.update(changed.keys())
+
+                updated += len(changes)
+                if len(changes) > 0 and not options["dry_run"]:
+                    self.__write_changes(model, changes, options["batch_size"])
+
+                self.stdout.write(
+                    f"Reparsed {reparsed} publications, {updated} changed, {failed} failed"
+                )
+
+        for field, count in changed_fields.most_common():
+            self.stdout.write(self.style.NOTICE(f"{field}: changed {count} times"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reparsed {reparsed} publications, {'would update' if options['dry_run'] else 'updated'} {updated}, {failed} failed"
+            )  # pylint: disable=no-member
+        )
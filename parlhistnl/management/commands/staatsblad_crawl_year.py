@@ -36,13 +36,21 @@ class Command(BaseCommand):
         parser.add_argument(
             "--queue-tasks", action="store_true", help="Queue tasks using Celery"
         )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted crawl from its checkpoint",
+        )
 
     def handle(self, *args: Any, **options: Any) -> str | None:
         year = options["jaargang"]
 
         self.stdout.write(self.style.NOTICE(f"Crawling year {year}"))
         stbs = crawl_all_staatsblad_publicaties_in_year(
-            year, update=options["update"], queue_tasks=options["queue_tasks"]
+            year,
+            update=options["update"],
+            queue_tasks=options["queue_tasks"],
+            resume=options["resume"],
         )
 
         self.stdout.write(self.style.SUCCESS(f"Crawled {stbs}"))
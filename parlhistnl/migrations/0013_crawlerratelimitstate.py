@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parlhistnl', '0012_remove_handeling_ondernummer_handeling_preferred_url_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlerRateLimitState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('host', models.CharField(max_length=255, unique=True)),
+                ('state', models.JSONField(default=dict)),
+            ],
+        ),
+    ]
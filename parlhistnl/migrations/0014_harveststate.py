@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parlhistnl', '0013_crawlerratelimitstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HarvestState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('publicatietype', models.CharField(max_length=8, unique=True)),
+                ('watermark', models.DateField()),
+                ('toegevoegd_op', models.DateTimeField(auto_now_add=True)),
+                ('bijgewerkt_op', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parlhistnl', '0014_harveststate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HarvestCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.TextField()),
+                ('start', models.DateField()),
+                ('end', models.DateField()),
+                ('completed_shards', models.JSONField(default=list)),
+                ('shard', models.TextField(blank=True, default='')),
+                ('offset', models.IntegerField(default=0)),
+                ('failures', models.JSONField(default=list)),
+                ('completed', models.BooleanField(default=False)),
+                ('toegevoegd_op', models.DateTimeField(auto_now_add=True)),
+                ('bijgewerkt_op', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('query', 'start', 'end'), name='unique_harvest_checkpoint')],
+            },
+        ),
+    ]
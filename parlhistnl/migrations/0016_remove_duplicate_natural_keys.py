@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:46
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_many_to_many(through, field: str, other_field: str, keep_id: int, duplicate_ids: list[int]) -> None:
+    """Point the relations of the duplicates in a many-to-many through table to the kept object instead"""
+
+    for row in through.objects.filter(**{f"{field}__in": duplicate_ids}):
+        through.objects.get_or_create(**{field: keep_id, other_field: getattr(row, other_field)})
+
+    through.objects.filter(**{f"{field}__in": duplicate_ids}).delete()
+
+
+def remove_duplicate_kamerstukdossiers(apps, schema_editor):
+    """Merge KamerstukDossiers with the same dossiernummer into the oldest one"""
+
+    KamerstukDossier = apps.get_model("parlhistnl", "KamerstukDossier")
+    Kamerstuk = apps.get_model("parlhistnl", "Kamerstuk")
+    Handeling = apps.get_model("parlhistnl", "Handeling")
+    Staatsblad = apps.get_model("parlhistnl", "Staatsblad")
+
+    duplicates = (
+        KamerstukDossier.objects.values("dossiernummer")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+
+    for duplicate in duplicates:
+        ids = list(
+            KamerstukDossier.objects.filter(dossiernummer=duplicate["dossiernummer"])
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        keep_id, duplicate_ids = ids[0], ids[1:]
+
+        Kamerstuk.objects.filter(hoofddossier_id__in=duplicate_ids).update(hoofddossier_id=keep_id)
+        merge_many_to_many(
+            Handeling.behandelde_kamerstukdossiers.through, "kamerstukdossier_id", "handeling_id", keep_id, duplicate_ids
+        )
+        merge_many_to_many(
+            Staatsblad.behandelde_dossiers.through, "kamerstukdossier_id", "staatsblad_id", keep_id, duplicate_ids
+        )
+        KamerstukDossier.objects.filter(id__in=duplicate_ids).delete()
+
+
+def remove_duplicate_kamerstukken(apps, schema_editor):
+    """Remove Kamerstukken with the same hoofddossier and ondernummer, keeping the most recently updated one"""
+
+    Kamerstuk = apps.get_model("parlhistnl", "Kamerstuk")
+    Handeling = apps.get_model("parlhistnl", "Handeling")
+
+    duplicates = (
+        Kamerstuk.objects.values("hoofddossier_id", "ondernummer")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+
+    for duplicate in duplicates:
+        ids = list(
+            Kamerstuk.objects.filter(
+                hoofddossier_id=duplicate["hoofddossier_id"], ondernummer=duplicate["ondernummer"]
+            )
+            .order_by("-bijgewerkt_op", "-id")
+            .values_list("id", flat=True)
+        )
+        keep_id, duplicate_ids = ids[0], ids[1:]
+
+        merge_many_to_many(
+            Handeling.behandelde_kamerstukken.through, "kamerstuk_id", "handeling_id", keep_id, duplicate_ids
+        )
+        Kamerstuk.objects.filter(id__in=duplicate_ids).delete()
+
+
+def remove_duplicate_staatsbladen(apps, schema_editor):
+    """Remove Staatsbladen with the same jaargang, nummer and versienummer, keeping the most recently updated one"""
+
+    Staatsblad = apps.get_model("parlhistnl", "Staatsblad")
+
+    duplicates = (
+        Staatsblad.objects.values("jaargang", "nummer", "versienummer")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+
+    for duplicate in duplicates:
+        ids = list(
+            Staatsblad.objects.filter(
+                jaargang=duplicate["jaargang"], nummer=duplicate["nummer"], versienummer=duplicate["versienummer"]
+            )
+            .order_by("-bijgewerkt_op", "-id")
+            .values_list("id", flat=True)
+        )
+        keep_id, duplicate_ids = ids[0], ids[1:]
+
+        merge_many_to_many(
+            Staatsblad.behandelde_dossiers.through, "staatsblad_id", "kamerstukdossier_id", keep_id, duplicate_ids
+        )
+        Staatsblad.objects.filter(id__in=duplicate_ids).delete()
+
+
+def remove_duplicates(apps, schema_editor):
+    """Remove duplicate publications, so that their natural keys can be made unique"""
+
+    # Merging dossiers can result in duplicate kamerstukken, so dossiers are merged first
+    remove_duplicate_kamerstukdossiers(apps, schema_editor)
+    remove_duplicate_kamerstukken(apps, schema_editor)
+    remove_duplicate_staatsbladen(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parlhistnl', '0015_harvestcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+    ]
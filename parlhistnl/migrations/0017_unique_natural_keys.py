@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parlhistnl', '0016_remove_duplicate_natural_keys'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='kamerstuk',
+            constraint=models.UniqueConstraint(fields=('hoofddossier', 'ondernummer'), name='unique_kamerstuk'),
+        ),
+        migrations.AddConstraint(
+            model_name='kamerstukdossier',
+            constraint=models.UniqueConstraint(fields=('dossiernummer',), name='unique_kamerstukdossier'),
+        ),
+        migrations.AddConstraint(
+            model_name='staatsblad',
+            constraint=models.UniqueConstraint(fields=('jaargang', 'nummer', 'versienummer'), name='unique_staatsblad'),
+        ),
+    ]
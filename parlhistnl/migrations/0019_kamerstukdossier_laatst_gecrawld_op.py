@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parlhistnl', '0018_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kamerstukdossier',
+            name='laatst_gecrawld_op',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+    ]
@@ -50,6 +50,9 @@ class Handeling(models.Model):
     # Currently, this field is used to store recognized but not crawled kamerstukken/kamerstukdossiers:
     # { "uncrawled": { "behandelde_kamerstukken": [ "36160;5", ...], "behandelde_kamerstukdossiers": ["36130", ... ] }}
 
+    # Hash of the parsed publication, to skip updating it when it has not changed (see get_content_hash)
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
     toegevoegd_op = models.DateTimeField(auto_now_add=True)
     bijgewerkt_op = models.DateTimeField(auto_now=True)
 
@@ -78,6 +81,8 @@ class KamerstukDossier(models.Model):
 
     dossiernummer = models.CharField(max_length=64)
     dossiertitel = models.TextField()
+    # When all kamerstukken of this dossier were last crawled (see crawl_kamerstukdossier), None if never
+    laatst_gecrawld_op = models.DateTimeField(null=True, blank=True, default=None)
 
     toegevoegd_op = models.DateTimeField(auto_now_add=True)
     bijgewerkt_op = models.DateTimeField(auto_now=True)
@@ -88,6 +93,11 @@ class KamerstukDossier(models.Model):
         indexes = [
             models.Index(fields=["dossiernummer"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dossiernummer"], name="unique_kamerstukdossier"
+            )
+        ]
 
         verbose_name_plural = "KamerstukDossiers"
 
@@ -150,6 +160,9 @@ class Kamerstuk(models.Model):
         help_text="Datum van het document volgens DCTERMS.issued",
         default=datetime.date(1800, 1, 1),
     )
+    # Hash of the parsed publication, to skip updating it when it has not changed (see get_content_hash)
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
     toegevoegd_op = models.DateTimeField(auto_now_add=True)
     bijgewerkt_op = models.DateTimeField(auto_now=True)
 
@@ -162,6 +175,11 @@ class Kamerstuk(models.Model):
             models.Index(fields=["hoofddossier", "ondernummer"]),
             models.Index(fields=["hoofddossier", "ondernummer", "kamer"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hoofddossier", "ondernummer"], name="unique_kamerstuk"
+            )
+        ]
 
         verbose_name_plural = "Kamerstukken"
 
@@ -215,6 +233,9 @@ class Staatsblad(models.Model):
     publicatiedatum = models.DateField()
     ondertekendatum = models.DateField()
 
+    # Hash of the parsed publication, to skip updating it when it has not changed (see get_content_hash)
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+
     toegevoegd_op = models.DateTimeField(auto_now_add=True)
     bijgewerkt_op = models.DateTimeField(auto_now=True)
 
@@ -244,6 +265,12 @@ class Staatsblad(models.Model):
         indexes = [
             models.Index(fields=["jaargang", "nummer"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["jaargang", "nummer", "versienummer"],
+                name="unique_staatsblad",
+            )
+        ]
 
         verbose_name_plural = "Staatsbladen"
 
@@ -345,6 +372,13 @@ class Staatsblad(models.Model):
     def get_articles_list(self, include_article_names=False) -> list[str]:
         """Returns a list with the text of all seperate articles as found using the raw html"""
 
+        if self.raw_html == "" and self.raw_xml != "":
+            # The text was extracted from the xml, see PARLHIST_CRAWLER_TEXT_FROM_XML. Imported here, so that
+            # importing the models does not import the crawler.
+            from parlhistnl.crawler.extraction import extract_articles_from_xml
+
+            return extract_articles_from_xml(self.raw_xml, include_article_names)
+
         soup = BeautifulSoup(self.raw_html, "html.parser")
         html_header_re = re.compile(r"h\d")
 
@@ -363,3 +397,59 @@ class Staatsblad(models.Model):
                     header.extract()
 
             return [artikel_html.get_text().strip() for artikel_html in artikelen_html]
+
+
+class CrawlerRateLimitState(models.Model):
+    """The rate limit state of a host, shared by all crawlers using the "database" rate limit backend"""
+
+    host = models.CharField(max_length=255, unique=True)
+    state = models.JSONField(default=dict)
+
+    def __str__(self) -> str:
+        return f"{self.host}: {self.state}"
+
+
+class HarvestState(models.Model):
+    """The state of the incremental harvest of one type of publication (kst, stb or h)"""
+
+    publicatietype = models.CharField(max_length=8, unique=True)
+    # Publications modified on or after this date are harvested in the next run
+    watermark = models.DateField()
+
+    toegevoegd_op = models.DateTimeField(auto_now_add=True)
+    bijgewerkt_op = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.publicatietype}: {self.watermark}"
+
+
+class HarvestCheckpoint(models.Model):
+    """The progress of a crawl of all records of a KOOP SRU query within a date range, used to resume the crawl"""
+
+    query = models.TextField()
+    start = models.DateField()
+    end = models.DateField()
+
+    # Shards of which all records have been processed
+    completed_shards = models.JSONField(default=list)
+    # The shard currently being processed, and the number of its records that have been processed
+    shard = models.TextField(blank=True, default="")
+    offset = models.IntegerField(default=0)
+    # The KOOP SRU records (as xml strings) that failed to be crawled
+    failures = models.JSONField(default=list)
+    completed = models.BooleanField(default=False)
+
+    toegevoegd_op = models.DateTimeField(auto_now_add=True)
+    bijgewerkt_op = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Meta information for django"""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["query", "start", "end"], name="unique_harvest_checkpoint"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.query} ({self.start} - {self.end}): {len(self.completed_shards)} shards completed"
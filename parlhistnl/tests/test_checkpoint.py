@@ -0,0 +1,125 @@
+"""
+parlhist/parlhistnl/tests/test_checkpoint.py
+
+Tests for parlhistnl/crawler/checkpoint.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import datetime
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from parlhistnl.crawler.checkpoint import CrawlCheckpoint
+from parlhistnl.models import HarvestCheckpoint
+
+SHARDS = {"shard-1": ["a", "b"], "shard-2": ["c", "d", "e"], "shard-3": ["f"]}
+
+
+def make_record(identifier: str) -> ET.Element:
+    """Create a KOOP SRU record with an identifier"""
+
+    return ET.fromstring(f"<record><identifier>{identifier}</identifier></record>")
+
+
+def get_identifier(record: ET.Element) -> str:
+    """Get the identifier of a record created by make_record"""
+
+    return record.find("identifier").text
+
+
+@override_settings(PARLHIST_CRAWLER_CHECKPOINT_INTERVAL=1)
+class CrawlCheckpointTestCase(TestCase):
+    """Tests for resuming an interrupted crawl of a sharded KOOP SRU query"""
+
+    def setUp(self):
+        self.requested_shards: list[str] = []
+
+        def koop_sru_api_iter_shards(
+            base_query, start, end, skip_shards=(), include_outside_window=False
+        ):  # pylint: disable=unused-argument
+            for shard_query, identifiers in SHARDS.items():
+                if shard_query not in skip_shards:
+                    self.requested_shards.append(shard_query)
+                    yield shard_query, [
+                        make_record(identifier) for identifier in identifiers
+                    ]
+
+        patcher = mock.patch(
+            "parlhistnl.crawler.checkpoint.koop_sru_api_iter_shards",
+            side_effect=koop_sru_api_iter_shards,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def crawl(
+        self, resume: bool, failing: set[str], stop_after: str | None = None
+    ) -> list[str]:
+        """Crawl all records, failing the given records, and interrupt the crawl after stop_after was processed"""
+
+        checkpoint = CrawlCheckpoint(
+            "query", datetime.date(2024, 1, 1), datetime.date(2024, 12, 31), resume
+        )
+        crawled = []
+
+        for record in checkpoint.iter_records():
+            identifier = get_identifier(record)
+            crawled.append(identifier)
+            checkpoint.processed(record, failed=identifier in failing)
+
+            if identifier == stop_after:
+                return crawled
+
+        checkpoint.complete()
+        return crawled
+
+    def test_resume(self):
+        # The crawl is interrupted in the middle of the second shard
+        self.assertEqual(self.crawl(False, {"b"}, stop_after="c"), ["a", "b", "c"])
+
+        stored = HarvestCheckpoint.objects.get()
+        self.assertEqual(stored.completed_shards, ["shard-1"])
+        self.assertEqual((stored.shard, stored.offset), ("shard-2", 1))
+        self.assertEqual(
+            [get_identifier(ET.fromstring(failure)) for failure in stored.failures],
+            ["b"],
+        )
+
+        # The failed record is retried first, the completed shard is not requested again, and the second shard
+        # continues after the processed record
+        self.requested_shards = []
+        self.assertEqual(self.crawl(True, set()), ["b", "d", "e", "f"])
+        self.assertEqual(self.requested_shards, ["shard-2", "shard-3"])
+
+        stored.refresh_from_db()
+        self.assertEqual(stored.completed_shards, ["shard-1", "shard-2", "shard-3"])
+        self.assertEqual(stored.failures, [])
+        self.assertTrue(stored.completed)
+
+        # A completed crawl is not requested again when it is resumed
+        self.requested_shards = []
+        self.assertEqual(self.crawl(True, set()), [])
+        self.assertEqual(self.requested_shards, [])
+
+    def test_resume_failure_fails_again(self):
+        self.crawl(False, {"b"}, stop_after="c")
+
+        self.assertEqual(self.crawl(True, {"b"}), ["b", "d", "e", "f"])
+
+        stored = HarvestCheckpoint.objects.get()
+        self.assertEqual(
+            [get_identifier(ET.fromstring(failure)) for failure in stored.failures],
+            ["b"],
+        )
+
+    def test_without_resume(self):
+        self.crawl(False, {"b"}, stop_after="c")
+
+        # Without resume, the previous checkpoint is discarded
+        self.assertEqual(self.crawl(False, set()), ["a", "b", "c", "d", "e", "f"])
+        self.assertEqual(HarvestCheckpoint.objects.get().failures, [])
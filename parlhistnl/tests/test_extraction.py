@@ -0,0 +1,201 @@
+"""
+parlhist/parlhistnl/tests/test_extraction.py
+
+Tests for parlhistnl/crawler/extraction.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import os
+from unittest import mock, skipIf
+
+from bs4 import BeautifulSoup
+from django.test import SimpleTestCase
+
+from parlhistnl.crawler import extraction
+from parlhistnl.crawler.extraction import (
+    BROODTEKST_SELECTOR,
+    extract_articles_from_xml,
+    extract_broodtekst,
+    extract_text_from_html,
+    extract_text_from_xml,
+)
+from parlhistnl.models import Staatsblad
+
+STAATSBLAD_XML = """<?xml version="1.0" encoding="utf-8"?>
+<officiele-publicatie xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <metadata><meta name="DC.title" content="Wet van 1 februari 1995"/></metadata>
+  <staatsblad>
+    <wet>
+      <intitule>Wet van 1 februari 1995, houdende <nadruk type="cur">regels</nadruk></intitule>
+      <wetsluiting/>
+      <wettekst>
+        <artikel>
+          <kop><label>Artikel</label><nr>1</nr></kop>
+          <al>Deze wet treedt in werking met ingang van de dag na de datum van uitgifte van het Staatsblad
+          waarin zij wordt geplaatst.</al>
+        </artikel>
+        <artikel>
+          <kop><label>Artikel</label><nr>2</nr></kop>
+          <lid><lidnr>1.</lidnr><al>Eerste lid.</al></lid>
+          <lid><lidnr>2.</lidnr><al>Tweede lid &amp; ë.</al></lid>
+        </artikel>
+      </wettekst>
+    </wet>
+  </staatsblad>
+</officiele-publicatie>"""
+
+
+class ExtractionTestCase(SimpleTestCase):
+    """Tests for extracting the text of publications from their xml"""
+
+    def test_extract_text_from_xml(self):
+        self.assertEqual(
+            extract_text_from_xml(STAATSBLAD_XML),
+            "Wet van 1 februari 1995, houdende regels\n"
+            "Artikel 1\n"
+            "Deze wet treedt in werking met ingang van de dag na de datum van uitgifte van het Staatsblad "
+            "waarin zij wordt geplaatst.\n"
+            "Artikel 2\n"
+            "1. Eerste lid.\n"
+            "2. Tweede lid & ë.",
+        )
+
+    def test_extract_articles_from_xml(self):
+        self.assertEqual(
+            extract_articles_from_xml(STAATSBLAD_XML),
+            [
+                "Deze wet treedt in werking met ingang van de dag na de datum van uitgifte van het Staatsblad "
+                "waarin zij wordt geplaatst.",
+                "1. Eerste lid.\n2. Tweede lid & ë.",
+            ],
+        )
+        self.assertEqual(
+            extract_articles_from_xml(STAATSBLAD_XML, include_article_names=True)[1],
+            "Artikel 2\n1. Eerste lid.\n2. Tweede lid & ë.",
+        )
+
+    def test_staatsblad_articles_from_xml(self):
+        # A Staatsblad of which the text was extracted from the xml has no raw html
+        stb = Staatsblad(raw_html="", raw_xml=STAATSBLAD_XML)
+
+        self.assertEqual(
+            stb.get_articles_list(), extract_articles_from_xml(STAATSBLAD_XML)
+        )
+
+    def test_extract_text_from_xml_without_text(self):
+        self.assertEqual(
+            extract_text_from_xml(
+                '<officiele-publicatie><metadata><meta name="x" content="y"/></metadata></officiele-publicatie>'
+            ),
+            "",
+        )
+
+
+BROODTEKST_HTML = """<!DOCTYPE html>
+<html lang="nl"><head><title>Kamerstuk 36000 nr. 1</title><style>p { color: red; }</style></head>
+<body>
+<header><div id="broodtekst" class="stuk broodtekst-container">Not in an article</div></header>
+<article>
+  <div id="broodtekst" class="stuk  broodtekst-container extra">
+    <!-- a comment -->
+    <h1>Memorie van toelichting</h1>
+    <p>Eerste alinea &amp; &eacute;&#233; met <em>nadruk</em>.
+    <p>Tweede alinea, zonder sluittag
+    <script>var x = "<p>geen tekst</p>";</script>
+    <ul><li>Eerste punt<li>Tweede punt</ul>
+    <pre>  Voorgedrukt
+      blok  </pre>
+    <table><tr><td>Cel 1</td><td>Cel 2</td></tr></table>
+  </div>
+</article>
+</body></html>"""
+
+
+# Pages modelled on the html pages of a kamerstuk, a Staatsblad and a Handeling on zoek.officielebekendmakingen.nl
+PAGES_PATH = os.path.join(os.path.dirname(__file__), "pages")
+PAGES = ["kst-36000-3.html", "stb-1995-24.html", "h-tk-20232024-12-3.html"]
+
+
+def read_page(filename: str) -> str:
+    """Read one of the PAGES"""
+
+    with open(os.path.join(PAGES_PATH, filename), encoding="utf-8") as page:
+        return page.read()
+
+
+def get_broodtekst_text_using_bs4(raw_html: str) -> str:
+    """Get the text of the broodtekst as the crawlers originally did"""
+
+    return BeautifulSoup(raw_html, "html.parser").select(BROODTEKST_SELECTOR)[0].get_text()
+
+
+class BroodtekstExtractionTestCase(SimpleTestCase):
+    """Tests for extracting the text of publications from their html page"""
+
+    def assert_same_text_as_bs4(self, raw_html: str) -> None:
+        """Assert that extract_broodtekst gives the same text as BeautifulSoup"""
+
+        inner_html, tekst, matches = extract_broodtekst(raw_html)
+
+        self.assertEqual(matches, 1)
+        self.assertEqual(tekst, get_broodtekst_text_using_bs4(raw_html))
+        # The inner html must give the same text when the publication is parsed again
+        self.assertEqual(extract_text_from_html(inner_html), tekst)
+
+    def test_extract_broodtekst(self):
+        self.assert_same_text_as_bs4(BROODTEKST_HTML)
+
+    def test_extract_broodtekst_without_lxml(self):
+        with mock.patch.object(extraction, "lxml", None):
+            self.assert_same_text_as_bs4(BROODTEKST_HTML)
+
+    def test_extract_broodtekst_pages(self):
+        for filename in PAGES:
+            raw_html = read_page(filename)
+            with self.subTest(filename=filename):
+                self.assert_same_text_as_bs4(raw_html)
+
+            with self.subTest(filename=filename, lxml=False), mock.patch.object(
+                extraction, "lxml", None
+            ):
+                self.assert_same_text_as_bs4(raw_html)
+
+    def test_extract_broodtekst_cdata_and_entities(self):
+        # lxml parses CDATA sections as comments, and libxml2 does not know every entity that BeautifulSoup knows
+        raw_html = BROODTEKST_HTML.replace(
+            "<h1>",
+            "<p>a<![CDATA[x < &foo; y]]>b</p><!--[CDATA[ commentaar ]]-->"
+            "<p>&foo; &bar AT&T &apos;&check;&NewLine;</p><h1>",
+        )
+
+        self.assert_same_text_as_bs4(raw_html)
+
+    def test_extract_broodtekst_multiple_matches(self):
+        raw_html = BROODTEKST_HTML.replace(
+            "</article>",
+            '</article><article><div id="broodtekst" class="stuk broodtekst-container">Tweede</div></article>',
+        )
+
+        inner_html, tekst, matches = extract_broodtekst(raw_html)
+
+        self.assertEqual(matches, 2)
+        self.assertEqual(tekst, get_broodtekst_text_using_bs4(raw_html))
+        self.assertNotIn("Tweede</div>", inner_html)
+
+    def test_extract_broodtekst_without_matches(self):
+        for raw_html in ["", "<html><body><p>Geen broodtekst</p></body></html>"]:
+            with self.subTest(raw_html=raw_html):
+                self.assertEqual(extract_broodtekst(raw_html), ("", "", 0))
+
+    @skipIf(extraction.lxml is None, "lxml is not installed")
+    def test_extract_text_from_html(self):
+        raw_html = "<p>Een &amp; twee</p>tail<script>x</script><p>drie"
+
+        self.assertEqual(
+            extract_text_from_html(raw_html),
+            BeautifulSoup(raw_html, "html.parser").get_text(),
+        )
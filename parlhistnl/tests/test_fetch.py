@@ -0,0 +1,85 @@
+"""
+parlhist/parlhistnl/tests/test_fetch.py
+
+Tests for parlhistnl/crawler/fetch.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.fetch import fetch_urls, prefetch_ahead, prefetch_urls
+
+
+@override_settings(PARLHIST_CRAWLER_FETCH_WORKERS=4, PARLHIST_CRAWLER_FETCH_LOOKAHEAD=2)
+class FetchTestCase(SimpleTestCase):
+    """Tests for concurrent fetching"""
+
+    def setUp(self):
+        self.fetched_urls = []
+        self.lock = threading.Lock()
+
+        def get_url_or_error(url, revalidate=False):  # pylint: disable=unused-argument
+            with self.lock:
+                self.fetched_urls.append(url)
+            if url.endswith("404"):
+                raise CrawlerException(f"Received not-OK status code 404 for {url}")
+            return url.upper()
+
+        patcher = mock.patch(
+            "parlhistnl.crawler.fetch.get_url_or_error", side_effect=get_url_or_error
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fetch_urls(self):
+        futures = fetch_urls(["https://example.org/a", "https://example.org/404"])
+
+        self.assertEqual(futures[0].result(), "HTTPS://EXAMPLE.ORG/A")
+        with self.assertRaises(CrawlerException):
+            futures[1].result()
+
+    def test_prefetch_ahead(self):
+        records = [f"https://example.org/{i}" for i in range(5)]
+        crawled = []
+
+        for record in prefetch_ahead(records, lambda record: [record]):
+            # The next records are already being fetched while this record is crawled
+            crawled.append(fetch_urls([record])[0].result())
+
+        self.assertEqual(crawled, [record.upper() for record in records])
+        # Every url is fetched exactly once
+        self.assertEqual(sorted(self.fetched_urls), records)
+
+    def test_prefetch_revalidate(self):
+        prefetch_urls(["https://example.org/a"])
+
+        # A revalidating fetch does not use a request prefetched without revalidating
+        fetch_urls(["https://example.org/a"], revalidate=True)[0].result()
+        fetch_urls(["https://example.org/a"])[0].result()
+
+        self.assertEqual(self.fetched_urls, ["https://example.org/a"] * 2)
+
+    def test_concurrent_prefetch_ahead(self):
+        records = [f"https://example.org/{i}" for i in range(5)]
+        crawl = prefetch_ahead(records, lambda record: [record])
+        crawled = [fetch_urls([next(crawl)])[0].result()]
+
+        # Another crawl finishes while the next records of the first crawl are being prefetched
+        for record in prefetch_ahead(["https://example.org/other"], lambda record: [record]):
+            fetch_urls([record])[0].result()
+
+        crawled += [fetch_urls([record])[0].result() for record in crawl]
+
+        self.assertEqual(crawled, [record.upper() for record in records])
+        # The other crawl did not cancel the requests prefetched by the first crawl
+        self.assertEqual(
+            sorted(self.fetched_urls), sorted(records + ["https://example.org/other"])
+        )
@@ -0,0 +1,159 @@
+"""
+parlhist/parlhistnl/tests/test_handeling.py
+
+Tests for parlhistnl/crawler/handeling.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from django.test import TestCase
+
+from parlhistnl.crawler.handeling import (
+    crawl_all_handelingen_from_sru_records,
+    crawl_all_uncrawled_behandelde_kamerstukken,
+)
+from parlhistnl.crawler.utils import CrawlerException
+from parlhistnl.models import Handeling, Kamerstuk, KamerstukDossier
+
+
+def create_kamerstuk(dossiernummer: str, ondernummer: str) -> Kamerstuk:
+    """Create a kamerstuk, and its dossier if it does not exist yet"""
+
+    dossier, _ = KamerstukDossier.objects.get_or_create(
+        dossiernummer=dossiernummer, defaults={"dossiertitel": dossiernummer}
+    )
+
+    return Kamerstuk.objects.create(hoofddossier=dossier, ondernummer=ondernummer)
+
+
+def get_uncrawled_kamerstukken(handeling: Handeling) -> list[str]:
+    """Get the uncrawled behandelde kamerstukken of a handeling from the database"""
+
+    handeling.refresh_from_db()
+
+    return handeling.data["uncrawled"]["behandelde_kamerstukken"]
+
+
+class CrawlAllUncrawledBehandeldeKamerstukkenTestCase(TestCase):
+    """Tests for crawling the uncrawled behandelde kamerstukken of all handelingen at once"""
+
+    def setUp(self):
+        self.existing = create_kamerstuk("100", "1")
+        self.handelingen = [
+            Handeling.objects.create(
+                identifier=identifier,
+                data={
+                    "uncrawled": {
+                        "behandelde_kamerstukdossiers": [],
+                        "behandelde_kamerstukken": uncrawled_kamerstukken,
+                    }
+                },
+            )
+            for identifier, uncrawled_kamerstukken in [
+                ("h-tk-1", ["100;1", "200;1", "404;1"]),
+                ("h-tk-2", ["200;1", "300;1"]),
+                ("h-tk-3", []),
+            ]
+        ]
+
+        self.crawled: list[tuple[str, str]] = []
+
+        def crawl_kamerstuk(dossiernummer, ondernummer, sink=None):
+            self.crawled.append((dossiernummer, ondernummer))
+
+            if dossiernummer == "404":
+                raise CrawlerException(
+                    f"Could not crawl kst-{dossiernummer}-{ondernummer}"
+                )
+
+            # The handeling is changed by someone else while its kamerstukken are being crawled
+            if dossiernummer == "300":
+                handeling = Handeling.objects.get(identifier="h-tk-2")
+                handeling.data["uncrawled"]["behandelde_kamerstukken"].append("500;1")
+                handeling.data["opmerking"] = "gewijzigd"
+                handeling.save()
+
+            return create_kamerstuk(dossiernummer, ondernummer)
+
+        for name, replacement in [
+            ("crawl_kamerstuk", crawl_kamerstuk),
+            ("prefetch_ahead", lambda items, get_urls: iter(items)),
+        ]:
+            patcher = mock.patch(
+                f"parlhistnl.crawler.handeling.{name}", side_effect=replacement
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_crawl_all(self):
+        with self.assertLogs("parlhistnl.crawler.handeling", "ERROR"):
+            relations, failed = crawl_all_uncrawled_behandelde_kamerstukken()
+
+        self.assertEqual((relations, failed), (4, 1))
+
+        # Every kamerstuk that does not exist yet is crawled once, however many handelingen refer to it
+        self.assertEqual(
+            sorted(self.crawled), [("200", "1"), ("300", "1"), ("404", "1")]
+        )
+
+        self.assertEqual(
+            sorted(
+                (kst.hoofddossier.dossiernummer, kst.ondernummer)
+                for kst in self.handelingen[0].behandelde_kamerstukken.all()
+            ),
+            [("100", "1"), ("200", "1")],
+        )
+        self.assertEqual(
+            sorted(
+                (kst.hoofddossier.dossiernummer, kst.ondernummer)
+                for kst in self.handelingen[1].behandelde_kamerstukken.all()
+            ),
+            [("200", "1"), ("300", "1")],
+        )
+
+        # The kamerstuk that could not be crawled remains uncrawled, and concurrent changes are kept
+        self.assertEqual(get_uncrawled_kamerstukken(self.handelingen[0]), ["404;1"])
+        self.assertEqual(get_uncrawled_kamerstukken(self.handelingen[1]), ["500;1"])
+        self.assertEqual(self.handelingen[1].data["opmerking"], "gewijzigd")
+        self.assertEqual(get_uncrawled_kamerstukken(self.handelingen[2]), [])
+
+
+class CrawlAllHandelingenFromSruRecordsTestCase(TestCase):
+    """Tests for crawling the Handelingen of KOOP SRU records"""
+
+    def test_update_revalidates(self):
+        record = ET.fromstring(
+            '<record xmlns:dcterms="http://purl.org/dc/terms/">'
+            "<dcterms:identifier>h-tk-1</dcterms:identifier>"
+            "</record>"
+        )
+
+        with mock.patch(
+            "parlhistnl.crawler.handeling.get_handeling_fetch_urls",
+            return_value=["metadata.xml", "xml"],
+        ), mock.patch(
+            "parlhistnl.crawler.handeling.prefetch_ahead",
+            side_effect=lambda items, get_urls, revalidate=False: iter(items),
+        ) as prefetch_ahead, mock.patch(
+            "parlhistnl.crawler.handeling.fetch_urls",
+            side_effect=CrawlerException("Not found"),
+        ) as fetch_urls:
+            for update in [False, True]:
+                with self.subTest(update=update), self.assertLogs(
+                    "parlhistnl.crawler.handeling", "ERROR"
+                ):
+                    crawl_all_handelingen_from_sru_records([record], update=update)
+
+                    # A modified Handeling is not rebuilt from its memoized requests
+                    self.assertEqual(
+                        prefetch_ahead.call_args.kwargs["revalidate"], update
+                    )
+                    self.assertEqual(
+                        fetch_urls.call_args.kwargs["revalidate"], update
+                    )
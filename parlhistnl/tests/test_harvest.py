@@ -0,0 +1,97 @@
+"""
+parlhist/parlhistnl/tests/test_harvest.py
+
+Tests for parlhistnl/crawler/harvest.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import datetime
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.harvest import crawl_since_last_run, get_harvest_query
+from parlhistnl.models import Handeling, HarvestState
+
+
+class HarvestQueryTestCase(SimpleTestCase):
+    """Tests for the queries of incremental harvesting"""
+
+    def test_harvest_query(self):
+        """Only records modified on or after the watermark are requested"""
+
+        self.assertEqual(
+            get_harvest_query("stb", datetime.date(2025, 1, 1)),
+            "w.publicatienaam=Staatsblad AND dt.modified>=2025-01-01",
+        )
+        self.assertEqual(
+            get_harvest_query("kst", datetime.date(2025, 10, 2)),
+            "c.product-area==officielepublicaties AND dt.type=Kamerstuk AND dt.modified>=2025-10-02",
+        )
+
+    def test_invalid_publicatietype(self):
+        """An unknown type of publication raises a CrawlerException"""
+
+        with self.assertRaises(CrawlerException):
+            get_harvest_query("trb", datetime.date(2025, 1, 1))
+
+
+class CrawlSinceLastRunTestCase(TestCase):
+    """Tests for moving the watermark of incremental harvesting"""
+
+    def setUp(self):
+        self.watermark = datetime.date(2025, 1, 1)
+        HarvestState.objects.create(publicatietype="h", watermark=self.watermark)
+
+        self.records = [ET.Element("record"), ET.Element("record")]
+        patcher = mock.patch(
+            "parlhistnl.crawler.harvest.koop_sru_api_iter_records",
+            return_value=iter(self.records),
+        )
+        self.iter_records = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def harvest(self, crawled: int) -> mock.Mock:
+        """Harvest Handelingen, of which only the given number of records is crawled successfully"""
+
+        def crawl_all_handelingen_from_sru_records(
+            records, update=False, queue_tasks=False
+        ):
+            handelingen = [Handeling(id=index + 1) for index, _ in enumerate(records)]
+            return handelingen[:crawled]
+
+        with mock.patch(
+            "parlhistnl.crawler.harvest.crawl_all_handelingen_from_sru_records",
+            side_effect=crawl_all_handelingen_from_sru_records,
+        ) as crawl_all:
+            crawl_since_last_run("h")
+
+        return crawl_all
+
+    def get_watermark(self) -> datetime.date:
+        """Get the stored watermark of the Handelingen"""
+
+        return HarvestState.objects.get(publicatietype="h").watermark
+
+    def test_complete_run(self):
+        crawl_all = self.harvest(crawled=2)
+
+        self.assertIn(
+            "dt.modified>=2025-01-01", self.iter_records.call_args.args[0]
+        )
+        # Modified Handelingen must not be rebuilt from their memoized requests
+        self.assertTrue(crawl_all.call_args.kwargs["update"])
+        self.assertEqual(self.get_watermark(), datetime.date.today())
+
+    def test_failed_records(self):
+        with self.assertLogs("parlhistnl.crawler.harvest", "ERROR"):
+            self.harvest(crawled=1)
+
+        # The next run lists the same records again
+        self.assertEqual(self.get_watermark(), self.watermark)
@@ -0,0 +1,278 @@
+"""
+parlhist/parlhistnl/tests/test_kamerdossier.py
+
+Tests for parlhistnl/crawler/kamerdossier.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import datetime
+import re
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.kamerdossier import (
+    crawl_kamerstukdossiers,
+    get_recently_crawled_kamerstukdossiers,
+    recrawl_kamerstukdossiers,
+)
+from parlhistnl.crawler.utils import XML_NAMESPACES
+from parlhistnl.models import Kamerstuk, KamerstukDossier
+
+
+def make_record(dossiernummers: list[str], ondernummer: str) -> ET.Element:
+    """Create a KOOP SRU record of a kamerstuk in the given dossiers"""
+
+    record = ET.Element("record")
+    for dossiernummer in dossiernummers:
+        ET.SubElement(
+            record, f"{{{XML_NAMESPACES['overheidwetgeving']}}}dossiernummer"
+        ).text = dossiernummer
+    ET.SubElement(
+        record, f"{{{XML_NAMESPACES['overheidwetgeving']}}}ondernummer"
+    ).text = ondernummer
+
+    return record
+
+
+class FakeKoopSruApi:
+    """
+    Replaces the KOOP SRU API and the crawling of kamerstukken. Every dossier in records is a list of records, a query
+    for a dossier in failing_dossiers fails. Kamerstukken with ondernummer 404 cannot be crawled.
+    """
+
+    def __init__(self, records: dict[str, list[ET.Element]], failing_dossiers=()):
+        self.records = records
+        self.failing_dossiers = failing_dossiers
+        self.queries: list[str] = []
+
+    def iter_records(self, query: str) -> list[ET.Element]:
+        self.queries.append(query)
+        dossiernummers = re.findall(r"w\.dossiernummer==([^ )]+)", query)
+
+        if any(
+            dossiernummer in self.failing_dossiers for dossiernummer in dossiernummers
+        ):
+            raise ConnectionError(f"Could not request {query}")
+
+        # A kamerstuk in multiple requested dossiers is only found once
+        found: dict[int, ET.Element] = {}
+        for dossiernummer in dossiernummers:
+            for record in self.records.get(dossiernummer, []):
+                found[id(record)] = record
+
+        return list(found.values())
+
+    def crawl_all_kamerstukken_from_sru_records(
+        self, records, update=False, on_processed=None
+    ) -> list[Kamerstuk]:
+        results = []
+
+        for record in records:
+            dossiernummer = record.find(
+                ".//overheidwetgeving:dossiernummer", XML_NAMESPACES
+            ).text
+            ondernummer = record.find(
+                ".//overheidwetgeving:ondernummer", XML_NAMESPACES
+            ).text
+
+            if ondernummer == "404":
+                on_processed(record, None)
+                continue
+
+            dossier, _ = KamerstukDossier.objects.get_or_create(
+                dossiernummer=dossiernummer, defaults={"dossiertitel": dossiernummer}
+            )
+            kst = Kamerstuk(
+                id=len(results) + 1,
+                hoofddossier_id=dossier.id,
+                ondernummer=ondernummer,
+            )
+            results.append(kst)
+            on_processed(record, kst)
+
+        return results
+
+    def patch(self, test_case) -> None:
+        """Patch the KOOP SRU API and the crawling of kamerstukken for the duration of test_case"""
+
+        for name, replacement in [
+            ("koop_sru_api_iter_records", self.iter_records),
+            (
+                "crawl_all_kamerstukken_from_sru_records",
+                self.crawl_all_kamerstukken_from_sru_records,
+            ),
+        ]:
+            patcher = mock.patch(
+                f"parlhistnl.crawler.kamerdossier.{name}", side_effect=replacement
+            )
+            patcher.start()
+            test_case.addCleanup(patcher.stop)
+
+
+class CrawlKamerstukDossiersTestCase(TestCase):
+    """Tests for crawling kamerstukdossiers"""
+
+    def test_only_completely_crawled_dossiers_are_marked(self):
+        FakeKoopSruApi(
+            {
+                "100": [make_record(["100"], "1"), make_record(["100"], "2")],
+                "200": [make_record(["200"], "1"), make_record(["200"], "404")],
+                "300": [],
+            }
+        ).patch(self)
+
+        with self.assertLogs("parlhistnl.crawler.kamerdossier", "WARNING"):
+            kamerstukken = crawl_kamerstukdossiers(["100", "200", "300"])
+
+        self.assertEqual(
+            {dossiernummer: len(ksts) for dossiernummer, ksts in kamerstukken.items()},
+            {"100": 2, "200": 1, "300": 0},
+        )
+        # A dossier with a failed kamerstuk, or without any kamerstukken, is crawled again next time
+        self.assertEqual(
+            set(
+                KamerstukDossier.objects.filter(
+                    laatst_gecrawld_op__isnull=False
+                ).values_list("dossiernummer", flat=True)
+            ),
+            {"100"},
+        )
+
+    def test_multiple_dossiers(self):
+        # A kamerstuk in multiple requested dossiers belongs to all of them
+        record = make_record(["100", "200"], "3")
+        FakeKoopSruApi(
+            {"100": [make_record(["100"], "1"), record], "200": [record]}
+        ).patch(self)
+
+        kamerstukken = crawl_kamerstukdossiers(["100", "200"])
+
+        self.assertEqual(
+            {
+                dossiernummer: [kst.ondernummer for kst in ksts]
+                for dossiernummer, ksts in kamerstukken.items()
+            },
+            {"100": ["1", "3"], "200": ["3"]},
+        )
+
+    def test_unassignable_record(self):
+        # The KOOP SRU API returns a record that is not in any of the requested dossiers
+        FakeKoopSruApi(
+            {"100": [make_record(["100"], "1"), make_record(["999"], "2")]}
+        ).patch(self)
+
+        with self.assertLogs("parlhistnl.crawler.kamerdossier", "WARNING") as logs:
+            kamerstukken = crawl_kamerstukdossiers(["100"])
+
+        self.assertIn("['999']", logs.output[0])
+        self.assertEqual([kst.ondernummer for kst in kamerstukken["100"]], ["1"])
+        self.assertFalse(
+            KamerstukDossier.objects.filter(dossiernummer="999").exclude(
+                laatst_gecrawld_op=None
+            )
+        )
+
+    @override_settings(PARLHIST_CRAWLER_SRU_DOSSIERS_PER_QUERY=1)
+    def test_failed_batch(self):
+        FakeKoopSruApi(
+            {"100": [make_record(["100"], "1")], "200": [make_record(["200"], "1")]},
+            failing_dossiers=["200"],
+        ).patch(self)
+
+        with self.assertRaises(CrawlerException), self.assertLogs(
+            "parlhistnl.crawler.kamerdossier", "CRITICAL"
+        ):
+            crawl_kamerstukdossiers(["100", "200"])
+
+        with self.assertLogs("parlhistnl.crawler.kamerdossier", "CRITICAL"):
+            kamerstukken = crawl_kamerstukdossiers(
+                ["100", "200"], ignore_failure=True
+            )
+
+        self.assertEqual(
+            {dossiernummer: len(ksts) for dossiernummer, ksts in kamerstukken.items()},
+            {"100": 1, "200": 0},
+        )
+        self.assertEqual(
+            set(
+                KamerstukDossier.objects.filter(
+                    laatst_gecrawld_op__isnull=False
+                ).values_list("dossiernummer", flat=True)
+            ),
+            {"100"},
+        )
+
+
+class RecrawlKamerstukDossiersTestCase(TransactionTestCase):
+    """Tests for recrawling many kamerstukdossiers, skipping recently crawled dossiers"""
+
+    def setUp(self):
+        now = timezone.now()
+        for dossiernummer, laatst_gecrawld_op in [
+            ("100", now - datetime.timedelta(days=1)),
+            ("200", now - datetime.timedelta(days=10)),
+            ("300", None),
+        ]:
+            KamerstukDossier.objects.create(
+                dossiernummer=dossiernummer,
+                dossiertitel=dossiernummer,
+                laatst_gecrawld_op=laatst_gecrawld_op,
+            )
+
+    def test_recently_crawled(self):
+        self.assertEqual(
+            get_recently_crawled_kamerstukdossiers(
+                ["100", "200", "300", "400"], datetime.timedelta(days=7)
+            ),
+            {"100"},
+        )
+        self.assertEqual(
+            get_recently_crawled_kamerstukdossiers(
+                ["100", "200", "300", "400"], datetime.timedelta(days=30)
+            ),
+            {"100", "200"},
+        )
+
+    @override_settings(PARLHIST_CRAWLER_SRU_DOSSIERS_PER_QUERY=2)
+    def test_recrawl(self):
+        koop_sru_api = FakeKoopSruApi(
+            {
+                "100": [make_record(["100"], "1")],
+                "200": [make_record(["200"], "1")],
+                "300": [make_record(["300"], "1")],
+                "400": [make_record(["400"], "1")],
+            },
+            failing_dossiers=["400"],
+        )
+        koop_sru_api.patch(self)
+
+        with self.assertLogs("parlhistnl.crawler.kamerdossier", "ERROR"):
+            recrawled, skipped, failed = recrawl_kamerstukdossiers(
+                ["400", "300", "200", "100", "200"],
+                max_age=datetime.timedelta(days=7),
+                workers=2,
+            )
+
+        self.assertEqual((recrawled, skipped, failed), (2, 1, 1))
+        # The recently crawled dossier is skipped, the other dossiers are requested once, two per query
+        self.assertEqual(
+            sorted(koop_sru_api.queries),
+            [
+                "(c.product-area=officielepublicaties AND (w.dossiernummer==200 OR w.dossiernummer==300) AND w.publicatienaam=Kamerstuk)",
+                "(c.product-area=officielepublicaties AND (w.dossiernummer==400) AND w.publicatienaam=Kamerstuk)",
+            ],
+        )
+        self.assertEqual(
+            get_recently_crawled_kamerstukdossiers(
+                ["100", "200", "300", "400"], datetime.timedelta(days=7)
+            ),
+            {"100", "200", "300"},
+        )
@@ -0,0 +1,69 @@
+"""
+parlhist/parlhistnl/tests/test_kamerstuktype.py
+
+Tests for parlhistnl/crawler/kamerstuktype.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import xml.etree.ElementTree as ET
+
+from django.test import SimpleTestCase
+
+from parlhistnl.crawler.kamerstuktype import (
+    classify_kamerstuktype,
+    classify_kamerstuktypes,
+    get_opgegeven_kamerstuktype,
+)
+from parlhistnl.models import Kamerstuk
+
+KamerstukType = Kamerstuk.KamerstukType
+
+
+class KamerstuktypeTestCase(SimpleTestCase):
+    """Tests for classifying the type of kamerstukken"""
+
+    def test_classify_kamerstuktype(self):
+        for title, opgegeven_kamerstuktype, kamerstuktype in [
+            ("Motie van het lid X", "", KamerstukType.MOTIE),
+            ("  GEWIJZIGD AMENDEMENT VAN HET LID X", "", KamerstukType.AMENDEMENT),
+            ("Nota naar aanleiding van het verslag", "", KamerstukType.NOTA_NA_VERSLAG),
+            ("Verslag van een schriftelijk overleg", "", KamerstukType.VERSLAG),
+            ("Wijziging van de Wet; Memorie van toelichting", "", KamerstukType.MEMORIE_VAN_TOELICHTING),
+            ("Tweede nota van wijziging", "", KamerstukType.NOTA_VAN_WIJZIGING),
+            ("Jaarverslag 2O23", "", KamerstukType.JAARVERSLAG),
+            # The opgegeven kamerstuktype takes precedence over most of the title rules
+            ("Nota van wijziging", "Amendement", KamerstukType.AMENDEMENT),
+            ("Geleidende brief", "Memorie van toelichting", KamerstukType.GELEIDENDE_BRIEF),
+            ("Iets", "Brief", KamerstukType.BRIEF),
+            ("Iets; anders", "", KamerstukType.ONBEKEND),
+            ("", "", KamerstukType.ONBEKEND),
+        ]:
+            with self.subTest(title=title, opgegeven_kamerstuktype=opgegeven_kamerstuktype):
+                self.assertEqual(
+                    classify_kamerstuktype(title, opgegeven_kamerstuktype), kamerstuktype
+                )
+
+    def test_classify_kamerstuktypes(self):
+        self.assertEqual(
+            classify_kamerstuktypes(
+                [("Motie van het lid X", ""), ("Iets", "Verslag"), ("Motie van het lid X", "")]
+            ),
+            [KamerstukType.MOTIE, KamerstukType.VERSLAG, KamerstukType.MOTIE],
+        )
+
+    def test_get_opgegeven_kamerstuktype(self):
+        self.assertEqual(
+            get_opgegeven_kamerstuktype(
+                ET.fromstring(
+                    '<record xmlns:overheidwetgeving="http://standaarden.overheid.nl/wetgeving/">'
+                    '<overheidwetgeving:subrubriek scheme="OVERHEIDop.KamerstukTypen">Motie</overheidwetgeving:subrubriek>'
+                    "</record>"
+                )
+            ),
+            "Motie",
+        )
+        self.assertEqual(get_opgegeven_kamerstuktype(ET.fromstring("<metadata_gegevens/>")), "")
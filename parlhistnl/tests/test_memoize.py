@@ -0,0 +1,310 @@
+"""
+parlhist/parlhistnl/tests/test_memoize.py
+
+Tests for parlhistnl/crawler/memoize.py, and memoized requests in parlhistnl/crawler/utils.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.memoize import (
+    MemoIndex,
+    MemoizeException,
+    create_memo_store,
+    decode_memoized_header,
+    decode_memoized_response,
+    encode_memoized_response,
+    get_memoize_key,
+    get_memoize_url_class,
+    get_memoized_at,
+    is_legacy_memoized_data,
+    refresh_memoized_data,
+)
+from parlhistnl.crawler.utils import get_url_or_error
+
+
+def make_response(body: bytes, status_code=200) -> requests.Response:
+    """Create a requests.Response without sending a request"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = "https://zoek.officielebekendmakingen.nl/stb-1995-24.html"
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.headers["ETag"] = '"abc"'
+    response.headers["Set-Cookie"] = "session=secret"
+    response._content = body  # pylint: disable=protected-access
+    return response
+
+
+class MemoizedResponseFormatTestCase(SimpleTestCase):
+    """Tests for the memoized request format"""
+
+    def test_roundtrip(self):
+        body = "<html><body>Wet van 12 januari 1995 ë</body></html>".encode("utf-8")
+        data = encode_memoized_response(make_response(body))
+
+        self.assertFalse(is_legacy_memoized_data(data))
+
+        response = decode_memoized_response(data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, body)
+        self.assertEqual(response.text, body.decode("utf-8"))
+        self.assertEqual(response.encoding, "utf-8")
+        self.assertEqual(response.headers["etag"], '"abc"')
+        self.assertNotIn("Set-Cookie", response.headers)
+
+    def test_header_only(self):
+        data = encode_memoized_response(make_response(b"x" * 1000, status_code=404))
+        header = decode_memoized_header(data)
+
+        self.assertEqual(header["status_code"], 404)
+        self.assertEqual(
+            header["url"], "https://zoek.officielebekendmakingen.nl/stb-1995-24.html"
+        )
+
+    def test_legacy_pickle(self):
+        body = b"<html>legacy</html>"
+        data = pickle.dumps(make_response(body), pickle.HIGHEST_PROTOCOL)
+
+        self.assertTrue(is_legacy_memoized_data(data))
+        self.assertEqual(decode_memoized_response(data).content, body)
+
+    def test_refresh(self):
+        body = b"<html>refresh</html>"
+        data = encode_memoized_response(make_response(body))
+        memoized_at = get_memoized_at(data)
+
+        time.sleep(0.01)
+        refreshed_data = refresh_memoized_data(data)
+
+        self.assertGreater(get_memoized_at(refreshed_data), memoized_at)
+        self.assertEqual(decode_memoized_response(refreshed_data).content, body)
+
+    def test_url_class(self):
+        self.assertEqual(
+            get_memoize_url_class(
+                "https://repository.overheid.nl/sru?query=c.product-area==officielepublicaties"
+            ),
+            "sru",
+        )
+        self.assertEqual(
+            get_memoize_url_class(
+                "https://zoek.officielebekendmakingen.nl/stb-1995-24/metadata.xml"
+            ),
+            "metadata",
+        )
+        self.assertEqual(
+            get_memoize_url_class("https://zoek.officielebekendmakingen.nl/stb-1995-24.html"),
+            "document",
+        )
+
+
+class MemoStoreTestCase(SimpleTestCase):
+    """Tests for the MemoStore backends"""
+
+    def check_memo_store(self, memo_store):
+        url = "https://zoek.officielebekendmakingen.nl/kst-36496-54.html"
+        self.assertIsNone(memo_store.get_response(url))
+
+        memo_store.put_response(url, make_response(b"<html>kst</html>"))
+        self.assertEqual(memo_store.get_response(url).content, b"<html>kst</html>")
+        self.assertEqual(list(memo_store.keys()), [get_memoize_key(url)])
+        self.assertEqual(memo_store.check(), [])
+
+        memo_store.compact()
+        self.assertEqual(memo_store.get_response(url).content, b"<html>kst</html>")
+
+        memo_store.delete(get_memoize_key(url))
+        self.assertIsNone(memo_store.get_response(url))
+
+    def test_file_memo_store(self):
+        with tempfile.TemporaryDirectory() as path:
+            self.check_memo_store(create_memo_store("file", path))
+
+    def test_sqlite_memo_store(self):
+        with tempfile.TemporaryDirectory() as path:
+            self.check_memo_store(create_memo_store("sqlite", path))
+
+    def test_sqlite_memo_store_write_while_iterating(self):
+        with tempfile.TemporaryDirectory() as path:
+            memo_store = create_memo_store("sqlite", path)
+            memo_store.ITER_BATCH_SIZE = 3
+
+            keys = sorted(f"{i:040}" for i in range(10))
+            for key in keys:
+                memo_store.put(key, b"old")
+
+            # E.g. memoize_migrate_legacy rewrites every memoized request while iterating over the keys
+            for key in memo_store.keys():
+                memo_store.put(key, b"new")
+                memo_store.put(f"-{key[1:]}", b"added")
+
+            self.assertEqual(
+                [key for key in memo_store.keys() if not key.startswith("-")], keys
+            )
+            self.assertEqual({memo_store.get(key) for key in keys}, {b"new"})
+            self.assertEqual(len(list(memo_store.entries())), 20)
+
+    def check_prune(self, memo_store, set_last_used):
+        urls = [f"https://zoek.officielebekendmakingen.nl/kst-36496-{i}.html" for i in range(10)]
+        for i, url in enumerate(urls):
+            memo_store.put_response(url, make_response(os.urandom(1000)))
+            set_last_used(memo_store, get_memoize_key(url), 1_000_000 + i)
+
+        total_bytes = sum(size for _, size, _ in memo_store.entries())
+        removed, removed_bytes = memo_store.prune(total_bytes // 2)
+
+        self.assertEqual(removed, 6)
+        self.assertLessEqual(total_bytes - removed_bytes, total_bytes // 2 * 0.9)
+        # The least recently used memoized requests are removed first
+        self.assertIsNone(memo_store.get_response(urls[5]))
+        self.assertIsNotNone(memo_store.get_response(urls[6]))
+
+    def test_file_memo_store_prune(self):
+        def set_last_used(memo_store, key, last_used):
+            os.utime(f"{memo_store.path}/{key[0]}/{key[1]}/{key}", (last_used, last_used))
+
+        with tempfile.TemporaryDirectory() as path:
+            self.check_prune(create_memo_store("file", path), set_last_used)
+
+    def test_sqlite_memo_store_prune(self):
+        def set_last_used(memo_store, key, last_used):
+            memo_store._SqliteMemoStore__get_connection().execute(  # pylint: disable=protected-access
+                "UPDATE memoized_requests SET accessed_at = ? WHERE key = ?",
+                (last_used, key),
+            )
+
+        with tempfile.TemporaryDirectory() as path:
+            self.check_prune(create_memo_store("sqlite", path), set_last_used)
+
+
+class MemoIndexTestCase(SimpleTestCase):
+    """Tests for the MemoIndex"""
+
+    def test_memo_index(self):
+        with tempfile.TemporaryDirectory() as path:
+            index = MemoIndex.create(f"{path}/index.bloom", 1000)
+            keys = [get_memoize_key(f"https://example.org/{i}") for i in range(1000)]
+
+            for key in keys[:500]:
+                index.add(key)
+
+            # No false negatives, also not when reopening the index
+            reopened_index = MemoIndex(f"{path}/index.bloom")
+            for key in keys[:500]:
+                self.assertTrue(index.might_contain(key))
+                self.assertTrue(reopened_index.might_contain(key))
+
+            false_positives = sum(index.might_contain(key) for key in keys[500:])
+            self.assertLess(false_positives, 25)
+
+    def test_memo_index_processes(self):
+        with tempfile.TemporaryDirectory() as path:
+            index = MemoIndex.create(f"{path}/index.bloom", 4000)
+            keys = [get_memoize_key(f"https://example.org/{i}") for i in range(4000)]
+
+            def add_keys(process_keys: list[str]) -> None:
+                for key in process_keys:
+                    index.add(key)
+
+            # Processes adding keys at the same time do not lose each other's bits
+            processes = [
+                multiprocessing.get_context("fork").Process(
+                    target=add_keys, args=(keys[i::4],)
+                )
+                for i in range(4)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+            self.assertTrue(all(index.might_contain(key) for key in keys))
+
+    def test_memo_index_rebuild_in_use(self):
+        with tempfile.TemporaryDirectory() as path:
+            index = MemoIndex.create(f"{path}/index.bloom", 1000)
+
+            with self.assertRaises(MemoizeException):
+                MemoIndex.lock_for_rebuild(f"{path}/index.bloom")
+
+            index.close()
+            MemoIndex.lock_for_rebuild(f"{path}/index.bloom").close()
+
+    def test_memo_store_with_index(self):
+        with tempfile.TemporaryDirectory() as path:
+            memo_store = create_memo_store("file", path)
+            memo_store.index = MemoIndex.create(f"{path}/index.bloom", 1000)
+            url = "https://zoek.officielebekendmakingen.nl/stb-1995-24.html"
+
+            memo_store.put_response(url, make_response(b"<html>stb</html>"))
+            self.assertTrue(memo_store.index.might_contain(get_memoize_key(url)))
+            self.assertEqual(memo_store.get_response(url).content, b"<html>stb</html>")
+
+
+class GetMemoizedUrlTestCase(SimpleTestCase):
+    """Tests for revalidating memoized requests in get_url_or_error"""
+
+    def setUp(self):
+        self.url = "https://zoek.officielebekendmakingen.nl/stb-1995-24.html"
+        path = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(path.cleanup)
+        self.memo_store = create_memo_store("file", path.name)
+        self.memo_store.put_response(self.url, make_response(b"<html>stb</html>"))
+
+        for name, kwargs in [
+            ("get_memo_store", {"return_value": self.memo_store}),
+            ("send_request", {}),
+        ]:
+            patcher = mock.patch(f"parlhistnl.crawler.utils.{name}", **kwargs)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_revalidate_not_modified(self):
+        self.send_request.return_value = make_response(b"", 304)
+
+        response = get_url_or_error(self.url, memoize=True, revalidate=True)
+
+        self.assertEqual(response.content, b"<html>stb</html>")
+        self.assertEqual(
+            self.send_request.call_args.kwargs["headers"], {"If-None-Match": '"abc"'}
+        )
+
+    def test_revalidate_unavailable(self):
+        # The memoized request is used if the server cannot be reached
+        for failure, status_code in [
+            (CrawlerException("Connection refused"), 200),
+            (None, 503),
+        ]:
+            self.send_request.side_effect = failure
+            self.send_request.return_value = make_response(b"", status_code)
+
+            with self.subTest(status_code=status_code), self.assertLogs(
+                "parlhistnl.crawler.utils", "WARNING"
+            ):
+                response = get_url_or_error(self.url, memoize=True, revalidate=True)
+                self.assertEqual(response.content, b"<html>stb</html>")
+
+    def test_unavailable_without_memoized(self):
+        self.send_request.return_value = make_response(b"", 503)
+
+        with self.assertRaises(CrawlerException), self.assertLogs(
+            "parlhistnl.crawler.utils", "ERROR"
+        ):
+            get_url_or_error(
+                "https://zoek.officielebekendmakingen.nl/stb-1995-25.html",
+                memoize=True,
+            )
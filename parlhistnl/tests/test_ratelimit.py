@@ -0,0 +1,83 @@
+"""
+parlhist/parlhistnl/tests/test_ratelimit.py
+
+Tests for parlhistnl/crawler/ratelimit.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from parlhistnl.crawler.ratelimit import (
+    FileRateLimitBackend,
+    LocalRateLimitBackend,
+    RateLimiter,
+)
+
+HOST = "zoek.officielebekendmakingen.nl"
+
+
+def get_rate(rate_limiter: RateLimiter) -> float:
+    """Get the current rate of HOST"""
+    return rate_limiter.backend.update(HOST, lambda state: state["rate"])
+
+
+@override_settings(
+    PARLHIST_CRAWLER_RATELIMIT_MAX_RATE={"*": 2.0},
+    PARLHIST_CRAWLER_RATELIMIT_MIN_RATE={"*": 0.1},
+    PARLHIST_CRAWLER_RATELIMIT_BURST=2,
+    PARLHIST_CRAWLER_RATELIMIT_INCREASE=0.5,
+    PARLHIST_CRAWLER_RATELIMIT_SLOW_RESPONSE_SECONDS=5,
+)
+class RateLimiterTestCase(SimpleTestCase):
+    """Tests for the RateLimiter"""
+
+    def check_rate_limiter(self, rate_limiter):
+        with mock.patch("parlhistnl.crawler.ratelimit.time") as mock_time:
+            mock_time.time.return_value = 1000.0
+
+            # The burst may be sent at once, after that every request waits for the next token
+            self.assertEqual(rate_limiter.acquire(HOST), 0.0)
+            self.assertEqual(rate_limiter.acquire(HOST), 0.0)
+            self.assertAlmostEqual(rate_limiter.acquire(HOST), 0.5)
+            self.assertAlmostEqual(rate_limiter.acquire(HOST), 1.0)
+
+            # A 429 halves the rate, a successful response raises it again
+            rate_limiter.report(HOST, 429, 0.1)
+            rate_limiter.report(HOST, 429, 0.1)
+            self.assertAlmostEqual(get_rate(rate_limiter), 0.5)
+            rate_limiter.report(HOST, 200, 0.1)
+            self.assertAlmostEqual(get_rate(rate_limiter), 1.0)
+            rate_limiter.report(HOST, 200, 10.0)
+            self.assertAlmostEqual(get_rate(rate_limiter), 0.75)
+
+            # Other hosts have their own bucket
+            self.assertEqual(rate_limiter.acquire("repository.overheid.nl"), 0.0)
+
+    def test_local_backend(self):
+        self.check_rate_limiter(RateLimiter(LocalRateLimitBackend()))
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as path:
+            self.check_rate_limiter(
+                RateLimiter(FileRateLimitBackend(f"{path}/ratelimit.json"))
+            )
+
+            # The state is shared with other processes through the file
+            rate_limiter = RateLimiter(FileRateLimitBackend(f"{path}/ratelimit.json"))
+            self.assertAlmostEqual(get_rate(rate_limiter), 0.75)
+
+    def test_file_backend_directory(self):
+        # By default the state is stored with the memoized requests, which may not exist yet
+        with tempfile.TemporaryDirectory() as path:
+            self.check_rate_limiter(
+                RateLimiter(
+                    FileRateLimitBackend(f"{path}/memoized-requests/ratelimit.json")
+                )
+            )
@@ -0,0 +1,199 @@
+"""
+parlhist/parlhistnl/tests/test_rebuild_from_memoized.py
+
+Tests for parlhistnl/management/commands/rebuild_from_memoized.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from parlhistnl.crawler.kamerstuk import parse_kamerstuk
+from parlhistnl.crawler.memoize import create_memo_store
+from parlhistnl.crawler.staatsblad import parse_staatsblad
+from parlhistnl.management.commands.rebuild_from_memoized import (
+    classify_memoized_url,
+    group_memoized_urls,
+    parse_memoized_document,
+)
+from parlhistnl.tests.test_extraction import STAATSBLAD_XML, read_page
+from parlhistnl.tests.test_memoize import make_response
+from parlhistnl.tests.test_reclassify_kamerstukken import KAMERSTUK_METADATA_XML
+from parlhistnl.tests.test_reparse import STAATSBLAD_METADATA_XML
+
+ZOEK_URL = "https://zoek.officielebekendmakingen.nl"
+REPOSITORY_URL = "https://repository.overheid.nl/frbr/officielepublicaties"
+
+
+class GroupMemoizedUrlsTestCase(SimpleTestCase):
+    """Tests for finding the publications in the memoized requests"""
+
+    def test_classify_memoized_url(self):
+        for url, expected in [
+            (f"{ZOEK_URL}/kst-36000-3.html", ("kst-36000-3", "html")),
+            (f"{ZOEK_URL}/kst-36000-3/metadata.xml", ("kst-36000-3", "metadata")),
+            (f"{ZOEK_URL}/stb-1995-24.xml", ("stb-1995-24", "xml")),
+            (
+                f"{REPOSITORY_URL}/stb/1995/stb-1995-24/1/metadata/metadata.xml",
+                ("stb-1995-24", "metadata"),
+            ),
+            (
+                f"{REPOSITORY_URL}/stb/1995/stb-1995-24/1/xml/stb-1995-24.xml",
+                ("stb-1995-24", "xml"),
+            ),
+            (
+                f"{REPOSITORY_URL}/h-tk/20232024/h-tk-20232024-12-3/1/html/h-tk-20232024-12-3.html",
+                ("h-tk-20232024-12-3", "html"),
+            ),
+            # Not a publication
+            ("https://repository.overheid.nl/sru?query=w.publicatienaam%3DStaatsblad", None),
+            (f"{ZOEK_URL}/ag-tk-2023-1.html", None),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(classify_memoized_url(url), expected)
+
+    def test_group_memoized_urls(self):
+        documents = group_memoized_urls(
+            [
+                f"{ZOEK_URL}/stb-1995-24.html",
+                f"{REPOSITORY_URL}/stb/1995/stb-1995-24/1/html/stb-1995-24.html",
+                f"{REPOSITORY_URL}/stb/1995/stb-1995-24/1/xml/stb-1995-24.xml",
+                f"{ZOEK_URL}/stb-1995-24/metadata.xml",
+                None,
+                # The xml of this Staatsblad is missing
+                f"{ZOEK_URL}/stb-1995-25.html",
+                f"{ZOEK_URL}/stb-1995-25/metadata.xml",
+                f"{ZOEK_URL}/kst-36000-3/metadata.xml",
+                f"{ZOEK_URL}/kst-36000-3.html",
+            ],
+            ["kst", "stb"],
+        )
+
+        self.assertEqual(
+            documents,
+            {
+                # The zoek.officielebekendmakingen.nl html is preferred over the repository html
+                "stb-1995-24": {
+                    "html": f"{ZOEK_URL}/stb-1995-24.html",
+                    "xml": f"{REPOSITORY_URL}/stb/1995/stb-1995-24/1/xml/stb-1995-24.xml",
+                    "metadata": f"{ZOEK_URL}/stb-1995-24/metadata.xml",
+                },
+                "kst-36000-3": {
+                    "html": f"{ZOEK_URL}/kst-36000-3.html",
+                    "metadata": f"{ZOEK_URL}/kst-36000-3/metadata.xml",
+                },
+            },
+        )
+
+    def test_group_memoized_urls_preferred_html(self):
+        urls = [
+            f"{REPOSITORY_URL}/stb/1995/stb-1995-24/1/html/stb-1995-24.html",
+            f"{ZOEK_URL}/stb-1995-24.html",
+            f"{ZOEK_URL}/stb-1995-24.xml",
+            f"{ZOEK_URL}/stb-1995-24/metadata.xml",
+        ]
+
+        for ordered_urls in [urls, urls[::-1]]:
+            with self.subTest(first=ordered_urls[0]):
+                self.assertEqual(
+                    group_memoized_urls(ordered_urls, ["stb"])["stb-1995-24"]["html"],
+                    f"{ZOEK_URL}/stb-1995-24.html",
+                )
+
+    def test_group_memoized_urls_publication_types(self):
+        urls = [f"{ZOEK_URL}/kst-36000-3.html", f"{ZOEK_URL}/kst-36000-3/metadata.xml"]
+
+        self.assertEqual(list(group_memoized_urls(urls, ["kst"])), ["kst-36000-3"])
+        self.assertEqual(group_memoized_urls(urls, ["stb", "h"]), {})
+
+
+class ParseMemoizedDocumentTestCase(SimpleTestCase):
+    """Tests for parsing publications from their memoized requests"""
+
+    def setUp(self):
+        path = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(path.cleanup)
+        self.memo_store = create_memo_store("file", path.name)
+
+        patcher = mock.patch(
+            "parlhistnl.management.commands.rebuild_from_memoized.get_memo_store",
+            return_value=self.memo_store,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def memoize(self, urls: dict[str, str], texts: dict[str, str]) -> None:
+        """Memoize the text of every manifestation of a publication"""
+
+        for manifestation, text in texts.items():
+            self.memo_store.put_response(
+                urls[manifestation], make_response(text.encode("utf-8"))
+            )
+
+    def test_parse_kamerstuk(self):
+        html = read_page("kst-36000-3.html")
+        urls = {
+            "html": f"{ZOEK_URL}/kst-36000-3.html",
+            "metadata": f"{ZOEK_URL}/kst-36000-3/metadata.xml",
+        }
+        self.memoize(urls, {"html": html, "metadata": KAMERSTUK_METADATA_XML})
+
+        self.assertEqual(
+            parse_memoized_document(("kst-36000-3", urls)),
+            (
+                "kst",
+                "kst-36000-3",
+                parse_kamerstuk("36000", "3", html, KAMERSTUK_METADATA_XML),
+            ),
+        )
+
+    def test_parse_staatsblad(self):
+        html = read_page("stb-1995-24.html")
+        urls = {
+            "html": f"{ZOEK_URL}/stb-1995-24.html",
+            "xml": f"{ZOEK_URL}/stb-1995-24.xml",
+            "metadata": f"{ZOEK_URL}/stb-1995-24/metadata.xml",
+        }
+        self.memoize(
+            urls,
+            {"html": html, "xml": STAATSBLAD_XML, "metadata": STAATSBLAD_METADATA_XML},
+        )
+
+        self.assertEqual(
+            parse_memoized_document(("stb-1995-24", urls)),
+            (
+                "stb",
+                "stb-1995-24",
+                parse_staatsblad(
+                    1995,
+                    "24",
+                    "",
+                    html,
+                    STAATSBLAD_XML,
+                    STAATSBLAD_METADATA_XML,
+                    preferred_url=urls["html"],
+                ),
+            ),
+        )
+
+    def test_parse_missing_memoized(self):
+        urls = {
+            "html": f"{ZOEK_URL}/kst-36000-3.html",
+            "metadata": f"{ZOEK_URL}/kst-36000-3/metadata.xml",
+        }
+        self.memoize(urls, {"metadata": KAMERSTUK_METADATA_XML})
+
+        # Nothing is requested, the publication is not rebuilt
+        with self.assertLogs(
+            "parlhistnl.management.commands.rebuild_from_memoized", "ERROR"
+        ):
+            self.assertEqual(
+                parse_memoized_document(("kst-36000-3", urls)),
+                ("kst", "kst-36000-3", None),
+            )
@@ -0,0 +1,79 @@
+"""
+parlhist/parlhistnl/tests/test_reclassify_kamerstukken.py
+
+Tests for parlhistnl/management/commands/reclassify_kamerstukken.py, and update_kamerstuktype in
+parlhistnl/crawler/kamerstuk.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from parlhistnl.crawler.kamerstuk import (
+    parse_kamerstuk,
+    save_parsed_kamerstuk,
+    update_kamerstuktype,
+)
+from parlhistnl.models import Kamerstuk
+from parlhistnl.tests.test_extraction import read_page
+
+KAMERSTUK_METADATA_XML = """<?xml version="1.0" encoding="utf-8"?><metadata_gegevens>
+<metadata name="DC.title" content="Wijziging van de Wet op de rechterlijke organisatie; Memorie van toelichting"/>
+<metadata name="OVERHEIDop.documenttitel" content="Memorie van toelichting"/>
+<metadata name="OVERHEIDop.dossiertitel" content="Wijziging van de Wet op de rechterlijke organisatie"/>
+<metadata name="OVERHEIDop.dossiernummer" content="36000"/>
+<metadata name="OVERHEIDop.ondernummer" content="3"/>
+<metadata name="OVERHEIDop.indiener" content="F.M. Weerwind"/>
+<metadata name="OVERHEIDop.vergaderjaar" content="2023-2024"/>
+<metadata name="DCTERMS.issued" scheme="OVERHEID.Date" content="2023-10-02"/>
+<metadata name="DC.creator" scheme="OVERHEID.StatenGeneraal" content="Tweede Kamer der Staten-Generaal"/>
+</metadata_gegevens>"""
+
+
+class ReclassifyKamerstukkenTestCase(TestCase):
+    """Tests for reclassifying the kamerstuktype of Kamerstukken"""
+
+    def setUp(self):
+        self.parsed = parse_kamerstuk(
+            "36000", "3", read_page("kst-36000-3.html"), KAMERSTUK_METADATA_XML
+        )
+        kst = save_parsed_kamerstuk(self.parsed)
+        # e.g. classified by an older version of the rules
+        Kamerstuk.objects.filter(id=kst.id).update(
+            kamerstuktype=Kamerstuk.KamerstukType.ONBEKEND, content_hash="oud"
+        )
+
+    def test_reclassify(self):
+        self.assertEqual(
+            self.parsed["kamerstuktype"],
+            Kamerstuk.KamerstukType.MEMORIE_VAN_TOELICHTING,
+        )
+
+        call_command("reclassify_kamerstukken", stdout=io.StringIO())
+
+        # The content hash is the one the crawler computes, so that a recrawl does not rewrite the kamerstuk
+        kst = Kamerstuk.objects.get()
+        self.assertEqual(kst.kamerstuktype, self.parsed["kamerstuktype"])
+        self.assertEqual(kst.content_hash, self.parsed["content_hash"])
+
+    def test_reclassify_dry_run(self):
+        call_command("reclassify_kamerstukken", "--dry-run", stdout=io.StringIO())
+
+        kst = Kamerstuk.objects.get()
+        self.assertEqual(kst.kamerstuktype, Kamerstuk.KamerstukType.ONBEKEND)
+        self.assertEqual(kst.content_hash, "oud")
+
+    def test_update_kamerstuktype(self):
+        kst = Kamerstuk.objects.get()
+
+        update_kamerstuktype(kst)
+
+        kst.refresh_from_db()
+        self.assertEqual(kst.kamerstuktype, self.parsed["kamerstuktype"])
+        self.assertEqual(kst.content_hash, self.parsed["content_hash"])
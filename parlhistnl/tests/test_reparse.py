@@ -0,0 +1,81 @@
+"""
+parlhist/parlhistnl/tests/test_reparse.py
+
+Tests for parlhistnl/management/commands/reparse.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+from django.core.management import CommandError
+from django.test import SimpleTestCase
+
+from parlhistnl.crawler.staatsblad import parse_staatsblad
+from parlhistnl.management.commands.reparse import (
+    get_reparsed_fields,
+    parse_filters,
+    reparse_row,
+)
+from parlhistnl.tests.test_extraction import STAATSBLAD_XML
+
+STAATSBLAD_METADATA_XML = """<?xml version="1.0" encoding="utf-8"?><metadata_gegevens>
+<metadata name="DC.title" content="Wet van 1 februari 1995, houdende regels"/>
+<metadata name="DC.type" scheme="OVERHEIDop.Staatsblad" content="Wet"/>
+<metadata name="DCTERMS.issued" scheme="OVERHEID.Date" content="1995-02-14"/>
+<metadata name="OVERHEIDop.datumOndertekening" scheme="OVERHEID.Date" content="1995-02-01"/>
+</metadata_gegevens>"""
+
+
+class ReparseTestCase(SimpleTestCase):
+    """Tests for reparsing publications from their stored raw data"""
+
+    def setUp(self):
+        parsed = parse_staatsblad(
+            1995,
+            "77",
+            "",
+            None,
+            STAATSBLAD_XML,
+            STAATSBLAD_METADATA_XML,
+            preferred_url="https://zoek.officielebekendmakingen.nl/stb-1995-77.html",
+        )
+        # A row as read from the database, the nummer is stored as an integer
+        self.row = {"id": 1, **parsed, "nummer": 77}
+
+    def test_reparse_unchanged(self):
+        self.assertEqual(reparse_row(("stb", self.row)), (1, {}))
+
+    def test_reparse_changed(self):
+        self.row["tekst"] = "Oude tekst"
+        self.row["staatsblad_type"] = "Onbekend"
+        old_content_hash = self.row["content_hash"]
+        self.row["content_hash"] = ""
+
+        pk, changed = reparse_row(("stb", self.row))
+
+        self.assertEqual(pk, 1)
+        self.assertEqual(set(changed), {"tekst", "staatsblad_type", "content_hash"})
+        self.assertTrue(changed["tekst"].startswith("Wet van 1 februari 1995"))
+        self.assertEqual(changed["staatsblad_type"], "Wet")
+        self.assertEqual(changed["content_hash"], old_content_hash)
+
+    def test_reparse_failed(self):
+        self.row["raw_metadata_xml"] = "<metadata_gegevens/>"
+
+        with self.assertLogs("parlhistnl", "ERROR"):
+            self.assertEqual(reparse_row(("stb", self.row)), (1, None))
+
+    def test_reparsed_fields(self):
+        self.assertIn("kamerstuktype", get_reparsed_fields("kst"))
+        self.assertNotIn("hoofddossier", get_reparsed_fields("kst"))
+        self.assertNotIn("bijgewerkt_op", get_reparsed_fields("stb"))
+
+    def test_parse_filters(self):
+        self.assertEqual(
+            parse_filters(["kamerstuktype=Onbekend", "vergaderjaar__startswith=2023"]),
+            {"kamerstuktype": "Onbekend", "vergaderjaar__startswith": "2023"},
+        )
+        with self.assertRaises(CommandError):
+            parse_filters(["kamerstuktype"])
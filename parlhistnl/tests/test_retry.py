@@ -0,0 +1,108 @@
+"""
+parlhist/parlhistnl/tests/test_retry.py
+
+Tests for parlhistnl/crawler/retry.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.ratelimit import LocalRateLimitBackend, RateLimiter
+from parlhistnl.crawler.retry import get_backoff_seconds, parse_retry_after, send_request
+
+URL = "https://zoek.officielebekendmakingen.nl/kst-36496-54.html"
+
+
+def make_response(status_code: int, headers: dict | None = None) -> requests.Response:
+    """Create a requests.Response without sending a request"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+@override_settings(
+    PARLHIST_CRAWLER_RETRY_MAX_ATTEMPTS=3,
+    PARLHIST_CRAWLER_RETRY_BACKOFF_SECONDS=1,
+    PARLHIST_CRAWLER_RETRY_MAX_BACKOFF_SECONDS=60,
+    PARLHIST_CRAWLER_CIRCUIT_BREAKER_FAILURES=2,
+    PARLHIST_CRAWLER_CIRCUIT_BREAKER_OPEN_SECONDS=300,
+)
+class RetryTestCase(SimpleTestCase):
+    """Tests for sending requests with retries"""
+
+    def setUp(self):
+        self.rate_limiter = RateLimiter(LocalRateLimitBackend())
+        patchers = [
+            mock.patch(
+                "parlhistnl.crawler.retry.get_rate_limiter",
+                return_value=self.rate_limiter,
+            ),
+            mock.patch("parlhistnl.crawler.retry.get_session"),
+            # Also patches the sleeping of the rate limiter, as both use the time module
+            mock.patch("parlhistnl.crawler.retry.time.sleep"),
+        ]
+        patchers[0].start()
+        self.get_session = patchers[1].start()
+        self.sleep = patchers[2].start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def test_backoff(self):
+        for attempt in range(10):
+            self.assertLessEqual(get_backoff_seconds(attempt), min(60, 2**attempt))
+        self.assertEqual(get_backoff_seconds(0, retry_after=30), 30)
+
+    def test_retry_until_success(self):
+        self.get_session().get.side_effect = [
+            requests.exceptions.ConnectionError(),
+            make_response(503),
+            make_response(200),
+        ]
+
+        self.assertEqual(send_request(URL).status_code, 200)
+        self.assertEqual(self.get_session().get.call_count, 3)
+
+    def test_no_retry_on_404(self):
+        self.get_session().get.return_value = make_response(404)
+
+        self.assertEqual(send_request(URL).status_code, 404)
+        self.assertEqual(self.get_session().get.call_count, 1)
+
+    def test_max_attempts(self):
+        self.get_session().get.side_effect = requests.exceptions.ReadTimeout()
+
+        with self.assertRaises(CrawlerException):
+            send_request(URL)
+        self.assertEqual(self.get_session().get.call_count, 3)
+
+    def test_retry_after_and_circuit_breaker(self):
+        self.get_session().get.side_effect = [
+            make_response(429, {"Retry-After": "30"}),
+            make_response(429),
+            make_response(200),
+        ]
+
+        self.assertEqual(send_request(URL).status_code, 200)
+        self.sleep.assert_any_call(30.0)
+
+        # After two consecutive failures the circuit of the host is opened
+        open_until = self.rate_limiter.backend.update(
+            "zoek.officielebekendmakingen.nl", lambda state: state["open_until"]
+        )
+        self.assertGreater(open_until, time.time() + 250)
@@ -0,0 +1,73 @@
+"""
+parlhist/parlhistnl/tests/test_session.py
+
+Tests for parlhistnl/crawler/session.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase, override_settings
+
+from parlhistnl.crawler.session import close_session, get_pool_maxsize, get_session
+
+
+def get_session_id(_=None) -> int:
+    """Get the id of the session of the current process"""
+
+    return id(get_session())
+
+
+def is_parent_session() -> bool:
+    """Whether the session of the current process is the session of the parent process in test_forked_process"""
+
+    return getattr(get_session(), "parent", False)
+
+
+class SessionTestCase(SimpleTestCase):
+    """Tests for the shared HTTP session"""
+
+    def setUp(self):
+        self.addCleanup(close_session)
+
+    def test_shared_by_threads(self):
+        # Short-lived threads, such as those of the SRU page and shard executors, reuse the session of the process
+        for _ in range(3):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                self.assertEqual(
+                    set(executor.map(get_session_id, range(8))), {id(get_session())}
+                )
+
+    def test_close_session(self):
+        session = get_session()
+        close_session()
+
+        self.assertIsNot(get_session(), session)
+
+    def test_forked_process(self):
+        get_session().parent = True
+
+        # The forked process does not reuse the connections of its parent
+        with multiprocessing.get_context("fork").Pool(1) as pool:
+            self.assertFalse(pool.apply(is_parent_session))
+
+    @override_settings(
+        PARLHIST_CRAWLER_HTTP_POOL_MAXSIZE=4,
+        PARLHIST_CRAWLER_FETCH_WORKERS=8,
+        PARLHIST_CRAWLER_SRU_PAGE_WORKERS=4,
+        PARLHIST_CRAWLER_SRU_SHARD_WORKERS=3,
+        PARLHIST_CRAWLER_DOSSIER_WORKERS=2,
+    )
+    def test_pool_maxsize(self):
+        self.assertEqual(get_pool_maxsize(), 8 + 4 * 3)
+        self.assertEqual(
+            get_session()
+            .get_adapter("https://")
+            .poolmanager.connection_pool_kw["maxsize"],
+            20,
+        )
@@ -0,0 +1,94 @@
+"""
+parlhist/parlhistnl/tests/test_sink.py
+
+Tests for parlhistnl/crawler/sink.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import datetime
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from parlhistnl.crawler.checkpoint import CrawlCheckpoint
+from parlhistnl.crawler.sink import DatabaseSink
+from parlhistnl.crawler.staatsblad import parse_staatsblad
+from parlhistnl.models import Staatsblad
+from parlhistnl.tests.test_extraction import STAATSBLAD_XML
+from parlhistnl.tests.test_reparse import STAATSBLAD_METADATA_XML
+
+
+class DatabaseSinkTestCase(TestCase):
+    """Tests for writing crawled publications in batches"""
+
+    def setUp(self):
+        self.sink = DatabaseSink()
+        self.staatsbladen = [
+            self.sink.add_staatsblad(
+                parse_staatsblad(
+                    1995, nummer, "", None, STAATSBLAD_XML, STAATSBLAD_METADATA_XML
+                )
+            )
+            for nummer in ["1", "2", "3"]
+        ]
+
+        bulk_create = QuerySet.bulk_create
+
+        def failing_bulk_create(queryset, objs, *args, **kwargs):
+            objs = list(objs)
+            if any(stb.nummer == "2" for stb in objs):
+                # Some databases set the ids before the transaction is rolled back
+                for index, stb in enumerate(objs):
+                    stb.pk = 1000 + index
+                raise DatabaseError("Could not write stb-1995-2")
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        patcher = mock.patch.object(QuerySet, "bulk_create", failing_bulk_create)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_publication(self):
+        with self.assertLogs("parlhistnl.crawler.sink", "ERROR"):
+            self.assertEqual(self.sink.flush(), 2)
+
+        # Only the publication that could not be written is left without an id
+        self.assertEqual(
+            [stb.pk is None for stb in self.staatsbladen], [False, True, False]
+        )
+        self.assertEqual(
+            set(Staatsblad.objects.values_list("nummer", flat=True)), {1, 3}
+        )
+        self.assertEqual(
+            (self.sink.written, self.sink.skipped, self.sink.failed), (2, 0, 1)
+        )
+
+    def test_failed_publication_checkpoint(self):
+        checkpoint = CrawlCheckpoint(
+            "w.publicatienaam=Staatsblad",
+            datetime.date(1995, 1, 1),
+            datetime.date(1995, 12, 31),
+        )
+        checkpoint.before_save = self.sink.flush
+
+        records = [
+            ET.Element("record", nummer=stb.nummer) for stb in self.staatsbladen
+        ]
+        # The checkpoint is saved, and the publications are written, once the shard has been completed
+        with self.assertLogs("parlhistnl.crawler.sink", "ERROR"):
+            for index, (record, stb) in enumerate(zip(records, self.staatsbladen)):
+                checkpoint.positions.append(("shard", (index, len(records))))
+                checkpoint.processed(record, publication=stb)
+
+        # The record of the publication that could not be written is retried when the crawl is resumed
+        self.assertEqual(
+            checkpoint.checkpoint.failures,
+            [ET.tostring(records[1], encoding="unicode")],
+        )
+        self.assertEqual(checkpoint.checkpoint.completed_shards, ["shard"])
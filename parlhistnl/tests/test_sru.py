@@ -0,0 +1,399 @@
+"""
+parlhist/parlhistnl/tests/test_sru.py
+
+Tests for the KOOP SRU API client in parlhistnl/crawler/utils.py
+
+Available under the EUPL-1.2, or, at your option, any later version.
+
+SPDX-License-Identifier: EUPL-1.2
+SPDX-FileCopyrightText: 2026 Universiteit Leiden <m.a.staal [at] law.leidenuniv.nl>
+"""
+
+import datetime
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+
+from django.test import SimpleTestCase, override_settings
+
+from parlhistnl.crawler.kamerdossier import get_kamerstukdossiers_query
+from parlhistnl.crawler.kamerstuk import KAMERSTUK_REQUIRED_METADATA, parse_kamerstuk
+from parlhistnl.crawler.exceptions import CrawlerException
+from parlhistnl.crawler.memoize import create_memo_store
+from parlhistnl.crawler.utils import (
+    XML_NAMESPACES,
+    get_content_hash,
+    get_koop_sru_api_number_of_records,
+    get_metadata_xml_from_sru_record,
+    get_missing_metadata,
+    iter_koop_sru_api_records,
+    iter_records_with_existing,
+    koop_sru_api_request_raw,
+    koop_sru_api_iter_records,
+    koop_sru_api_request_all,
+    plan_koop_sru_api_shards,
+)
+
+
+def make_sru_response(number_of_records: int, identifiers: list[str]) -> bytes:
+    """Create a raw KOOP SRU API response with a record for every identifier"""
+
+    records = "".join(
+        f"""<sru:record><sru:recordSchema>gzd</sru:recordSchema><sru:recordData><gzd:gzd>
+        <gzd:originalData><dcterms:identifier>{identifier}</dcterms:identifier></gzd:originalData>
+        </gzd:gzd></sru:recordData></sru:record>"""
+        for identifier in identifiers
+    )
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+    <sru:searchRetrieveResponse xmlns:sru="{XML_NAMESPACES['sru']}" xmlns:gzd="{XML_NAMESPACES['gzd']}"
+        xmlns:dcterms="{XML_NAMESPACES['dcterms']}">
+    <sru:version>2.0</sru:version>
+    <sru:numberOfRecords>{number_of_records}</sru:numberOfRecords>
+    <sru:records>{records}</sru:records>
+    </sru:searchRetrieveResponse>""".encode(
+        "utf-8"
+    )
+
+
+def get_identifier(record) -> str:
+    """Get the identifier of a parsed SRU record"""
+    return record.find(".//dcterms:identifier", XML_NAMESPACES).text
+
+
+class KoopSruApiTestCase(SimpleTestCase):
+    """Tests for iterating over the records of a KOOP SRU query"""
+
+    def setUp(self):
+        self.pages = {
+            1: make_sru_response(5, ["kst-1-1", "kst-1-2"]),
+            3: make_sru_response(5, ["kst-1-3", "kst-1-4"]),
+            5: make_sru_response(5, ["kst-1-5"]),
+        }
+
+        def koop_sru_api_request_raw(query, start_record, maximum_records, memoize):
+            return self.pages[start_record]
+
+        patcher = mock.patch(
+            "parlhistnl.crawler.utils.koop_sru_api_request_raw",
+            side_effect=koop_sru_api_request_raw,
+        )
+        self.request_raw = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_number_of_records(self):
+        self.assertEqual(get_koop_sru_api_number_of_records(self.pages[1]), 5)
+
+    def test_iter_records(self):
+        records = koop_sru_api_iter_records("query", maximum_records=2)
+
+        # Only the first page is requested before the first record is yielded
+        self.assertEqual(get_identifier(next(records)), "kst-1-1")
+        self.assertEqual(self.request_raw.call_count, 1)
+
+        self.assertEqual(
+            [get_identifier(record) for record in records],
+            ["kst-1-2", "kst-1-3", "kst-1-4", "kst-1-5"],
+        )
+        # startRecord starts at 1, the next pages are requested concurrently
+        self.assertEqual(
+            sorted(call.args[1] for call in self.request_raw.call_args_list), [1, 3, 5]
+        )
+
+    def test_request_all(self):
+        self.pages = {1: make_sru_response(2, ["kst-1-1", "kst-1-2"])}
+
+        self.assertEqual(
+            [get_identifier(record) for record in koop_sru_api_request_all("query")],
+            ["kst-1-1", "kst-1-2"],
+        )
+
+
+class KoopSruApiMemoizeTestCase(SimpleTestCase):
+    """Tests for memoizing the pages of a KOOP SRU query"""
+
+    def test_memoized_page(self):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = make_sru_response(1, ["kst-1-1"])  # pylint: disable=protected-access
+
+        with tempfile.TemporaryDirectory() as path, mock.patch(
+            "parlhistnl.crawler.utils.get_memo_store",
+            return_value=create_memo_store("file", path),
+        ), mock.patch(
+            "parlhistnl.crawler.utils.send_request", return_value=response
+        ) as send_request:
+            for _ in range(2):
+                self.assertEqual(
+                    koop_sru_api_request_raw("query", 1, 1000, memoize=True),
+                    response.content,
+                )
+
+            # The second request uses the memoized page
+            self.assertEqual(send_request.call_count, 1)
+            self.assertIn("startRecord=1", send_request.call_args.args[0])
+
+            koop_sru_api_request_raw("query", 1001, 1000, memoize=True)
+            self.assertEqual(send_request.call_count, 2)
+
+    @override_settings(PARLHIST_CRAWLER_MEMOIZE_TTL_SECONDS={"sru": 0})
+    def test_expired_page_unavailable(self):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = make_sru_response(1, ["kst-1-1"])  # pylint: disable=protected-access
+        unavailable = requests.Response()
+        unavailable.status_code = 503
+
+        with tempfile.TemporaryDirectory() as path, mock.patch(
+            "parlhistnl.crawler.utils.get_memo_store",
+            return_value=create_memo_store("file", path),
+        ), mock.patch("parlhistnl.crawler.utils.send_request") as send_request:
+            send_request.return_value = response
+            koop_sru_api_request_raw("query", 1, 1000, memoize=True)
+
+            # The expired page is used if the KOOP SRU API cannot be reached
+            for failure in [CrawlerException("Connection refused"), None]:
+                send_request.side_effect = failure
+                send_request.return_value = unavailable
+
+                with self.subTest(failure=failure), self.assertLogs(
+                    "parlhistnl.crawler.utils", "WARNING"
+                ):
+                    self.assertEqual(
+                        koop_sru_api_request_raw("query", 1, 1000, memoize=True),
+                        response.content,
+                    )
+
+            # Without a memoized page, the query fails
+            with self.assertRaises(CrawlerException), self.assertLogs(
+                "parlhistnl.crawler.utils", "ERROR"
+            ):
+                koop_sru_api_request_raw("query", 1001, 1000, memoize=True)
+
+
+class KoopSruApiShardTestCase(SimpleTestCase):
+    """Tests for splitting KOOP SRU queries into shards by date"""
+
+    def setUp(self):
+        # 1000 records on one day, 10 per day in march, one per day in the rest of 2020 and a few outside of 2020
+        self.dates = [datetime.date(2020, 1, 15)] * 1000
+        self.dates += [datetime.date(2020, 3, day) for day in range(1, 32)] * 10
+        self.dates += [
+            datetime.date(2020, 1, 1) + datetime.timedelta(days=day) for day in range(366)
+        ]
+        self.dates += [datetime.date(2019, 12, 31), datetime.date(2021, 1, 1)]
+
+        patcher = mock.patch(
+            "parlhistnl.crawler.utils.koop_sru_api_count", side_effect=self.count
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def count(self, query: str) -> int:
+        """Count the records matching the dt.date conditions of query"""
+        conditions = [
+            (operator, datetime.date.fromisoformat(date))
+            for operator, date in re.findall(r"dt\.date (>=|<=|<|>) ([\d-]+)", query)
+        ]
+        operators = {
+            ">=": lambda a, b: a >= b,
+            "<=": lambda a, b: a <= b,
+            "<": lambda a, b: a < b,
+            ">": lambda a, b: a > b,
+        }
+        return sum(
+            all(operators[operator](date, value) for operator, value in conditions)
+            for date in self.dates
+        )
+
+    @override_settings(PARLHIST_CRAWLER_SRU_SHARD_SIZE=100)
+    def test_plan_shards(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            shards = plan_koop_sru_api_shards(
+                "w.publicatienaam=Staatsblad",
+                datetime.date(2020, 1, 1),
+                datetime.date(2020, 12, 31),
+                executor,
+            )
+
+        counts = [self.count(shard) for shard in shards]
+
+        # All records of 2020 are included once, the records outside of 2020 are not
+        self.assertEqual(sum(counts), len(self.dates) - 2)
+        # Only the day with 1000 records could not be split small enough
+        self.assertEqual([count for count in counts if count > 100], [1001])
+        self.assertTrue(all("dt.date >= " in shard for shard in shards))
+
+    @override_settings(PARLHIST_CRAWLER_SRU_SHARD_SIZE=100)
+    def test_plan_shards_outside_window(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            shards = plan_koop_sru_api_shards(
+                "w.publicatienaam=Staatsblad",
+                datetime.date(2020, 1, 1),
+                datetime.date(2020, 12, 31),
+                executor,
+                include_outside_window=True,
+            )
+
+        counts = [self.count(shard) for shard in shards]
+
+        # No records are lost or counted twice
+        self.assertEqual(sum(counts), len(self.dates))
+        self.assertIn("(w.publicatienaam=Staatsblad AND dt.date < 2020-01-01)", shards)
+        self.assertIn("(w.publicatienaam=Staatsblad AND dt.date > 2020-12-31)", shards)
+
+
+class SruRecordMetadataTestCase(SimpleTestCase):
+    """Tests for taking the metadata of a publication from its KOOP SRU record"""
+
+    record = ET.fromstring(
+        f"""<sru:record xmlns:sru="{XML_NAMESPACES['sru']}" xmlns:gzd="{XML_NAMESPACES['gzd']}"
+        xmlns:dcterms="{XML_NAMESPACES['dcterms']}" xmlns:overheidwetgeving="{XML_NAMESPACES['overheidwetgeving']}"
+        xmlns:overheid="http://standaarden.overheid.nl/owms/terms/">
+        <sru:recordData><gzd:gzd><gzd:originalData><overheidwetgeving:meta>
+            <overheidwetgeving:owmskern>
+                <dcterms:identifier>kst-35925-VII-31</dcterms:identifier>
+                <dcterms:title>Wijziging van de Wet; Amendement; Amendement van het lid X</dcterms:title>
+                <dcterms:creator scheme="overheid:StatenGeneraal">Tweede Kamer der Staten-Generaal</dcterms:creator>
+            </overheidwetgeving:owmskern>
+            <overheidwetgeving:owmsmantel>
+                <dcterms:issued>2022-01-05</dcterms:issued>
+            </overheidwetgeving:owmsmantel>
+            <overheidwetgeving:tpmeta>
+                <overheidwetgeving:dossiernummer>35925-VII</overheidwetgeving:dossiernummer>
+                <overheidwetgeving:ondernummer>31</overheidwetgeving:ondernummer>
+                <overheidwetgeving:dossiertitel>Wijziging van de Wet</overheidwetgeving:dossiertitel>
+                <overheidwetgeving:documenttitel>Amendement van het lid X</overheidwetgeving:documenttitel>
+                <overheidwetgeving:vergaderjaar>2021-2022</overheidwetgeving:vergaderjaar>
+            </overheidwetgeving:tpmeta>
+        </overheidwetgeving:meta></gzd:originalData>
+        <gzd:enrichedData><gzd:preferredUrl>https://zoek.officielebekendmakingen.nl/kst-35925-VII-31.html</gzd:preferredUrl></gzd:enrichedData>
+        </gzd:gzd></sru:recordData></sru:record>"""
+    )
+
+    def test_metadata_xml_from_sru_record(self):
+        raw_metadata_xml = get_metadata_xml_from_sru_record(self.record)
+        metadata_xml = ET.fromstring(raw_metadata_xml)
+
+        self.assertEqual(
+            metadata_xml.find("metadata[@name='DC.identifier']").get("content"),
+            "kst-35925-VII-31",
+        )
+        self.assertEqual(
+            metadata_xml.find("metadata[@name='DCTERMS.issued']").get("content"),
+            "2022-01-05",
+        )
+        self.assertEqual(
+            metadata_xml.find("metadata[@scheme='OVERHEID.StatenGeneraal']").get(
+                "name"
+            ),
+            "DC.creator",
+        )
+        # Only the original metadata is converted, not the enriched data
+        self.assertIsNone(metadata_xml.find("metadata[@name='DCTERMS.preferredUrl']"))
+        self.assertEqual(
+            get_missing_metadata(raw_metadata_xml, KAMERSTUK_REQUIRED_METADATA), []
+        )
+
+    def test_parse_kamerstuk_from_sru_record(self):
+        parsed = parse_kamerstuk(
+            "35925-VII",
+            "31",
+            '<article><div id="broodtekst" class="stuk broodtekst-container">Tekst</div></article>',
+            get_metadata_xml_from_sru_record(self.record),
+        )
+
+        self.assertEqual(parsed["documentdatum"], datetime.date(2022, 1, 5))
+        self.assertEqual(parsed["dossiertitel"], "Wijziging van de Wet")
+        self.assertEqual(parsed["documenttitel"], "Amendement van het lid X")
+        self.assertEqual(parsed["vergaderjaar"], "20212022")
+        self.assertEqual(parsed["kamer"], "tk")
+
+    def test_content_hash(self):
+        parsed = parse_kamerstuk(
+            "35925-VII",
+            "31",
+            '<article><div id="broodtekst" class="stuk broodtekst-container">Tekst</div></article>',
+            get_metadata_xml_from_sru_record(self.record),
+        )
+        content_hash = parsed.pop("content_hash")
+
+        self.assertEqual(get_content_hash(parsed), content_hash)
+        # The order of the fields does not matter
+        self.assertEqual(get_content_hash(dict(reversed(parsed.items()))), content_hash)
+        self.assertNotEqual(get_content_hash({**parsed, "tekst": "Andere tekst"}), content_hash)
+
+    def test_missing_metadata(self):
+        self.assertEqual(
+            get_missing_metadata(
+                '<metadata_gegevens><metadata name="DC.title" content="x"/></metadata_gegevens>',
+                ["metadata[@name='DC.title']", "metadata[@name='DCTERMS.issued']"],
+            ),
+            ["metadata[@name='DCTERMS.issued']"],
+        )
+
+
+class ExistingRecordsTestCase(SimpleTestCase):
+    """Tests for looking up the existing objects of many KOOP SRU records at once"""
+
+    @override_settings(PARLHIST_CRAWLER_EXISTING_BATCH_SIZE=2)
+    def test_iter_records_with_existing(self):
+        records = list(
+            iter_koop_sru_api_records(
+                make_sru_response(
+                    5, ["kst-1-1", "kst-1-2", "invalid", "kst-1-4", "kst-1-5"]
+                )
+            )
+        )
+
+        def get_key(record):
+            identifier = get_identifier(record)
+            if identifier == "invalid":
+                raise CrawlerException("Invalid record")
+            return identifier
+
+        existing_objects = {"kst-1-2": "existing 2", "kst-1-5": "existing 5"}
+        get_existing = mock.Mock(
+            side_effect=lambda keys: {
+                key: existing_objects[key] for key in keys if key in existing_objects
+            }
+        )
+
+        self.assertEqual(
+            [
+                (get_identifier(record), existing)
+                for record, existing in iter_records_with_existing(
+                    records, get_key, get_existing
+                )
+            ],
+            [
+                ("kst-1-1", None),
+                ("kst-1-2", "existing 2"),
+                ("invalid", None),
+                ("kst-1-4", None),
+                ("kst-1-5", "existing 5"),
+            ],
+        )
+        # One lookup for every batch of records
+        self.assertEqual(
+            [call.args[0] for call in get_existing.call_args_list],
+            [["kst-1-1", "kst-1-2"], ["kst-1-4"], ["kst-1-5"]],
+        )
+
+
+class KamerstukDossiersQueryTestCase(SimpleTestCase):
+    """Tests for combining many kamerstukdossiers into one KOOP SRU query"""
+
+    def test_kamerstukdossiers_query(self):
+        self.assertEqual(
+            get_kamerstukdossiers_query(["36410"]),
+            "(c.product-area=officielepublicaties AND (w.dossiernummer==36410) AND w.publicatienaam=Kamerstuk)",
+        )
+        self.assertEqual(
+            get_kamerstukdossiers_query(["36410", "36410-VII"]),
+            "(c.product-area=officielepublicaties AND (w.dossiernummer==36410 OR w.dossiernummer==36410-VII) AND w.publicatienaam=Kamerstuk)",
+        )
@@ -23,6 +23,7 @@ from requests.auth import HTTPBasicAuth
 from rdflib import Graph, URIRef
 
 from parlhistnl.models import Staatsblad
+from parlhistnl.crawler.session import get_session
 from parlhistnl.crawler.utils import CrawlerException
 
 logger = logging.getLogger(__name__)
@@ -253,7 +254,7 @@ def find_inwerkingtredingskb_via_lido(
     params = {"ext-id": f"OEP:{stb.stbid}"}
 
     try:
-        rdfxml_response = requests.get(
+        rdfxml_response = get_session().get(
             LIDO_GET_LINKS_API_URL, params=params, auth=LIDO_BASIC_AUTH, timeout=600
         )
     except requests.exceptions.ReadTimeout as exc: